@@ -12,6 +12,36 @@ let isRecording = false;
 let playbackQueue = [];
 let isPlaying = false;
 
+// --- Audio transport ---
+// Binary frames: [version u8][kind u8][seq u16 LE] + raw PCM (see server/audio_protocol.py).
+// Falls back to base64-in-JSON until the server confirms 'binary' in session_info.
+const AUDIO_PROTOCOL_VERSION = 1;
+const KIND_AUDIO_IN = 0x01;
+const KIND_AUDIO_OUT = 0x02;
+const AUDIO_HEADER_SIZE = 4;
+let audioTransport = 'json';
+let audioInSeq = 0;
+
+// --- Audio formats ---
+// Browsers may ignore the sampleRate we ask AudioContext for, so we report the
+// rates we actually got and the server resamples to match (server/audio_dsp.py).
+const CAPTURE_SAMPLE_RATE = 16000;
+const PLAYBACK_SAMPLE_RATE = 24000;
+let outputSampleRate = PLAYBACK_SAMPLE_RATE;
+let outputEncoding = 'pcm_s16le';
+
+// --- Opus (optional, ?codec=opus) ---
+// One Opus packet per binary frame, encoded/decoded with WebCodecs. The server
+// falls back to 'pcm' in session_info if it has no Opus support.
+const OPUS_SUPPORTED = typeof AudioEncoder !== 'undefined' && typeof AudioDecoder !== 'undefined';
+const PREFER_OPUS = OPUS_SUPPORTED && new URLSearchParams(location.search).get('codec') === 'opus';
+const OPUS_BITRATE = 24000;
+let audioCodec = 'pcm';
+let opusEncoder = null;
+let opusDecoder = null;
+let opusOutTimestamp = 0;
+let micTimestamp = 0;
+
 // --- DOM refs ---
 const statusDot = $('#statusDot');
 const statusText = $('#statusText');
@@ -39,6 +69,7 @@ const questResultsList = $('#questResultsList');
 function connect() {
   const proto = location.protocol === 'https:' ? 'wss:' : 'ws:';
   ws = new WebSocket(`${proto}//${location.host}/ws`);
+  ws.binaryType = 'arraybuffer';
 
   ws.onopen = () => {
     statusDot.classList.add('connected');
@@ -48,6 +79,10 @@ function connect() {
   ws.onclose = () => {
     statusDot.classList.remove('connected');
     statusText.textContent = 'Disconnected';
+    audioTransport = 'json';
+    outputSampleRate = PLAYBACK_SAMPLE_RATE;
+    outputEncoding = 'pcm_s16le';
+    closeOpus();
     setTimeout(connect, 2000);
   };
 
@@ -56,11 +91,38 @@ function connect() {
   };
 
   ws.onmessage = (e) => {
+    if (e.data instanceof ArrayBuffer) {
+      handleBinaryFrame(e.data);
+      return;
+    }
     const msg = JSON.parse(e.data);
     handleMessage(msg);
   };
 }
 
+function sendAudioFrame(payload) {
+  if (!ws || ws.readyState !== WebSocket.OPEN) return;
+  const frame = new Uint8Array(AUDIO_HEADER_SIZE + payload.byteLength);
+  const header = new DataView(frame.buffer);
+  header.setUint8(0, AUDIO_PROTOCOL_VERSION);
+  header.setUint8(1, KIND_AUDIO_IN);
+  header.setUint16(2, audioInSeq, true);
+  audioInSeq = (audioInSeq + 1) & 0xFFFF;
+  frame.set(payload, AUDIO_HEADER_SIZE);
+  ws.send(frame.buffer);
+}
+
+function sendAudio(int16) {
+  if (!ws || ws.readyState !== WebSocket.OPEN) return;
+  if (audioTransport === 'binary') {
+    sendAudioFrame(new Uint8Array(int16.buffer, int16.byteOffset, int16.byteLength));
+  } else {
+    const bytes = new Uint8Array(int16.buffer);
+    const b64 = btoa(String.fromCharCode(...bytes));
+    send('audio_in', { audio: b64 });
+  }
+}
+
 function send(type, data = {}) {
   if (ws && ws.readyState === WebSocket.OPEN) {
     ws.send(JSON.stringify({ type, ...data }));
@@ -94,6 +156,9 @@ function handleMessage(msg) {
     case 'session_info':
       handleSessionInfo(msg);
       break;
+    case 'trail_info':
+      handleTrailInfo(msg);
+      break;
     case 'mode_changed':
       handleModeChanged(msg);
       break;
@@ -151,10 +216,62 @@ function handleAudioChunk(msg) {
   const buf = new ArrayBuffer(raw.length);
   const view = new Uint8Array(buf);
   for (let i = 0; i < raw.length; i++) view[i] = raw.charCodeAt(i);
-  playbackQueue.push(buf);
+  enqueuePlayback(pcmToFloat32(buf), outputSampleRate);
+}
+
+function handleBinaryFrame(data) {
+  if (data.byteLength < AUDIO_HEADER_SIZE) return;
+  const header = new DataView(data);
+  if (header.getUint8(0) !== AUDIO_PROTOCOL_VERSION) return;
+  if (header.getUint8(1) !== KIND_AUDIO_OUT) return;
+  const payload = data.slice(AUDIO_HEADER_SIZE);
+  if (audioCodec === 'opus') {
+    if (!opusDecoder) return;
+    opusDecoder.decode(new EncodedAudioChunk({ type: 'key', timestamp: opusOutTimestamp, data: payload }));
+    opusOutTimestamp += 20000; // µs; the server sends 20 ms packets
+  } else {
+    enqueuePlayback(pcmToFloat32(payload), outputSampleRate);
+  }
+}
+
+function pcmToFloat32(buf) {
+  if (outputEncoding === 'pcm_f32le') return new Float32Array(buf);
+  // Convert PCM s16le to float32
+  const int16 = new Int16Array(buf);
+  const float32 = new Float32Array(int16.length);
+  for (let i = 0; i < int16.length; i++) {
+    float32[i] = int16[i] / 32768;
+  }
+  return float32;
+}
+
+function enqueuePlayback(samples, sampleRate) {
+  playbackQueue.push({ samples, sampleRate });
   if (!isPlaying) playNext();
 }
 
+function setupOpus() {
+  opusDecoder = new AudioDecoder({
+    output: (data) => {
+      const samples = new Float32Array(data.numberOfFrames);
+      data.copyTo(samples, { planeIndex: 0, format: 'f32-planar' });
+      enqueuePlayback(samples, data.sampleRate);
+      data.close();
+    },
+    error: (e) => console.error('Opus decode error:', e),
+  });
+  opusDecoder.configure({ codec: 'opus', sampleRate: outputSampleRate, numberOfChannels: 1 });
+  opusOutTimestamp = 0;
+}
+
+function closeOpus() {
+  if (opusDecoder && opusDecoder.state !== 'closed') opusDecoder.close();
+  if (opusEncoder && opusEncoder.state !== 'closed') opusEncoder.close();
+  opusDecoder = null;
+  opusEncoder = null;
+  audioCodec = 'pcm';
+}
+
 function handleAudioDone(msg) {
   if (msg.interrupted) {
     playbackQueue = [];
@@ -168,19 +285,12 @@ async function playNext() {
     return;
   }
   isPlaying = true;
-  const buf = playbackQueue.shift();
+  const { samples, sampleRate } = playbackQueue.shift();
 
-  if (!audioCtx) audioCtx = new AudioContext({ sampleRate: 24000 });
-
-  // Convert PCM s16le to float32
-  const int16 = new Int16Array(buf);
-  const float32 = new Float32Array(int16.length);
-  for (let i = 0; i < int16.length; i++) {
-    float32[i] = int16[i] / 32768;
-  }
+  if (!audioCtx) audioCtx = new AudioContext({ sampleRate: PLAYBACK_SAMPLE_RATE });
 
-  const audioBuf = audioCtx.createBuffer(1, float32.length, 24000);
-  audioBuf.getChannelData(0).set(float32);
+  const audioBuf = audioCtx.createBuffer(1, samples.length, sampleRate);
+  audioBuf.getChannelData(0).set(samples);
 
   const source = audioCtx.createBufferSource();
   source.buffer = audioBuf;
@@ -247,13 +357,19 @@ function handleSessionInfo(msg) {
   chatArea.classList.remove('hidden');
   controls.classList.remove('hidden');
   
+  audioTransport = msg.audio_transport || 'json';
+  audioInSeq = 0;
+  outputSampleRate = msg.output_sample_rate || PLAYBACK_SAMPLE_RATE;
+  outputEncoding = msg.output_encoding || 'pcm_s16le';
+  closeOpus();
+  audioCodec = msg.audio_codec || 'pcm';
+  if (audioCodec === 'opus') setupOpus();
+
   // Enable microphone button now that session is active
   micBtn.disabled = false;
   micBtn.style.opacity = '1';
 
-  if (msg.trail_url) {
-    trailLink.innerHTML = `<a class="trail-link" href="${msg.trail_url}" target="_blank">Open Onboarding Trail</a>`;
-  }
+  handleTrailInfo(msg);
   if (msg.repo_summary) {
     repoInfo.innerHTML = `<pre style="font-size: 11px; color: var(--text-muted); white-space: pre-wrap;">${escapeHtml(msg.repo_summary)}</pre>`;
   }
@@ -262,6 +378,13 @@ function handleSessionInfo(msg) {
   addMessage('system', '🎤 Ready to listen! Click the microphone button and speak your questions.');
 }
 
+// The trail page is created in the background and may arrive after session_info
+function handleTrailInfo(msg) {
+  if (msg.trail_url) {
+    trailLink.innerHTML = `<a class="trail-link" href="${msg.trail_url}" target="_blank">Open Onboarding Trail</a>`;
+  }
+}
+
 function handleModeChanged(msg) {
   $$('.mode-toggle button').forEach(b => b.classList.remove('active'));
   if (msg.mode === 'practice') {
@@ -357,35 +480,58 @@ async function startMic() {
     }
 
     micStream = await navigator.mediaDevices.getUserMedia({
-      audio: { sampleRate: 16000, channelCount: 1, echoCancellation: true, noiseSuppression: true }
+      audio: { sampleRate: CAPTURE_SAMPLE_RATE, channelCount: 1, echoCancellation: true, noiseSuppression: true }
     });
 
-    if (!audioCtx) audioCtx = new AudioContext({ sampleRate: 24000 });
+    if (!audioCtx) audioCtx = new AudioContext({ sampleRate: PLAYBACK_SAMPLE_RATE });
 
-    // Create a separate context for capture at 16kHz
-    const captureCtx = new AudioContext({ sampleRate: 16000 });
+    // Create a separate context for capture (16kHz if the browser allows it;
+    // the server resamples whatever rate we reported in start_session)
+    const captureCtx = new AudioContext({ sampleRate: CAPTURE_SAMPLE_RATE });
     const source = captureCtx.createMediaStreamSource(micStream);
 
     // Use ScriptProcessorNode (simpler than AudioWorklet for hackathon)
+    if (audioCodec === 'opus') {
+      opusEncoder = new AudioEncoder({
+        output: (chunk) => {
+          const packet = new Uint8Array(chunk.byteLength);
+          chunk.copyTo(packet);
+          sendAudioFrame(packet);
+        },
+        error: (e) => console.error('Opus encode error:', e),
+      });
+      opusEncoder.configure({
+        codec: 'opus', sampleRate: captureCtx.sampleRate, numberOfChannels: 1, bitrate: OPUS_BITRATE,
+      });
+      micTimestamp = 0;
+    }
+
     const processor = captureCtx.createScriptProcessor(4096, 1, 1);
     processor.onaudioprocess = (e) => {
       if (!isRecording) return;
+      // Silence is gated server-side (server/audio_vad.py), with pre-roll and
+      // hangover so quiet word onsets and pauses are not clipped
       const float32 = e.inputBuffer.getChannelData(0);
 
-      // Simple VAD: compute RMS energy and skip silence
-      let sum = 0;
-      for (let i = 0; i < float32.length; i++) sum += float32[i] * float32[i];
-      const rms = Math.sqrt(sum / float32.length);
-      if (rms < 0.02) return; // below speech threshold — skip
+      if (opusEncoder) {
+        opusEncoder.encode(new AudioData({
+          format: 'f32-planar',
+          sampleRate: captureCtx.sampleRate,
+          numberOfFrames: float32.length,
+          numberOfChannels: 1,
+          timestamp: micTimestamp,
+          data: float32,
+        }));
+        micTimestamp += float32.length * 1e6 / captureCtx.sampleRate;
+        return;
+      }
 
       const int16 = new Int16Array(float32.length);
       for (let i = 0; i < float32.length; i++) {
         const s = Math.max(-1, Math.min(1, float32[i]));
         int16[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
       }
-      const bytes = new Uint8Array(int16.buffer);
-      const b64 = btoa(String.fromCharCode(...bytes));
-      send('audio_in', { audio: b64 });
+      sendAudio(int16);
     };
 
     source.connect(processor);
@@ -416,6 +562,11 @@ function stopMic() {
   // Show processing message
   addMessage('system', '🔊 Processing your speech...');
 
+  if (opusEncoder) {
+    const encoder = opusEncoder;
+    opusEncoder = null;
+    encoder.flush().finally(() => encoder.close());
+  }
   if (micProcessor) {
     micProcessor.processor.disconnect();
     micProcessor.source.disconnect();
@@ -436,9 +587,20 @@ startSessionBtn.addEventListener('click', () => {
     alert('Please enter a repo path');
     return;
   }
+  // Find out which rates the browser actually gives us
+  if (!audioCtx) audioCtx = new AudioContext({ sampleRate: PLAYBACK_SAMPLE_RATE });
+  const probe = new AudioContext({ sampleRate: CAPTURE_SAMPLE_RATE });
+  const inputSampleRate = probe.sampleRate;
+  probe.close();
+
   send('start_session', {
     repo_path: repoPath,
-    curriculum_page_id: curriculumId
+    curriculum_page_id: curriculumId,
+    audio_transport: 'binary',
+    audio_codec: PREFER_OPUS ? 'opus' : 'pcm',
+    input_sample_rate: inputSampleRate,
+    output_sample_rate: audioCtx.sampleRate,
+    output_encoding: 'pcm_s16le'
   });
 });
 
@@ -14,6 +14,8 @@ let playbackQueue = [];
 let isPlaying = false;
 let agentId = null;
 let accessToken = null;
+let sessionId = null;     // from session_info; scopes the agent's /api calls to our repo
+let repoId = null;
 
 // --- DOM refs ---
 const statusDot = $('#statusDot');
@@ -98,6 +100,8 @@ async function connectCallsWs() {
         },
         metadata: { 
           server_url: location.origin,
+          session_id: sessionId,
+          repo_id: repoId,
           repo_path: repoPathInput.value,
           curriculum_page_id: curriculumIdInput.value
         }
@@ -150,6 +154,9 @@ function handleMessage(msg) {
     case 'session_info':
       handleSessionInfo(msg);
       break;
+    case 'trail_info':
+      handleTrailInfo(msg);
+      break;
     case 'transcript':
       handleTranscript(msg);
       break;
@@ -262,15 +269,25 @@ function handleSessionInfo(msg) {
   micBtn.disabled = false;
   micBtn.style.opacity = '1';
 
-  if (msg.trail_url) {
-    trailLink.innerHTML = `<a class="trail-link" href="${msg.trail_url}" target="_blank">Open Onboarding Trail</a>`;
-  }
+  sessionId = msg.session_id || null;
+  repoId = msg.repo_id || null;
+  handleTrailInfo(msg);
   if (msg.repo_summary) {
     repoInfo.innerHTML = `<pre style="font-size: 11px; color: var(--text-muted); white-space: pre-wrap;">${escapeHtml(msg.repo_summary)}</pre>`;
   }
 
   addMessage('system', `🚀 Session started! Repo: ${msg.repo_path || 'none'}`);
   addMessage('system', '🎤 Ready to listen! Click the microphone button and speak your questions.');
+
+  // Connect Calls API now that the agent can be told which session it serves
+  if (!callsWs) connectCallsWs();
+}
+
+// The trail page is created in the background and may arrive after session_info
+function handleTrailInfo(msg) {
+  if (msg.trail_url) {
+    trailLink.innerHTML = `<a class="trail-link" href="${msg.trail_url}" target="_blank">Open Onboarding Trail</a>`;
+  }
 }
 
 function handleResponseText(msg) {
@@ -488,9 +505,7 @@ startSessionBtn.addEventListener('click', async () => {
     repo_path: repoPath,
     curriculum_page_id: curriculumId
   });
-  
-  // Connect Calls API after session starts
-  await connectCallsWs();
+  // The Calls API connects from handleSessionInfo, once the session id is known
 });
 
 // Toggle mic on click (not hold)
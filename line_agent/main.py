@@ -7,7 +7,7 @@ from typing import Annotated
 import httpx
 from line.voice_agent_app import VoiceAgentApp, AgentEnv, CallRequest
 from line.llm_agent import LlmAgent, LlmConfig, end_call
-from tools import search_code, read_file, get_repo_info, deep_analysis
+from tools import RepoApi, make_tools
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +30,7 @@ Guidelines:
 - Keep voice responses conversational and under 2 sentences when possible
 - Use search_code to find relevant code patterns
 - Use read_file to examine specific files in detail
+- Use search_and_read when you need several searches or files at once
 - Use deep_analysis for complex questions that require comprehensive investigation
 - Be helpful, patient, and encouraging
 
@@ -41,13 +42,19 @@ async def get_agent(env: AgentEnv, call_request: CallRequest) -> LlmAgent:
     
     # Get repo context from metadata (passed by client via start event)
     repo_url = call_request.metadata.get("server_url", SERVER_URL)
+    # The voice session this call belongs to; scopes every tool call to its repo
+    api = RepoApi(
+        session_token=call_request.metadata.get("session_id", ""),
+        repo_id=call_request.metadata.get("repo_id", ""),
+        server_url=repo_url,
+    )
     
     logger.info(f"Starting RepoBuddy agent with server URL: {repo_url}")
     
     return LlmAgent(
         model="anthropic/claude-haiku-4-5-20251001",
         api_key=ANTHROPIC_API_KEY,
-        tools=[search_code, read_file, get_repo_info, deep_analysis, end_call],
+        tools=[*make_tools(api), end_call],
         config=LlmConfig(
             system_prompt=SYSTEM_PROMPT,
             introduction="Hey! I'm RepoBuddy. I'm here to help you explore and understand this codebase. What would you like to know?",
@@ -0,0 +1,54 @@
+"""
+HTTP client for the RepoBuddy server's /api endpoints, used by the agent tools.
+
+Kept free of the Line SDK so it can be exercised on its own.
+"""
+from __future__ import annotations
+
+import os
+
+import httpx
+
+SERVER_URL = os.getenv("SERVER_URL", "http://localhost:3000")
+
+
+class RepoApi:
+    """The server's /api endpoints, scoped to one voice session's repo.
+
+    Every request carries the session token (and repo_id, which must be a repo
+    that session opened) from the call metadata, so concurrent calls on
+    different repos each see their own.
+    """
+
+    def __init__(
+        self,
+        session_token: str = "",
+        repo_id: str = "",
+        server_url: str = SERVER_URL,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.server_url = server_url.rstrip("/")
+        self._transport = transport
+        self.headers = {"X-Session-Token": session_token} if session_token else {}
+        self.params = {"repo_id": repo_id} if repo_id else {}
+
+    async def get(self, path: str, timeout: float = 10.0) -> dict:
+        async with httpx.AsyncClient(timeout=timeout, transport=self._transport) as client:
+            resp = await client.get(f"{self.server_url}{path}", params=self.params, headers=self.headers)
+            resp.raise_for_status()
+            return resp.json()
+
+    async def post(self, path: str, body: dict, timeout: float = 10.0) -> dict:
+        async with httpx.AsyncClient(timeout=timeout, transport=self._transport) as client:
+            resp = await client.post(f"{self.server_url}{path}", json=body, params=self.params, headers=self.headers)
+            resp.raise_for_status()
+            return resp.json()
+
+    async def batch(self, ops: list[dict], timeout: float = 15.0) -> list[dict]:
+        """Run several /api ops in one request; results come back in the same order.
+
+        Each op is {"op": "search" | "read_file" | "repo_scan", "args": {...}} with the
+        same args as the single endpoints; each result is {"ok": True, "result": ...}
+        or {"ok": False, "status": ..., "error": ...}.
+        """
+        return (await self.post("/api/batch", {"ops": ops}, timeout=timeout))["results"]
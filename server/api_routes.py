@@ -1,42 +1,67 @@
 """HTTP API endpoints for Line agent tool calls (via ngrok)."""
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 from typing import Any
 
 import httpx
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from pydantic import BaseModel, ValidationError
 
 import config
+import metrics
 from repo.rg import rg_search
 from repo.file import open_snippet, open_around_match
-from repo.scan import scan_repo
 from repo.evidence import collect_evidence
-from notion.write_trail import TrailWriter
+from notion.write_trail import trail_writer
+from repo_registry import RepoContext, repo_registry
 from notion.read_curriculum import load_curriculum
 from anthropic_client import call_claude, parse_json_response
 from orchestrator.prompts import SYNTHESIZER_PROMPT
 
 logger = logging.getLogger(__name__)
 
-api_router = APIRouter(prefix="/api", tags=["api"])
+MAX_BATCH_OPS = 20
+BATCH_CONCURRENCY = 8  # ops of one /api/batch request run at once
 
-# Shared state — set once on session start, reused across requests
-_repo_path: str = config.REPO_PATH or ""
-_repo_scan_cache: dict[str, Any] | None = None
-_trail_writer = TrailWriter()
+api_router = APIRouter(prefix="/api", tags=["api"])
 
 
-def set_repo_path(path: str) -> None:
-    global _repo_path, _repo_scan_cache
-    _repo_path = path
-    _repo_scan_cache = None  # invalidate cache
+def repo_context(
+    repo_id: str | None = Query(None, description="Repo id from /api/repos or session_info"),
+    session: str | None = Query(None, description="Session token (the session_id from session_info)"),
+    x_session_token: str | None = Header(None),
+) -> RepoContext:
+    """The repo a request is about: the session's own, or a repo_id it opened."""
+    token = x_session_token or session
+    if token:
+        if not repo_registry.has_session(token):
+            raise HTTPException(status_code=404, detail="Unknown session")
+        if repo_id and not repo_registry.session_opened(token, repo_id):
+            raise HTTPException(status_code=403, detail="Repo not opened by this session")
+    elif repo_registry.has_sessions:
+        raise HTTPException(status_code=401, detail="Session token required")
+    ctx = repo_registry.resolve(token, repo_id)
+    if ctx is None:
+        if repo_id:
+            raise HTTPException(status_code=404, detail="Unknown repo_id")
+        raise HTTPException(status_code=400, detail="No repo path configured")
+    return ctx
 
 
-def get_repo_path() -> str:
-    return _repo_path
+def session_token(
+    session: str | None = Query(None, description="Session token (the session_id from session_info)"),
+    x_session_token: str | None = Header(None),
+) -> str:
+    """A live voice session's token; required by endpoints that change server state."""
+    token = x_session_token or session
+    if not token:
+        raise HTTPException(status_code=401, detail="Session token required")
+    if not repo_registry.has_session(token):
+        raise HTTPException(status_code=403, detail="Unknown session")
+    return token
 
 
 # ---------- Request / Response models ----------
@@ -47,12 +72,25 @@ class SearchRequest(BaseModel):
     file_glob: str | None = None
 
 
+class RepoRequest(BaseModel):
+    path: str
+
+
 class ReadFileRequest(BaseModel):
     path: str
     start: int = 1
     end: int = 50
 
 
+class BatchOp(BaseModel):
+    op: str  # "search", "read_file" or "repo_scan"
+    args: dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    ops: list[BatchOp]
+
+
 class NotionLogRequest(BaseModel):
     page_id: str
     user_text: str
@@ -69,16 +107,23 @@ class AnalyzeRequest(BaseModel):
 
 # ---------- Endpoints ----------
 
+@api_router.post("/repos")
+async def open_repo(req: RepoRequest, token: str = Depends(session_token)):
+    """Open another repo for a live session's API use; returns its repo_id."""
+    ctx = repo_registry.open_for_session(token, req.path)
+    return {"repo_id": ctx.repo_id, "path": ctx.path}
+
+
 @api_router.post("/search")
-async def search_code(req: SearchRequest):
+async def search_code(req: SearchRequest, ctx: RepoContext = Depends(repo_context)):
     """Ripgrep search — returns matches."""
-    repo = get_repo_path()
-    if not repo:
-        raise HTTPException(status_code=400, detail="No repo path configured")
+    return await _search(ctx, req)
+
 
+async def _search(ctx: RepoContext, req: SearchRequest) -> dict[str, Any]:
     matches = await rg_search(
         pattern=req.pattern,
-        repo_path=repo,
+        repo_path=ctx.path,
         max_results=req.max_results,
         file_glob=req.file_glob,
     )
@@ -91,13 +136,14 @@ async def search_code(req: SearchRequest):
 
 
 @api_router.post("/read_file")
-async def read_file(req: ReadFileRequest):
+async def read_file(req: ReadFileRequest, ctx: RepoContext = Depends(repo_context)):
     """Read a file snippet — returns content."""
-    repo = get_repo_path()
-    if not repo:
-        raise HTTPException(status_code=400, detail="No repo path configured")
+    return await _read_file(ctx, req)
 
-    snippet = open_snippet(repo, req.path, req.start, req.end)
+
+async def _read_file(ctx: RepoContext, req: ReadFileRequest) -> dict[str, Any]:
+    # Disk reads off the event loop, so a batch's reads don't stall other requests
+    snippet = await asyncio.to_thread(open_snippet, ctx.path, req.path, req.start, req.end)
     if snippet is None:
         raise HTTPException(status_code=404, detail=f"File not found: {req.path}")
 
@@ -110,36 +156,62 @@ async def read_file(req: ReadFileRequest):
 
 
 @api_router.get("/repo_scan")
-async def get_repo_scan():
+async def get_repo_scan(ctx: RepoContext = Depends(repo_context)):
     """Return cached repo scan summary."""
-    global _repo_scan_cache
-
-    repo = get_repo_path()
-    if not repo:
-        raise HTTPException(status_code=400, detail="No repo path configured")
+    return await _repo_scan(ctx)
 
-    if _repo_scan_cache is None:
-        scan = await scan_repo(repo)
-        _repo_scan_cache = {
-            "tree": scan.tree,
-            "extensions": scan.extensions,
-            "frameworks": scan.frameworks,
-            "languages": scan.languages,
-            "total_files": scan.total_files,
-            "summary": scan.summary(),
-        }
 
-    return _repo_scan_cache
+async def _repo_scan(ctx: RepoContext) -> dict[str, Any]:
+    try:
+        return await ctx.scan_summary()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@api_router.post("/batch")
+async def batch(req: BatchRequest, ctx: RepoContext = Depends(repo_context)):
+    """Run several search / read_file / repo_scan ops concurrently.
+
+    Results come back in request order, each {"ok": true, "result": ...} or
+    {"ok": false, "status": ..., "error": ...}; one failing op doesn't fail
+    the others.
+    """
+    if len(req.ops) > MAX_BATCH_OPS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_OPS} ops per batch")
+
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(op: BatchOp) -> dict[str, Any]:
+        async with slots:
+            try:
+                if op.op == "search":
+                    result = await _search(ctx, SearchRequest(**op.args))
+                elif op.op == "read_file":
+                    result = await _read_file(ctx, ReadFileRequest(**op.args))
+                elif op.op == "repo_scan":
+                    result = await _repo_scan(ctx)
+                else:
+                    raise HTTPException(status_code=400, detail=f"Unknown op: {op.op}")
+            except HTTPException as e:
+                return {"ok": False, "status": e.status_code, "error": e.detail}
+            except ValidationError as e:
+                return {"ok": False, "status": 422, "error": str(e)}
+            except Exception as e:
+                logger.error("Batch op %s failed: %s", op.op, e)
+                return {"ok": False, "status": 500, "error": str(e)}
+            return {"ok": True, "result": result}
+
+    metrics.incr("api.batch_ops", len(req.ops))
+    return {"results": await asyncio.gather(*(run(op) for op in req.ops))}
 
 
 @api_router.post("/notion/log")
 async def notion_log(req: NotionLogRequest):
     """Log a chat turn to Notion trail."""
     try:
-        await _trail_writer.append_chat_turn(
+        await trail_writer.append_chat_turn(
             req.page_id, req.user_text, req.assistant_text
         )
-        await _trail_writer.flush()
         return {"status": "ok"}
     except Exception as e:
         logger.error("Notion log error: %s", e)
@@ -160,6 +232,12 @@ async def get_curriculum(page_id: str = ""):
     return {"curriculum": curriculum.to_dict()}
 
 
+@api_router.get("/metrics")
+async def get_metrics():
+    """Return voice pipeline counters, gauges and summaries."""
+    return metrics.snapshot()
+
+
 @api_router.get("/token")
 async def get_calls_token():
     """Return Cartesia agent info for Calls API."""
@@ -171,15 +249,11 @@ async def get_calls_token():
 
 
 @api_router.post("/analyze")
-async def analyze_question(req: AnalyzeRequest):
+async def analyze_question(req: AnalyzeRequest, ctx: RepoContext = Depends(repo_context)):
     """Deep analysis: collect evidence + synthesize answer via Claude Sonnet."""
-    repo = get_repo_path()
-    if not repo:
-        raise HTTPException(status_code=400, detail="No repo path configured")
-
     # Collect evidence
     evidence = await collect_evidence(
-        repo_path=repo,
+        repo_path=ctx.path,
         rg_patterns=req.rg_patterns[:3],
         candidate_files=req.candidate_files[:3] if req.candidate_files else None,
         max_snippets=5,
@@ -0,0 +1,136 @@
+"""
+Vectorized PCM format conversion and resampling (NumPy).
+
+Browsers are free to ignore the sample rate we ask AudioContext for, so the
+client reports the rates it actually got in ``start_session``:
+
+    input_sample_rate   mic capture rate (normalized here to the STT rate)
+    output_sample_rate  playback rate the client wants TTS audio at
+    output_encoding     "pcm_s16le" (default) or "pcm_f32le"
+
+StreamResampler converts a continuous stream chunk by chunk, carrying filter
+state and the fractional read position across chunks so there are no clicks
+at chunk boundaries. convert_pcm is the one-shot version for whole utterances
+(e.g. cached TTS audio). See bench_audio_dsp.py for CPU cost per second of audio.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+ENCODING_S16 = "pcm_s16le"
+ENCODING_F32 = "pcm_f32le"
+SUPPORTED_ENCODINGS = (ENCODING_S16, ENCODING_F32)
+
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+
+FILTER_TAPS = 31  # anti-aliasing FIR length used when downsampling
+
+
+def sample_width(encoding: str) -> int:
+    return 4 if encoding == ENCODING_F32 else 2
+
+
+def negotiate_rate(requested: object, default: int) -> int:
+    """Accept a client-reported sample rate if it is a sane integer, else default."""
+    try:
+        rate = int(requested)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return default
+    if MIN_SAMPLE_RATE <= rate <= MAX_SAMPLE_RATE:
+        return rate
+    return default
+
+
+def negotiate_encoding(requested: object) -> str:
+    if requested in SUPPORTED_ENCODINGS:
+        return requested  # type: ignore[return-value]
+    return ENCODING_S16
+
+
+def decode_pcm(data: bytes | memoryview, encoding: str = ENCODING_S16) -> np.ndarray:
+    """PCM bytes -> float32 samples in [-1, 1]."""
+    if encoding == ENCODING_F32:
+        return np.frombuffer(data, dtype="<f4", count=len(data) // 4).astype(np.float32, copy=False)
+    samples = np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+    return samples.astype(np.float32) * (1.0 / 32768.0)
+
+
+def encode_pcm(samples: np.ndarray, encoding: str = ENCODING_S16) -> bytes:
+    """float32 samples -> PCM bytes (clipped for 16-bit)."""
+    if encoding == ENCODING_F32:
+        return samples.astype("<f4", copy=False).tobytes()
+    scaled = np.clip(samples * 32768.0, -32768.0, 32767.0)
+    return scaled.astype("<i2").tobytes()
+
+
+def _lowpass(src_rate: int, dst_rate: int, taps: int = FILTER_TAPS) -> np.ndarray:
+    """Hamming-windowed sinc low-pass at 90% of the target Nyquist frequency."""
+    cutoff = 0.5 * dst_rate / src_rate * 0.9  # cycles per input sample
+    n = np.arange(taps) - (taps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (h / h.sum()).astype(np.float32)
+
+
+class StreamResampler:
+    """Stateful linear-interpolation resampler with an anti-aliasing filter."""
+
+    def __init__(self, src_rate: int, dst_rate: int) -> None:
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self._step = src_rate / dst_rate  # input samples advanced per output sample
+        self._fir = _lowpass(src_rate, dst_rate) if dst_rate < src_rate else None
+        self._fir_state = np.zeros(FILTER_TAPS - 1, dtype=np.float32)
+        self._history = np.zeros(0, dtype=np.float32)  # unconsumed filtered input
+        self._pos = 0.0  # next output position, in samples from the start of _history
+
+    @property
+    def passthrough(self) -> bool:
+        return self.src_rate == self.dst_rate
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.passthrough or samples.size == 0:
+            return samples
+        if self._fir is not None:
+            padded = np.concatenate((self._fir_state, samples))
+            self._fir_state = padded[-(FILTER_TAPS - 1):]
+            samples = np.convolve(padded, self._fir, mode="valid").astype(np.float32)
+
+        buf = np.concatenate((self._history, samples)) if self._history.size else samples
+        last = buf.size - 1
+        if last < self._pos:
+            self._history = buf
+            return np.zeros(0, dtype=np.float32)
+        count = int((last - self._pos) // self._step) + 1
+        positions = self._pos + self._step * np.arange(count)
+        out = np.interp(positions, np.arange(buf.size), buf).astype(np.float32)
+
+        next_pos = self._pos + self._step * count
+        keep_from = min(int(next_pos), buf.size)  # next_pos may land in the next chunk
+        self._history = buf[keep_from:]
+        self._pos = next_pos - keep_from
+        return out
+
+    def process_pcm(
+        self,
+        data: bytes | memoryview,
+        src_encoding: str = ENCODING_S16,
+        dst_encoding: str = ENCODING_S16,
+    ) -> bytes:
+        """Resample and re-encode one chunk of PCM bytes."""
+        if self.passthrough and src_encoding == dst_encoding:
+            return bytes(data)
+        return encode_pcm(self.process(decode_pcm(data, src_encoding)), dst_encoding)
+
+
+def convert_pcm(
+    data: bytes,
+    src_rate: int,
+    dst_rate: int,
+    src_encoding: str = ENCODING_S16,
+    dst_encoding: str = ENCODING_S16,
+) -> bytes:
+    """One-shot conversion of a complete buffer."""
+    if src_rate == dst_rate and src_encoding == dst_encoding:
+        return data
+    return StreamResampler(src_rate, dst_rate).process_pcm(data, src_encoding, dst_encoding)
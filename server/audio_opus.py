@@ -0,0 +1,97 @@
+"""
+Optional Opus codec for browser <-> server audio.
+
+Raw PCM is ~256 kbit/s up (16 kHz) and ~384 kbit/s down (24 kHz); Opus voice
+at OPUS_BITRATE is a few percent of that, which matters on mobile links.
+Clients (WebCodecs AudioEncoder/AudioDecoder) ask for it with
+``"audio_codec": "opus"`` in ``start_session``. It only applies to the binary
+transport: each binary audio frame then carries exactly one Opus packet.
+
+Cartesia still speaks PCM, so the server decodes mic packets straight to the
+STT rate and encodes TTS audio before sending. opuslib (and the system libopus
+it wraps) is optional: without it the server answers ``"audio_codec": "pcm"``
+and the client keeps sending raw PCM. See bench_audio_opus.py for bandwidth and
+CPU per session.
+"""
+from __future__ import annotations
+
+import logging
+
+from audio_protocol import TRANSPORT_BINARY
+
+logger = logging.getLogger(__name__)
+
+try:
+    import opuslib
+    OPUS_AVAILABLE = True
+except Exception:  # ImportError, or libopus missing from the system
+    opuslib = None
+    OPUS_AVAILABLE = False
+
+CODEC_PCM = "pcm"
+CODEC_OPUS = "opus"
+
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+OPUS_FRAME_MS = 20
+OPUS_MAX_FRAME_MS = 120  # longest packet a client may send
+OPUS_BITRATE = 24000     # bits/s for TTS audio sent to the client
+
+
+def negotiate_codec(requested: str | None, transport: str) -> str:
+    """Use Opus only when asked for, on the binary transport, with opuslib installed."""
+    if requested != CODEC_OPUS:
+        return CODEC_PCM
+    if transport != TRANSPORT_BINARY:
+        return CODEC_PCM
+    if not OPUS_AVAILABLE:
+        logger.info("Client asked for Opus but opuslib/libopus is not installed, using PCM")
+        return CODEC_PCM
+    return CODEC_OPUS
+
+
+def opus_rate(rate: int) -> int:
+    """Nearest sample rate Opus accepts at or above rate (capped at 48 kHz)."""
+    for supported in OPUS_SAMPLE_RATES:
+        if supported >= rate:
+            return supported
+    return OPUS_SAMPLE_RATES[-1]
+
+
+class OpusDecoder:
+    """Mono Opus packets -> pcm_s16le at sample_rate (any Opus rate, whatever the sender used)."""
+
+    def __init__(self, sample_rate: int) -> None:
+        self.sample_rate = sample_rate
+        self._decoder = opuslib.Decoder(sample_rate, 1)
+        self._max_frame = sample_rate * OPUS_MAX_FRAME_MS // 1000
+
+    def decode(self, packet: bytes | memoryview) -> bytes:
+        return self._decoder.decode(bytes(packet), self._max_frame)
+
+
+class OpusEncoder:
+    """pcm_s16le -> mono Opus packets of OPUS_FRAME_MS, buffering partial frames."""
+
+    def __init__(self, sample_rate: int, bitrate: int = OPUS_BITRATE) -> None:
+        self.sample_rate = sample_rate
+        self._encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+        self._encoder.bitrate = bitrate
+        self.frame_samples = sample_rate * OPUS_FRAME_MS // 1000
+        self._frame_bytes = self.frame_samples * 2
+        self._buf = bytearray()
+
+    def encode(self, pcm: bytes | memoryview) -> list[bytes]:
+        self._buf.extend(pcm)
+        packets: list[bytes] = []
+        while len(self._buf) >= self._frame_bytes:
+            frame = bytes(self._buf[:self._frame_bytes])
+            del self._buf[:self._frame_bytes]
+            packets.append(self._encoder.encode(frame, self.frame_samples))
+        return packets
+
+    def flush(self) -> list[bytes]:
+        """Encode the buffered tail, zero-padded to a full frame (end of an utterance)."""
+        if not self._buf:
+            return []
+        self._buf.extend(bytes(self._frame_bytes - len(self._buf)))
+        return self.encode(b"")
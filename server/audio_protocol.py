@@ -0,0 +1,55 @@
+"""
+Binary WebSocket framing for audio between the browser and the server.
+
+Control messages stay JSON text frames. Audio travels as binary frames with a
+small fixed header followed by the raw payload:
+
+    byte 0     protocol version
+    byte 1     frame kind (KIND_AUDIO_IN or KIND_AUDIO_OUT)
+    bytes 2-3  sequence number, uint16 little-endian (wraps around)
+
+Clients opt in by sending ``"audio_transport": "binary"`` in ``start_session``;
+the server confirms the chosen transport in ``session_info``. Clients that
+never ask keep using base64 audio inside JSON messages.
+"""
+from __future__ import annotations
+
+import struct
+
+PROTOCOL_VERSION = 1
+
+KIND_AUDIO_IN = 0x01   # Client → Server: mic audio
+KIND_AUDIO_OUT = 0x02  # Server → Client: TTS audio
+
+TRANSPORT_JSON = "json"
+TRANSPORT_BINARY = "binary"
+SUPPORTED_TRANSPORTS = (TRANSPORT_JSON, TRANSPORT_BINARY)
+
+_HEADER = struct.Struct("<BBH")
+HEADER_SIZE = _HEADER.size
+
+
+class FrameError(ValueError):
+    """Raised when a binary frame cannot be decoded."""
+
+
+def pack_audio_frame(kind: int, seq: int, payload: bytes) -> bytes:
+    """Prefix an audio payload with the binary frame header."""
+    return _HEADER.pack(PROTOCOL_VERSION, kind, seq & 0xFFFF) + payload
+
+
+def unpack_audio_frame(frame: bytes) -> tuple[int, int, memoryview]:
+    """Split a binary frame into (kind, seq, payload) without copying the payload."""
+    if len(frame) < HEADER_SIZE:
+        raise FrameError(f"Frame too short: {len(frame)} bytes")
+    version, kind, seq = _HEADER.unpack_from(frame)
+    if version != PROTOCOL_VERSION:
+        raise FrameError(f"Unsupported protocol version: {version}")
+    return kind, seq, memoryview(frame)[HEADER_SIZE:]
+
+
+def negotiate_transport(requested: str | None) -> str:
+    """Pick the audio transport for a session, defaulting to JSON for old clients."""
+    if requested in SUPPORTED_TRANSPORTS:
+        return requested
+    return TRANSPORT_JSON
@@ -0,0 +1,222 @@
+"""
+Server-side shaping of mic audio on its way to Cartesia STT.
+
+The browser hands us frames of whatever size its audio callback produces.
+Sending each one straight through costs an await and a WebSocket frame to
+Cartesia apiece, so AudioAggregator coalesces them into fixed-duration packets
+and flushes a partial packet once it has waited longer than the jitter
+allowance, which bounds the latency it can add.
+
+AudioUplink puts a bounded queue and a dedicated sender task in front of the
+aggregator so the WebSocket receive loop never awaits Cartesia: a slow STT
+socket fills the queue (and trips the overflow policy) instead of delaying
+mode_switch / stop_session handling.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+import metrics
+from config import AUDIO_QUEUE_FRAMES, AUDIO_QUEUE_POLICY, STT_JITTER_MS, STT_PACKET_MS
+
+logger = logging.getLogger(__name__)
+
+STT_SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # pcm_s16le
+
+MIN_PACKET_MS = 20
+MAX_PACKET_MS = 100
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+# Coalesced frames still have to fit in memory — beyond this the oldest audio goes
+COALESCE_MAX_BYTES = STT_SAMPLE_RATE * SAMPLE_WIDTH * 2  # 2 seconds
+CLOSE_DRAIN_TIMEOUT = 2.0  # seconds to forward queued audio on session end
+
+
+class AudioAggregator:
+    """Coalesce small PCM frames into packet_ms packets before calling send."""
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        packet_ms: int = STT_PACKET_MS,
+        jitter_ms: int = STT_JITTER_MS,
+        sample_rate: int = STT_SAMPLE_RATE,
+    ) -> None:
+        self._send = send
+        self.packet_ms = max(MIN_PACKET_MS, min(MAX_PACKET_MS, packet_ms))
+        self.jitter_ms = max(0, jitter_ms)
+        bytes_per_ms = sample_rate * SAMPLE_WIDTH / 1000
+        # Keep packets sample-aligned
+        self.packet_bytes = int(bytes_per_ms * self.packet_ms) // SAMPLE_WIDTH * SAMPLE_WIDTH
+        self._buf = bytearray()
+        self._oldest: float | None = None  # monotonic time the buffered audio started waiting
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+        self._closed = False
+
+        metrics.set_gauge("stt_uplink.packet_ms", self.packet_ms)
+        metrics.set_gauge("stt_uplink.packet_bytes", self.packet_bytes)
+
+    @property
+    def buffered_bytes(self) -> int:
+        return len(self._buf)
+
+    def start(self) -> None:
+        """Start the timer that flushes partial packets after the jitter allowance."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def push(self, pcm: bytes | memoryview) -> None:
+        """Buffer a frame and send every complete packet it produces."""
+        if self._closed or not pcm:
+            return
+        metrics.incr("stt_uplink.frames_in")
+        async with self._lock:
+            before = len(self._buf)
+            if not self._buf:
+                self._oldest = time.monotonic()
+            self._buf.extend(pcm)
+            metrics.observe("stt_uplink.buffered_bytes_on_push", len(self._buf))
+            packets: list[bytes] = []
+            while len(self._buf) >= self.packet_bytes:
+                packets.append(bytes(self._buf[:self.packet_bytes]))
+                del self._buf[:self.packet_bytes]
+            if packets:
+                self._oldest = time.monotonic() if self._buf else None
+            self._track_depth(before)
+            for packet in packets:
+                await self._emit(packet)
+
+    async def flush(self) -> None:
+        """Send whatever is buffered, even if it is shorter than a packet."""
+        async with self._lock:
+            if not self._buf:
+                return
+            before = len(self._buf)
+            packet = bytes(self._buf)
+            self._buf.clear()
+            self._oldest = None
+            self._track_depth(before)
+            await self._emit(packet)
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        interval = max(self.jitter_ms, MIN_PACKET_MS) / 1000 / 2
+        try:
+            while not self._closed:
+                await asyncio.sleep(interval)
+                oldest = self._oldest
+                if oldest is not None and (time.monotonic() - oldest) * 1000 >= self.packet_ms + self.jitter_ms:
+                    metrics.incr("stt_uplink.partial_flushes")
+                    await self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    async def _emit(self, packet: bytes) -> None:
+        metrics.incr("stt_uplink.packets_out")
+        metrics.incr("stt_uplink.bytes_out", len(packet))
+        try:
+            await self._send(packet)
+        except Exception as e:
+            logger.error("STT uplink send error: %s", e)
+
+    def _track_depth(self, before: int) -> None:
+        """Keep the depth gauge (summed across sessions) in step with this buffer."""
+        metrics.add_gauge("stt_uplink.queue_depth_bytes", len(self._buf) - before)
+
+
+class AudioUplink:
+    """Bounded per-session queue plus a sender task feeding an AudioAggregator.
+
+    ``submit`` never blocks. When the queue is full the overflow policy
+    decides what gives: ``drop_oldest`` discards the oldest frame, while
+    ``coalesce`` merges the new frame into the newest queued one (keeping
+    the audio) until that frame reaches COALESCE_MAX_BYTES.
+    """
+
+    def __init__(
+        self,
+        aggregator: AudioAggregator,
+        max_frames: int = AUDIO_QUEUE_FRAMES,
+        overflow: str = AUDIO_QUEUE_POLICY,
+    ) -> None:
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE):
+            logger.warning("Unknown audio overflow policy %r, using %s", overflow, OVERFLOW_DROP_OLDEST)
+            overflow = OVERFLOW_DROP_OLDEST
+        self._aggregator = aggregator
+        self._frames: deque[bytes] = deque()
+        self._max_frames = max(1, max_frames)
+        self._overflow = overflow
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return len(self._frames)
+
+    def start(self) -> None:
+        self._aggregator.start()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, pcm: bytes | memoryview) -> None:
+        """Queue a frame for STT without waiting on the network."""
+        if self._closed or not pcm:
+            return
+        frame = bytes(pcm)
+        if len(self._frames) >= self._max_frames:
+            self._handle_overflow(frame)
+        else:
+            self._frames.append(frame)
+            metrics.add_gauge("stt_uplink.audio_queue_depth", 1)
+        self._ready.set()
+
+    async def close(self) -> None:
+        """Stop the sender, forwarding anything still queued first."""
+        self._closed = True
+        self._ready.set()
+        if self._task:
+            try:
+                await asyncio.wait_for(self._task, timeout=CLOSE_DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("STT uplink drain timed out, dropping %d frames", len(self._frames))
+            self._task = None
+        metrics.add_gauge("stt_uplink.audio_queue_depth", -len(self._frames))
+        self._frames.clear()
+        await self._aggregator.close()
+
+    def _handle_overflow(self, frame: bytes) -> None:
+        if self._overflow == OVERFLOW_COALESCE and len(self._frames[-1]) + len(frame) <= COALESCE_MAX_BYTES:
+            self._frames[-1] += frame
+            metrics.incr("stt_uplink.frames_coalesced")
+            return
+        dropped = self._frames.popleft()
+        self._frames.append(frame)
+        metrics.incr("stt_uplink.frames_dropped")
+        metrics.incr("stt_uplink.bytes_dropped", len(dropped))
+
+    def _pop(self) -> bytes:
+        metrics.add_gauge("stt_uplink.audio_queue_depth", -1)
+        return self._frames.popleft()
+
+    async def _run(self) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._frames:
+                await self._aggregator.push(self._pop())
+            if self._closed:
+                return
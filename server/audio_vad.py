@@ -0,0 +1,127 @@
+"""
+Energy + zero-crossing voice activity gate for mic audio bound for STT.
+
+Silence costs Cartesia bandwidth and STT billing, so VoiceActivityGate only
+lets speech regions through. Audio is classified in VAD_FRAME_MS frames
+(NumPy, one pass per chunk):
+
+- energy above an adaptive threshold (noise floor + margin, never below
+  MIN_SPEECH_DB) and a zero-crossing rate typical of voiced speech, or
+- energy well above the threshold regardless of ZCR (loud fricatives).
+
+Once speech starts, the preceding VAD_PREROLL_MS of audio is sent first so
+word onsets are not clipped, and VAD_HANGOVER_MS of trailing audio keeps
+flowing after the last speech frame so pauses between words are not chopped.
+"""
+from __future__ import annotations
+
+import logging
+from collections import deque
+
+import numpy as np
+
+import metrics
+from config import VAD_HANGOVER_MS, VAD_PREROLL_MS
+
+logger = logging.getLogger(__name__)
+
+VAD_FRAME_MS = 20
+MIN_SPEECH_DB = -45.0      # dBFS; quieter frames are never speech
+NOISE_MARGIN_DB = 10.0     # speech must be this far above the noise floor
+LOUD_MARGIN_DB = 10.0      # above threshold + this, ZCR is ignored
+MAX_VOICED_ZCR = 0.35      # zero crossings per sample for voiced speech
+NOISE_FLOOR_INIT_DB = -60.0
+NOISE_FLOOR_ALPHA = 0.05   # how fast the floor follows non-speech frames
+
+
+class VoiceActivityGate:
+    """Forward speech (plus pre-roll and hangover), drop silence."""
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        hangover_ms: int = VAD_HANGOVER_MS,
+        preroll_ms: int = VAD_PREROLL_MS,
+    ) -> None:
+        self.frame_samples = sample_rate * VAD_FRAME_MS // 1000
+        self.frame_bytes = self.frame_samples * 2  # pcm_s16le
+        self._hangover_frames = max(0, hangover_ms // VAD_FRAME_MS)
+        self._preroll: deque[bytes] = deque(maxlen=max(1, preroll_ms // VAD_FRAME_MS))
+        self._preroll_enabled = preroll_ms >= VAD_FRAME_MS
+        self._hang = 0
+        self._partial = b""
+        self.noise_floor_db = NOISE_FLOOR_INIT_DB
+        self.bytes_in = 0
+        self.bytes_forwarded = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return self._hang > 0
+
+    @property
+    def suppressed_fraction(self) -> float:
+        if not self.bytes_in:
+            return 0.0
+        return 1.0 - self.bytes_forwarded / self.bytes_in
+
+    def process(self, pcm: bytes | memoryview) -> bytes:
+        """Return the part of pcm (plus any released pre-roll) to send to STT."""
+        data = self._partial + bytes(pcm)
+        whole = len(data) // self.frame_bytes * self.frame_bytes
+        self._partial = data[whole:]
+        if not whole:
+            return b""
+        self.bytes_in += whole
+
+        samples = np.frombuffer(data, dtype="<i2", count=whole // 2).astype(np.float32) * (1.0 / 32768.0)
+        frames = samples.reshape(-1, self.frame_samples)
+        speech = self._classify(frames)
+
+        out: list[bytes] = []
+        for i, is_speech in enumerate(speech):
+            frame = data[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            if is_speech:
+                if self._preroll:
+                    out.extend(self._preroll)
+                    self._preroll.clear()
+                out.append(frame)
+                self._hang = self._hangover_frames + 1
+            elif self._hang > 0:
+                out.append(frame)
+                self._hang -= 1
+            elif self._preroll_enabled:
+                self._preroll.append(frame)
+
+        forwarded = b"".join(out)
+        self.bytes_forwarded += len(forwarded)
+        return forwarded
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        energy_db = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        threshold = max(MIN_SPEECH_DB, self.noise_floor_db + NOISE_MARGIN_DB)
+        speech = ((energy_db > threshold) & (zcr < MAX_VOICED_ZCR)) | (energy_db > threshold + LOUD_MARGIN_DB)
+
+        # Track the noise floor from this chunk's non-speech frames
+        quiet = energy_db[~speech]
+        if quiet.size:
+            floor = float(np.mean(quiet))
+            if floor < self.noise_floor_db:
+                self.noise_floor_db = floor
+            else:
+                self.noise_floor_db += NOISE_FLOOR_ALPHA * (floor - self.noise_floor_db)
+        return speech
+
+    def report(self, session_id: str = "") -> None:
+        """Record this session's suppression in /api/metrics and the log."""
+        if not self.bytes_in:
+            return
+        metrics.incr("vad.bytes_in", self.bytes_in)
+        metrics.incr("vad.bytes_forwarded", self.bytes_forwarded)
+        metrics.observe("vad.suppressed_fraction", self.suppressed_fraction)
+        logger.info(
+            "VAD suppressed %.0f%% of mic audio for session %s (%d of %d bytes forwarded)",
+            self.suppressed_fraction * 100, session_id, self.bytes_forwarded, self.bytes_in,
+        )
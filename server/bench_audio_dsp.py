@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: CPU cost of audio_dsp resampling per second of audio.
+
+Streams one second of noise through StreamResampler in realistic chunk sizes
+for the conversions a session can need: browser capture rates down to the
+16 kHz STT rate, and the 24 kHz TTS rate to common playback rates/encodings.
+"CPU %" is the share of one core needed to keep up with one real-time stream.
+
+Run from server/:  python bench_audio_dsp.py
+"""
+
+import time
+
+import numpy as np
+
+from audio_dsp import ENCODING_F32, ENCODING_S16, StreamResampler, encode_pcm
+
+SECONDS = 1.0
+REPEATS = 50
+
+# (label, src rate, dst rate, chunk samples at src rate, dst encoding)
+CASES = (
+    ("mic 48k -> 16k", 48000, 16000, 4096, ENCODING_S16),
+    ("mic 44.1k -> 16k", 44100, 16000, 4096, ENCODING_S16),
+    ("mic 22.05k -> 16k", 22050, 16000, 2048, ENCODING_S16),
+    ("tts 24k -> 48k", 24000, 48000, 2400, ENCODING_S16),
+    ("tts 24k -> 44.1k", 24000, 44100, 2400, ENCODING_S16),
+    ("tts 24k -> 24k f32", 24000, 24000, 2400, ENCODING_F32),
+)
+
+
+def bench(src_rate: int, dst_rate: int, chunk: int, dst_encoding: str) -> float:
+    """CPU seconds to convert SECONDS of s16le audio, averaged over REPEATS."""
+    rng = np.random.default_rng(0)
+    pcm = encode_pcm(rng.uniform(-0.5, 0.5, int(src_rate * SECONDS)).astype(np.float32))
+    chunk_bytes = chunk * 2
+    start = time.process_time()
+    for _ in range(REPEATS):
+        resampler = StreamResampler(src_rate, dst_rate)
+        for i in range(0, len(pcm), chunk_bytes):
+            resampler.process_pcm(pcm[i:i + chunk_bytes], ENCODING_S16, dst_encoding)
+    return (time.process_time() - start) / REPEATS
+
+
+def main() -> None:
+    print("audio_dsp CPU cost per second of audio")
+    print("=" * 60)
+    print(f"{'conversion':<20} {'chunk':>7} {'ms CPU / s':>11} {'CPU %':>8}")
+    for label, src, dst, chunk, encoding in CASES:
+        cpu = bench(src, dst, chunk, encoding)
+        print(f"{label:<20} {chunk:>7} {cpu * 1000:>11.3f} {cpu / SECONDS * 100:>7.3f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: browser <-> server audio bandwidth and server CPU per session, PCM vs Opus.
+
+Bandwidth is per direction for continuous audio, including the 4-byte binary
+frame header (and base64 + JSON envelope for the json transport). Opus sizes
+are measured on a synthetic voiced signal when opuslib/libopus is installed;
+otherwise the nominal bitrate is shown. CPU covers what the server does per
+session: decode 16 kHz mic packets and encode 24 kHz TTS audio.
+
+Run from server/:  python bench_audio_opus.py
+"""
+
+import base64
+import json
+import time
+
+import numpy as np
+
+from audio_dsp import encode_pcm
+from audio_opus import OPUS_AVAILABLE, OPUS_BITRATE, OPUS_FRAME_MS, OpusDecoder, OpusEncoder
+from audio_protocol import HEADER_SIZE
+
+UP_RATE = 16000
+DOWN_RATE = 24000
+PCM_FRAME_MS = 256  # the client's ScriptProcessor buffer (4096 samples @ 16 kHz)
+TTS_CHUNK_MS = 100
+SECONDS = 10
+
+
+def voiced(rate: int, seconds: float) -> bytes:
+    t = np.arange(int(rate * seconds)) / rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+    tone = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate((180, 360, 720, 1440), start=1))
+    noise = np.random.default_rng(0).normal(0, 0.01, t.size)
+    return encode_pcm((0.15 * envelope * tone + noise).astype(np.float32))
+
+
+def pcm_kbps(rate: int, frame_ms: int, transport: str) -> float:
+    payload = rate * 2 * frame_ms // 1000
+    if transport == "json":
+        frame = len(json.dumps({"type": "audio_chunk", "audio": base64.b64encode(bytes(payload)).decode()}))
+    else:
+        frame = HEADER_SIZE + payload
+    return frame * (1000 / frame_ms) * 8 / 1000
+
+
+def opus_kbps(rate: int) -> tuple[float, float, float]:
+    """(kbit/s on the wire, encode ms CPU per s, decode ms CPU per s)."""
+    pcm = voiced(rate, SECONDS)
+    encoder = OpusEncoder(rate)
+    start = time.process_time()
+    packets = encoder.encode(pcm) + encoder.flush()
+    encode_s = time.process_time() - start
+
+    decoder = OpusDecoder(rate)
+    start = time.process_time()
+    for packet in packets:
+        decoder.decode(packet)
+    decode_s = time.process_time() - start
+
+    wire = sum(HEADER_SIZE + len(p) for p in packets) * 8 / 1000 / SECONDS
+    return wire, encode_s / SECONDS * 1000, decode_s / SECONDS * 1000
+
+
+def main() -> None:
+    print("Audio transport bandwidth per session (kbit/s)")
+    print("=" * 60)
+    print(f"{'mode':<22} {'up (16 kHz)':>12} {'down (24 kHz)':>14}")
+    print(f"{'pcm / json':<22} {pcm_kbps(UP_RATE, PCM_FRAME_MS, 'json'):>12.1f} "
+          f"{pcm_kbps(DOWN_RATE, TTS_CHUNK_MS, 'json'):>14.1f}")
+    print(f"{'pcm / binary':<22} {pcm_kbps(UP_RATE, PCM_FRAME_MS, 'binary'):>12.1f} "
+          f"{pcm_kbps(DOWN_RATE, TTS_CHUNK_MS, 'binary'):>14.1f}")
+
+    if not OPUS_AVAILABLE:
+        nominal = (OPUS_BITRATE + HEADER_SIZE * 8 * 1000 / OPUS_FRAME_MS) / 1000
+        print(f"{'opus / binary (nominal)':<22} {nominal:>12.1f} {nominal:>14.1f}")
+        print("\nopuslib/libopus not installed — CPU cost not measured "
+              "(pip install opuslib; apt install libopus0)")
+        return
+
+    up_kbps, _, up_decode_ms = opus_kbps(UP_RATE)
+    down_kbps, down_encode_ms, _ = opus_kbps(DOWN_RATE)
+    print(f"{'opus / binary':<22} {up_kbps:>12.1f} {down_kbps:>14.1f}")
+
+    per_session_ms = up_decode_ms + down_encode_ms
+    print("\nServer CPU per concurrent session (Opus)")
+    print("=" * 60)
+    print(f"decode mic (16 kHz):   {up_decode_ms:7.3f} ms CPU / s of audio")
+    print(f"encode TTS (24 kHz):   {down_encode_ms:7.3f} ms CPU / s of audio")
+    print(f"total:                 {per_session_ms:7.3f} ms/s  "
+          f"(~{1000 / per_session_ms:.0f} full-duplex sessions per core)")
+
+
+if __name__ == "__main__":
+    main()
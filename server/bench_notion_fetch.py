@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: loading a deep curriculum page, serial vs breadth-first parallel fetch.
+
+Builds a synthetic curriculum in the local Notion stub (modules -> lessons ->
+steps as nested toggles, long sibling lists paged at PAGE_SIZE) with a fixed
+per-request latency, then times the old one-request-at-a-time walk against
+_fetch_all_blocks, with the rate limiter off and at Notion's ~3 req/s. Under
+the limit both are bound by the request budget; parallelism wins when the
+bucket has tokens to spare (bursts, small pages, or a higher NOTION_RATE_LIMIT).
+
+Run from server/:  python bench_notion_fetch.py
+"""
+
+import asyncio
+import time
+
+from notion.client import set_notion_client
+from notion.rate_limit import RateLimiter
+from notion.read_curriculum import FETCH_CONCURRENCY, _fetch_all_blocks
+from notion_stub import NotionStub
+
+LATENCY = 0.05   # seconds per request (a typical Notion round trip is 100-300 ms)
+PAGE_SIZE = 20
+MODULES = 6
+LESSONS = 5
+STEPS = 25       # > PAGE_SIZE so step lists need a second page
+
+
+def build(stub: NotionStub) -> None:
+    modules = [stub.block("toggle", f"Module {m}") for m in range(MODULES)]
+    stub.add_children("curriculum", [stub.block("heading_1", "Onboarding"), *modules])
+    for m, module in enumerate(modules):
+        lessons = [stub.block("toggle", f"Lesson {m}.{l}") for l in range(LESSONS)]
+        stub.add_children(module["id"], lessons)
+        for l, lesson in enumerate(lessons):
+            steps = [stub.block("to_do", f"Step {m}.{l}.{s}") for s in range(STEPS)]
+            stub.add_children(lesson["id"], steps)
+
+
+async def serial_fetch(client, block_id: str, limiter: RateLimiter) -> list[dict]:
+    """The previous depth-first walk: one request at a time."""
+    blocks: list[dict] = []
+    cursor = None
+    while True:
+        kwargs = {"block_id": block_id}
+        if cursor:
+            kwargs["start_cursor"] = cursor
+        await limiter.acquire()
+        response = await client.blocks.children.list(**kwargs)
+        for block in response.get("results", []):
+            if block.get("has_children"):
+                block["children"] = await serial_fetch(client, block["id"], limiter)
+            blocks.append(block)
+        if not response.get("has_more"):
+            return blocks
+        cursor = response.get("next_cursor")
+
+
+def count(blocks: list[dict]) -> int:
+    return sum(1 + count(b.get("children", [])) for b in blocks)
+
+
+async def run(label: str, stub: NotionStub, fetch) -> None:
+    stub.requests.clear()
+    stub.max_in_flight = 0
+    client = stub.client()
+    set_notion_client(client)
+    try:
+        start = time.perf_counter()
+        blocks = await fetch(client)
+        elapsed = time.perf_counter() - start
+    finally:
+        set_notion_client(None)
+        await client.aclose()
+    print(f"{label:<34} {count(blocks):>7} {len(stub.requests):>9} {stub.max_in_flight:>10} {elapsed:>8.2f}s")
+
+
+async def main() -> None:
+    with NotionStub(latency=LATENCY, page_size=PAGE_SIZE) as stub:
+        build(stub)
+        print(f"{MODULES} modules x {LESSONS} lessons x {STEPS} steps, {LATENCY * 1000:.0f} ms/request, "
+              f"page_size={PAGE_SIZE}, concurrency={FETCH_CONCURRENCY}\n")
+        print(f"{'':<34} {'blocks':>7} {'requests':>9} {'in flight':>10} {'wall':>9}")
+        await run("serial (before), no rate limit", stub,
+                  lambda c: serial_fetch(c, "curriculum", RateLimiter(rate=0)))
+        await run("parallel, no rate limit", stub,
+                  lambda c: _fetch_all_blocks("curriculum", limiter=RateLimiter(rate=0)))
+        await run("serial (before), 3 req/s burst 10", stub,
+                  lambda c: serial_fetch(c, "curriculum", RateLimiter(rate=3, burst=10)))
+        await run("parallel, 3 req/s burst 10", stub,
+                  lambda c: _fetch_all_blocks("curriculum", limiter=RateLimiter(rate=3, burst=10)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
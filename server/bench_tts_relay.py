@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-chunk CPU cost of relaying Cartesia TTS audio to the browser.
+
+Compares the previous relay (json.loads the whole Cartesia message, then
+re-serialize the base64 payload with send_json) against the passthrough in
+cartesia_tts (parse only the metadata, splice/decode the payload once). The
+"json+cache" row adds the decode speak() does when the utterance completes
+short enough for the audio cache, amortized per chunk.
+
+Run from server/:  python bench_tts_relay.py
+"""
+
+import base64
+import binascii
+import json
+import os
+import time
+import uuid
+
+from audio_protocol import KIND_AUDIO_OUT, pack_audio_frame
+from cartesia_tts import split_tts_message, _AUDIO_CHUNK_PREFIX, _AUDIO_CHUNK_SUFFIX, _decoded_len
+
+SAMPLE_RATE = 24000
+BYTES_PER_SAMPLE = 2
+CHUNK_MS = (20, 40, 100)
+ITERATIONS = 20000
+
+
+def make_message(chunk_ms: int) -> str:
+    pcm = os.urandom(SAMPLE_RATE * BYTES_PER_SAMPLE * chunk_ms // 1000)
+    return json.dumps({
+        "type": "chunk",
+        "data": base64.b64encode(pcm).decode(),
+        "done": False,
+        "status_code": 206,
+        "step_time": 12.5,
+        "context_id": str(uuid.uuid4()),
+    })
+
+
+# --- Relay implementations (what happens to each chunk before ws.send) ---
+
+def old_json(raw: str) -> str:
+    msg = json.loads(raw)
+    # Starlette's send_json serializes with these options
+    return json.dumps({"type": "audio_chunk", "audio": msg["data"]}, separators=(",", ":"), ensure_ascii=False)
+
+
+def old_binary(raw: str) -> bytes:
+    msg = json.loads(raw)
+    return pack_audio_frame(KIND_AUDIO_OUT, 0, base64.b64decode(msg["data"]))
+
+
+def new_json(raw: str) -> str:
+    # As in CartesiaTTS.speak: byte accounting for the cache budget and the
+    # sent total, no decode
+    _meta, audio_b64 = split_tts_message(raw)
+    _decoded_len(audio_b64)
+    _decoded_len(audio_b64)
+    return _AUDIO_CHUNK_PREFIX + audio_b64 + _AUDIO_CHUNK_SUFFIX
+
+
+def new_json_cached(raw: str) -> str:
+    _meta, audio_b64 = split_tts_message(raw)
+    _decoded_len(audio_b64)
+    _decoded_len(audio_b64)
+    binascii.a2b_base64(audio_b64)  # decoded once at done for tts_cache.put
+    return _AUDIO_CHUNK_PREFIX + audio_b64 + _AUDIO_CHUNK_SUFFIX
+
+
+def new_binary(raw: str) -> bytes:
+    _meta, audio_b64 = split_tts_message(raw)
+    return pack_audio_frame(KIND_AUDIO_OUT, 0, binascii.a2b_base64(audio_b64))
+
+
+def per_chunk_us(fn, raw: str) -> float:
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        fn(raw)
+    return (time.process_time() - start) / ITERATIONS * 1e6
+
+
+def main() -> None:
+    print("TTS relay CPU cost per chunk (24 kHz pcm_s16le)")
+    print("=" * 74)
+    print(f"{'chunk':>7} {'path':<10} {'old µs':>9} {'new µs':>9} {'speedup':>8} {'new CPU% @ realtime':>20}")
+    for chunk_ms in CHUNK_MS:
+        raw = make_message(chunk_ms)
+        chunks_per_sec = 1000 / chunk_ms
+        paths = (
+            ("json", old_json, new_json),
+            ("json+cache", old_json, new_json_cached),
+            ("binary", old_binary, new_binary),
+        )
+        for label, old_fn, new_fn in paths:
+            old_us = per_chunk_us(old_fn, raw)
+            new_us = per_chunk_us(new_fn, raw)
+            cpu_pct = new_us * chunks_per_sec / 1e4
+            print(f"{chunk_ms:>5}ms {label:<10} {old_us:>9.2f} {new_us:>9.2f} {old_us / new_us:>7.1f}x {cpu_pct:>19.3f}%")
+
+
+if __name__ == "__main__":
+    main()
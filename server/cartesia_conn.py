@@ -0,0 +1,255 @@
+"""
+Reconnecting WebSocket connection shared by CartesiaSTT and CartesiaTTS.
+
+Owns the socket, its keepalive pings and a small state machine:
+
+    idle -> connecting -> connected -> backoff -> connecting -> ... -> closed
+
+Exactly one reconnect loop runs at a time, with jittered exponential backoff
+between attempts, so an outage costs a handful of handshakes instead of one per
+audio frame. Binary data sent while the socket is down is held in a bounded
+buffer (oldest bytes dropped first) and flushed once the connection is back.
+Reconnects, failed attempts and dropped bytes are counted in /api/metrics
+under cartesia.<name>.*.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections import deque
+from enum import Enum
+from typing import Awaitable, Callable
+
+import websockets
+from websockets.asyncio.client import ClientConnection
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PING_INTERVAL = 60  # seconds — keeps the connection alive (Cartesia timeout is 180s)
+BACKOFF_BASE = 0.5  # seconds before the first reconnect attempt
+BACKOFF_MAX = 30.0  # cap on the delay between attempts
+
+
+class ConnState(Enum):
+    IDLE = "idle"
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    BACKOFF = "backoff"
+    CLOSED = "closed"
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """Delay before reconnect attempt n (0-based): base * 2^n, capped, with 50-100% jitter."""
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+class CartesiaConnection:
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        on_connect: Callable[[ClientConnection], Awaitable[None] | None] | None = None,
+        buffer_bytes: int = 0,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+    ) -> None:
+        """on_connect runs after every successful (re)connect, before buffered
+        data is flushed — used to start the client's reader task."""
+        self.name = name
+        self._url = url
+        self._headers = headers
+        self._on_connect = on_connect
+        self._buffer: deque[bytes] = deque()
+        self._buffered = 0
+        self._reported = 0
+        self.buffer_bytes = buffer_bytes
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+
+        self.state = ConnState.IDLE
+        self.ws: ClientConnection | None = None
+        self._connected = asyncio.Event()
+        self._reconnect_task: asyncio.Task | None = None
+        self._ping_task: asyncio.Task | None = None
+
+        self.reconnects = 0
+        self.connect_failures = 0
+        self.dropped_bytes = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.state is ConnState.CONNECTED and self.ws is not None and self.ws.close_code is None
+
+    async def connect(self) -> None:
+        """Connect now; raises if the handshake fails (no retry)."""
+        self._set_state(ConnState.CONNECTING)
+        try:
+            ws = await self._open()
+        except Exception:
+            self._set_state(ConnState.IDLE)
+            raise
+        await self._connected_to(ws)
+        if self._ping_task is None:
+            self._ping_task = asyncio.create_task(self._keepalive())
+
+    async def wait_connected(self, timeout: float | None = None) -> ClientConnection | None:
+        """Return the live socket, waiting up to timeout for a reconnect.
+
+        Starts a reconnect if none is running. Returns None on timeout or close.
+        """
+        if self.state is ConnState.CLOSED:
+            return None
+        if self.ws is not None and self.ws.close_code is not None:
+            self.connection_lost(self.ws)
+        if self.healthy:
+            return self.ws
+        self._schedule_reconnect()
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.ws if self.healthy else None
+
+    def connection_lost(self, ws: ClientConnection | None) -> bool:
+        """Report that ws died. Returns False if ws was already replaced."""
+        if ws is not self.ws or self.state is ConnState.CLOSED:
+            return False
+        self.ws = None
+        self._connected.clear()
+        self._set_state(ConnState.BACKOFF)
+        self._schedule_reconnect()
+        return True
+
+    async def send(self, data: bytes | memoryview | str) -> bool:
+        """Send on the live socket, or buffer binary data until reconnected.
+
+        Returns True if the data was sent immediately.
+        """
+        ws = self.ws
+        if self.healthy and not self._buffer:
+            try:
+                await ws.send(data)
+                return True
+            except websockets.ConnectionClosed:
+                logger.warning("Cartesia %s send failed (closed)", self.name)
+                self.connection_lost(ws)
+        elif self.state is not ConnState.CLOSED:
+            self._schedule_reconnect()
+        if not isinstance(data, str):
+            self._hold(bytes(data))
+        return False
+
+    def clear_buffer(self) -> None:
+        self._buffer.clear()
+        self._buffered = 0
+        self._update_buffer_gauge()
+
+    async def close(self) -> None:
+        self._set_state(ConnState.CLOSED)
+        self._connected.set()  # release waiters
+        for task in (self._reconnect_task, self._ping_task):
+            if task:
+                task.cancel()
+        self.clear_buffer()
+        ws, self.ws = self.ws, None
+        if ws:
+            await ws.close()
+
+    # --- Internals ---
+
+    async def _open(self) -> ClientConnection:
+        if self._headers:
+            return await websockets.connect(self._url, additional_headers=self._headers)
+        return await websockets.connect(self._url)
+
+    async def _connected_to(self, ws: ClientConnection) -> None:
+        self.ws = ws
+        self._set_state(ConnState.CONNECTED)
+        if self._on_connect:
+            result = self._on_connect(ws)
+            if asyncio.iscoroutine(result):
+                await result
+        self._connected.set()
+        await self._flush()
+
+    def _schedule_reconnect(self) -> None:
+        if self.state is ConnState.CLOSED:
+            return
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self) -> None:
+        attempt = 0
+        while self.state is not ConnState.CLOSED and not self.healthy:
+            self._set_state(ConnState.BACKOFF)
+            await asyncio.sleep(backoff_delay(attempt, self._backoff_base, self._backoff_max))
+            if self.state is ConnState.CLOSED:
+                return
+            self._set_state(ConnState.CONNECTING)
+            try:
+                ws = await self._open()
+            except Exception as e:
+                attempt += 1
+                self.connect_failures += 1
+                metrics.incr(f"cartesia.{self.name}.connect_failures")
+                logger.error("Cartesia %s reconnect failed (attempt %d): %s", self.name, attempt, e)
+                continue
+            self.reconnects += 1
+            metrics.incr(f"cartesia.{self.name}.reconnects")
+            logger.info("Cartesia %s reconnected", self.name)
+            await self._connected_to(ws)
+            if self._ping_task is None:
+                self._ping_task = asyncio.create_task(self._keepalive())
+
+    async def _flush(self) -> None:
+        while self._buffer and self.healthy:
+            chunk = self._buffer.popleft()
+            self._buffered -= len(chunk)
+            try:
+                await self.ws.send(chunk)
+            except websockets.ConnectionClosed:
+                self._buffer.appendleft(chunk)
+                self._buffered += len(chunk)
+                self.connection_lost(self.ws)
+                break
+        self._update_buffer_gauge()
+
+    def _hold(self, chunk: bytes) -> None:
+        if self.buffer_bytes <= 0:
+            self._drop(len(chunk))
+            return
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+        while self._buffered > self.buffer_bytes:
+            oldest = self._buffer.popleft()
+            self._buffered -= len(oldest)
+            self._drop(len(oldest))
+        self._update_buffer_gauge()
+
+    def _drop(self, size: int) -> None:
+        self.dropped_bytes += size
+        metrics.incr(f"cartesia.{self.name}.dropped_bytes", size)
+
+    def _update_buffer_gauge(self) -> None:
+        # Gauge is shared by every connection with this name, so report deltas
+        metrics.add_gauge(f"cartesia.{self.name}.buffered_bytes", self._buffered - self._reported)
+        self._reported = self._buffered
+
+    def _set_state(self, state: ConnState) -> None:
+        if state is not self.state:
+            logger.debug("Cartesia %s: %s -> %s", self.name, self.state.value, state.value)
+            self.state = state
+
+    async def _keepalive(self) -> None:
+        """Send periodic WebSocket pings to prevent idle timeout."""
+        while self.state is not ConnState.CLOSED:
+            await asyncio.sleep(PING_INTERVAL)
+            if self.healthy:
+                try:
+                    await self.ws.ping()
+                except Exception:
+                    pass
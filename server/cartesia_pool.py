@@ -0,0 +1,184 @@
+"""
+Process-level pool of pre-warmed Cartesia STT and TTS connections.
+
+Opening a Cartesia WebSocket costs a TLS + WebSocket handshake, which used to
+dominate session start. The pool keeps a few connected clients idle (their own
+_keepalive pings hold the sockets open), hands one to each session on
+start_session, and takes it back when the session ends. A health loop drops
+dead idle clients and tops the pool back up.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+import metrics
+from cartesia_stt import CartesiaSTT
+from cartesia_tts import CartesiaTTS
+from config import CARTESIA_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+HEALTH_INTERVAL = 15  # seconds between idle-connection health sweeps
+
+C = TypeVar("C", CartesiaSTT, CartesiaTTS)
+
+
+class _ClientPool(Generic[C]):
+    """Idle list of connected clients of one kind."""
+
+    def __init__(self, name: str, factory: Callable[[], C], size: int) -> None:
+        self.name = name
+        self._factory = factory
+        self.size = size
+        self._idle: list[C] = []
+        self._filling = False
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    async def lease(self) -> C:
+        while self._idle:
+            client = self._idle.pop()
+            if client.healthy:
+                metrics.incr(f"cartesia_pool.{self.name}.leased_warm")
+                self._update_gauge()
+                return client
+            await self._discard(client)
+        # Pool exhausted — fall back to a fresh connection
+        metrics.incr(f"cartesia_pool.{self.name}.leased_cold")
+        self._update_gauge()
+        client = self._factory()
+        await client.connect()
+        return client
+
+    async def release(self, client: C, reusable: bool = True) -> None:
+        if reusable and client.healthy and len(self._idle) < self.size:
+            self._idle.append(client)
+        else:
+            await self._discard(client)
+        self._update_gauge()
+
+    async def fill(self) -> None:
+        """Connect clients until the idle list is back at its target size."""
+        if self._filling:
+            return
+        self._filling = True
+        try:
+            while len(self._idle) < self.size:
+                client = self._factory()
+                try:
+                    await client.connect()
+                except Exception as e:
+                    logger.warning("Cartesia %s pool warm-up failed: %s", self.name, e)
+                    await self._discard(client)
+                    break
+                self._idle.append(client)
+                metrics.incr(f"cartesia_pool.{self.name}.connects")
+        finally:
+            self._filling = False
+            self._update_gauge()
+
+    async def sweep(self) -> None:
+        """Drop idle clients whose socket has died."""
+        # Partition before awaiting anything, so clients leased or released
+        # while the dead ones close are not lost
+        dead = [client for client in self._idle if not client.healthy]
+        self._idle[:] = [client for client in self._idle if client.healthy]
+        self._update_gauge()
+        for client in dead:
+            metrics.incr(f"cartesia_pool.{self.name}.unhealthy")
+            await self._discard(client)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for client in idle:
+            await self._discard(client)
+        self._update_gauge()
+
+    async def _discard(self, client: C) -> None:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.debug("Error closing pooled %s client: %s", self.name, e)
+
+    def _update_gauge(self) -> None:
+        metrics.set_gauge(f"cartesia_pool.{self.name}.idle", len(self._idle))
+
+
+class CartesiaPool:
+    """Leases warm CartesiaSTT / CartesiaTTS clients to WebSocket sessions."""
+
+    def __init__(
+        self,
+        size: int = CARTESIA_POOL_SIZE,
+        stt_factory: Callable[[], CartesiaSTT] = CartesiaSTT,
+        tts_factory: Callable[[], CartesiaTTS] = CartesiaTTS,
+    ) -> None:
+        self.stt = _ClientPool("stt", stt_factory, size)
+        self.tts = _ClientPool("tts", tts_factory, size)
+        self._health_task: asyncio.Task | None = None
+        self._refill_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Pre-warm both pools and start the health loop."""
+        await asyncio.gather(self.stt.fill(), self.tts.fill())
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+        logger.info("Cartesia pool warm: %d STT, %d TTS", self.stt.idle_count, self.tts.idle_count)
+
+    async def lease_stt(
+        self,
+        on_transcript: Callable[[str], Awaitable[None]],
+        on_event: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> CartesiaSTT:
+        client = await self.stt.lease()
+        client.bind(on_transcript, on_event)
+        self._schedule_refill()
+        return client
+
+    async def release_stt(self, client: CartesiaSTT) -> None:
+        # Stays out of the idle list until late transcripts for the old
+        # session are flushed; a client that can't confirm that is closed
+        flushed = await client.unbind()
+        if not flushed:
+            metrics.incr("cartesia_pool.stt.unflushed")
+        await self.stt.release(client, reusable=flushed)
+
+    async def lease_tts(self) -> CartesiaTTS:
+        client = await self.tts.lease()
+        self._schedule_refill()
+        return client
+
+    async def release_tts(self, client: CartesiaTTS) -> None:
+        await self.tts.release(client)
+
+    async def close(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        await asyncio.gather(self.stt.close(), self.tts.close())
+
+    def _schedule_refill(self) -> None:
+        # Only refill pools that were started; an unstarted pool just connects on demand
+        if self._health_task is None:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self) -> None:
+        await asyncio.gather(self.stt.fill(), self.tts.fill())
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(HEALTH_INTERVAL)
+            try:
+                await asyncio.gather(self.stt.sweep(), self.tts.sweep())
+                await asyncio.gather(self.stt.fill(), self.tts.fill())
+            except Exception as e:
+                logger.error("Cartesia pool health check error: %s", e)
+
+
+cartesia_pool = CartesiaPool()
@@ -7,9 +7,9 @@ import logging
 from typing import Any, Callable, Awaitable
 
 import websockets
-from websockets.asyncio.client import ClientConnection
-
-from config import CARTESIA_API_KEY
+from audio_uplink import STT_SAMPLE_RATE
+from cartesia_conn import CartesiaConnection
+from config import CARTESIA_API_KEY, STT_RECONNECT_BUFFER_MS
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,7 @@ STT_URL = (
     "?model=ink-whisper"
     "&language=en"
     "&encoding=pcm_s16le"
-    "&sample_rate=16000"
+    f"&sample_rate={STT_SAMPLE_RATE}"
 )
 
 STT_HEADERS = {
@@ -27,60 +27,104 @@ STT_HEADERS = {
 }
 
 
-PING_INTERVAL = 60  # seconds — keeps the connection alive (Cartesia timeout is 180s)
+STT_BYTES_PER_MS = 32  # 16 kHz pcm_s16le mono
+FINALIZE_TIMEOUT = 2.0  # seconds unbind waits for Cartesia to acknowledge a finalize
 
 
 class CartesiaSTT:
-    def __init__(self, on_transcript: Callable[[str], Awaitable[None]]) -> None:
+    def __init__(
+        self,
+        on_transcript: Callable[[str], Awaitable[None]] | None = None,
+        on_event: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+        url: str = STT_URL,
+    ) -> None:
+        """on_transcript fires for final transcripts; on_event gets every
+        transcript event (interim and final) in arrival order."""
         self._on_transcript = on_transcript
-        self._ws: ClientConnection | None = None
+        self._on_event = on_event
+        self._conn = CartesiaConnection(
+            "stt",
+            url,
+            headers=STT_HEADERS,
+            buffer_bytes=STT_RECONNECT_BUFFER_MS * STT_BYTES_PER_MS,
+        )
         self._receive_task: asyncio.Task | None = None
-        self._ping_task: asyncio.Task | None = None
-        self._latest_event: dict[str, Any] | None = None
+        self._dispatch_task: asyncio.Task | None = None
+        self._events: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._flushed: asyncio.Event | None = None  # set when a finalize is acknowledged
         self._closed = False
 
     async def connect(self) -> None:
-        self._ws = await websockets.connect(
-            STT_URL,
-            additional_headers=STT_HEADERS,
-        )
+        await self._conn.connect()
         self._receive_task = asyncio.create_task(self._receive_loop())
-        self._ping_task = asyncio.create_task(self._keepalive())
+        self._dispatch_task = asyncio.create_task(self._dispatch_events())
         logger.info("Cartesia STT connected")
 
-    async def _keepalive(self) -> None:
-        """Send periodic WebSocket pings to prevent idle timeout."""
-        while not self._closed:
-            await asyncio.sleep(PING_INTERVAL)
-            if self._ws and self._ws.close_code is None:
-                try:
-                    await self._ws.ping()
-                except Exception:
-                    pass
-
-    async def _reconnect(self) -> None:
-        """Reconnect the STT WebSocket after timeout or disconnect."""
-        if self._closed:
-            return
+    @property
+    def healthy(self) -> bool:
+        return not self._closed and self._conn.healthy
+
+    @property
+    def connection(self) -> CartesiaConnection:
+        return self._conn
+
+    def bind(
+        self,
+        on_transcript: Callable[[str], Awaitable[None]] | None,
+        on_event: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> None:
+        """Point transcript callbacks at a (new) session — used by the connection pool."""
+        self._on_transcript = on_transcript
+        self._on_event = on_event
+
+    async def unbind(self) -> bool:
+        """Detach from the current session: flush pending audio and drop its events.
+
+        Transcripts for audio the old session already sent can arrive after
+        this, so it waits for Cartesia to acknowledge the finalize (dropping
+        anything that comes first). Returns False if that didn't happen within
+        FINALIZE_TIMEOUT, in which case the client must not be reused.
+        """
+        self._on_transcript = None
+        self._on_event = None
+        while not self._events.empty():
+            self._events.get_nowait()
+        # Audio buffered during a reconnect belongs to the old session
+        self._conn.clear_buffer()
+        if not self._conn.healthy:
+            return False
+        self._flushed = asyncio.Event()
         try:
-            self._ws = await websockets.connect(
-                STT_URL,
-                additional_headers=STT_HEADERS,
-            )
-            logger.info("Cartesia STT reconnected")
-        except Exception as e:
-            logger.error("STT reconnect failed: %s", e)
-            self._ws = None
+            if not await self._conn.send("finalize"):
+                return False
+            await asyncio.wait_for(self._flushed.wait(), timeout=FINALIZE_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning("STT finalize not acknowledged within %.1fs", FINALIZE_TIMEOUT)
+            return False
+        finally:
+            self._flushed = None
+
+    async def _dispatch_events(self) -> None:
+        """Deliver transcript events to on_event in order, off the receive loop."""
+        while not self._closed:
+            event = await self._events.get()
+            handler = self._on_event
+            if handler is None:
+                continue
+            try:
+                await handler(event)
+            except Exception as e:
+                logger.error("STT event handler error: %s", e)
 
     async def _receive_loop(self) -> None:
-        """Receive transcripts, auto-reconnect on disconnect/timeout."""
+        """Receive transcripts; the connection handles reconnect with backoff."""
         while not self._closed:
-            if not self._ws:
-                await asyncio.sleep(1)
-                await self._reconnect()
+            ws = await self._conn.wait_connected()
+            if ws is None:
                 continue
             try:
-                async for raw in self._ws:
+                async for raw in ws:
                     try:
                         msg = json.loads(raw)
                     except (json.JSONDecodeError, TypeError):
@@ -91,14 +135,19 @@ class CartesiaSTT:
                     if msg_type == "transcript":
                         text = msg.get("text", "") or msg.get("transcript", "")
                         is_final = msg.get("is_final", False)
-                        self._latest_event = {
-                            "text": text,
-                            "is_final": is_final,
-                        }
+                        if self._on_event:
+                            self._events.put_nowait({
+                                "text": text,
+                                "is_final": is_final,
+                            })
 
-                        if is_final and text.strip():
+                        if is_final and text.strip() and self._on_transcript:
                             asyncio.create_task(self._on_transcript(text.strip()))
 
+                    elif msg_type == "flush_done":
+                        if self._flushed is not None:
+                            self._flushed.set()
+
                     elif msg_type == "done":
                         logger.info("STT session done, will reconnect")
                         break
@@ -108,44 +157,35 @@ class CartesiaSTT:
             except Exception as e:
                 logger.error("STT receive error: %s", e, exc_info=True)
 
-            # Connection lost or session done — reconnect
-            self._ws = None
-            if not self._closed:
-                await asyncio.sleep(0.5)
-                await self._reconnect()
+            # Connection lost or session done — hand off to the reconnect loop
+            if self._conn.connection_lost(ws):
+                await ws.close()
 
     async def send_audio(self, audio_b64: str) -> None:
         """Send base64-encoded PCM audio to Cartesia STT as raw binary."""
-        if not self._ws:
-            await self._reconnect()
-        if not self._ws:
-            return
+        await self.send_pcm(base64.b64decode(audio_b64))
+
+    async def send_pcm(self, audio_bytes: bytes | memoryview) -> None:
+        """Send raw PCM audio to Cartesia STT as a binary frame.
+
+        While the socket is reconnecting the audio is buffered (bounded by
+        STT_RECONNECT_BUFFER_MS) and sent once it is back.
+        """
         try:
-            audio_bytes = base64.b64decode(audio_b64)
-            await self._ws.send(audio_bytes)
-        except websockets.ConnectionClosed:
-            logger.warning("STT send failed (closed), reconnecting")
-            self._ws = None
-            await self._reconnect()
+            await self._conn.send(audio_bytes)
         except Exception as e:
             logger.error("STT send error: %s", e)
 
-    def get_latest_event(self) -> dict[str, Any] | None:
-        """Return and clear the latest transcript event."""
-        event = self._latest_event
-        self._latest_event = None
-        return event
-
     async def close(self) -> None:
         self._closed = True
         if self._receive_task:
             self._receive_task.cancel()
-        if self._ping_task:
-            self._ping_task.cancel()
-        if self._ws:
+        if self._dispatch_task:
+            self._dispatch_task.cancel()
+        if self._conn.healthy:
             try:
-                await self._ws.send("done")
+                await self._conn.send("done")
             except Exception:
                 pass
-            await self._ws.close()
+        await self._conn.close()
         logger.info("STT closed")
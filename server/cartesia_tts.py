@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import binascii
 import json
 import logging
+import re
 import uuid
 from typing import Any
 
@@ -11,8 +14,12 @@ from websockets.asyncio.client import ClientConnection
 from fastapi import WebSocket, WebSocketDisconnect
 from uvicorn.protocols.utils import ClientDisconnected
 
+from audio_dsp import ENCODING_S16, StreamResampler, convert_pcm, sample_width
+from audio_protocol import KIND_AUDIO_OUT, TRANSPORT_BINARY, pack_audio_frame
+from cartesia_conn import CartesiaConnection
 from config import CARTESIA_API_KEY, CARTESIA_VOICE_ID
 from models import MSG_AUDIO_CHUNK, MSG_AUDIO_DONE, SessionState
+from tts_cache import tts_cache
 
 logger = logging.getLogger(__name__)
 
@@ -22,104 +29,205 @@ TTS_URL = (
     f"&cartesia_version=2024-06-10"
 )
 
-PING_INTERVAL = 60  # seconds — keeps the connection alive (Cartesia timeout is 180s)
+CONNECT_WAIT = 5.0  # seconds speak() waits for a reconnect before giving up
+RECV_TIMEOUT = 10.0  # seconds without a message for a context before giving up on it
+
+TTS_MODEL_ID = "sonic-3"
+# Canonical format: what the audio cache stores and what clients get by default
+TTS_SAMPLE_RATE = 24000
+TTS_ENCODING = ENCODING_S16
+# Output rates Cartesia can produce directly; anything else is resampled here
+CARTESIA_SAMPLE_RATES = (8000, 16000, 22050, 24000, 44100, 48000)
+
+# Locates the base64 audio payload inside a Cartesia "chunk" message so it can
+# be relayed as-is instead of being decoded and re-serialized with the JSON.
+_DATA_FIELD_RE = re.compile(r'"data"\s*:\s*"')
+
+# Pre-serialized envelope for JSON-transport audio chunks; the payload is
+# spliced in verbatim (base64 never needs JSON escaping).
+_AUDIO_CHUNK_PREFIX = '{"type":%s,"audio":"' % json.dumps(MSG_AUDIO_CHUNK)
+_AUDIO_CHUNK_SUFFIX = '"}'
+
+
+def _decoded_len(audio_b64: str) -> int:
+    """Byte length of a base64 payload without decoding it."""
+    return len(audio_b64) * 3 // 4 - audio_b64[-2:].count("=")
+
+
+def split_tts_message(raw: str) -> tuple[dict[str, Any], str | None]:
+    """Split a Cartesia TTS message into (metadata, base64 audio payload).
+
+    Only the small metadata part (type, context_id, done, ...) goes through
+    ``json.loads``; the audio payload is sliced out of the raw text untouched.
+    Messages without a ``data`` string are parsed normally.
+    """
+    match = _DATA_FIELD_RE.search(raw)
+    if match is None:
+        return json.loads(raw), None
+    start = match.end()
+    end = raw.index('"', start)
+    meta = json.loads(raw[:match.start()] + '"data":null' + raw[end + 1:])
+    return meta, raw[start:end]
+
+
+# Queue item for a context: a parsed (metadata, base64 audio) message, or None
+# when the context ends without a "done" (socket lost, cancelled, client closed).
+ContextMessage = tuple[dict[str, Any], str | None] | None
 
 
 class CartesiaTTS:
-    def __init__(self) -> None:
-        self._ws: ClientConnection | None = None
+    """One Cartesia TTS socket shared by any number of concurrent contexts.
+
+    A single reader task owns ``recv()`` and routes each message to the queue
+    registered for its context_id, so overlapping speak/synthesize calls never
+    consume each other's audio.
+    """
+
+    def __init__(self, url: str = TTS_URL) -> None:
+        self._conn = CartesiaConnection("tts", url, on_connect=self._start_reader)
         self._closed = False
-        self._ping_task: asyncio.Task | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._contexts: dict[str, asyncio.Queue[ContextMessage]] = {}
 
     async def connect(self) -> None:
-        self._ws = await websockets.connect(TTS_URL)
-        self._ping_task = asyncio.create_task(self._keepalive())
+        await self._conn.connect()
         logger.info("Cartesia TTS connected")
 
-    async def _keepalive(self) -> None:
-        """Send periodic WebSocket pings to prevent idle timeout."""
-        while not self._closed:
-            await asyncio.sleep(PING_INTERVAL)
-            if self._ws and self._ws.close_code is None:
+    @property
+    def healthy(self) -> bool:
+        return not self._closed and self._conn.healthy
+
+    @property
+    def connection(self) -> CartesiaConnection:
+        return self._conn
+
+    # --- Demultiplexing ---
+
+    def _start_reader(self, ws: ClientConnection) -> None:
+        if self._reader_task and not self._reader_task.done():
+            self._reader_task.cancel()
+        self._reader_task = asyncio.create_task(self._read_loop(ws))
+
+    async def _read_loop(self, ws: ClientConnection) -> None:
+        """Route every message on ws to its context's queue."""
+        try:
+            async for raw in ws:
                 try:
-                    await self._ws.ping()
-                except Exception:
-                    pass
-
-    async def _ensure_connected(self) -> bool:
-        """Reconnect if the WebSocket is dead. Returns True if connected."""
-        if self._closed:
-            return False
-        if self._ws:
-            try:
-                if self._ws.close_code is not None:
-                    self._ws = None
-            except Exception:
-                self._ws = None
-        if not self._ws:
-            try:
-                self._ws = await websockets.connect(TTS_URL)
-                logger.info("Cartesia TTS reconnected")
-            except Exception as e:
-                logger.error("TTS reconnect failed: %s", e)
-                return False
-        return True
+                    msg, audio_b64 = split_tts_message(raw)
+                except (ValueError, TypeError):
+                    continue
+                queue = self._contexts.get(msg.get("context_id", ""))
+                if queue is not None:
+                    queue.put_nowait((msg, audio_b64))
+                elif msg.get("type") == "error" and not msg.get("context_id"):
+                    logger.error("TTS error response: %s", msg)
+                # Otherwise the context was cancelled or timed out — drop it
+        except websockets.ConnectionClosed:
+            logger.warning("TTS connection closed, will reconnect next call")
+        except Exception as e:
+            logger.error("TTS reader error: %s", e, exc_info=True)
+        finally:
+            if self._conn.connection_lost(ws):
+                # Wake every context still waiting on this socket
+                for queue in self._contexts.values():
+                    queue.put_nowait(None)
 
-    async def speak(self, text: str, client_ws: WebSocket, session: SessionState) -> None:
-        """Send text to TTS and stream audio chunks back to the client."""
-        if not text.strip():
-            return
+    def _open_context(self, context_id: str) -> asyncio.Queue[ContextMessage]:
+        queue: asyncio.Queue[ContextMessage] = asyncio.Queue()
+        self._contexts[context_id] = queue
+        return queue
 
-        if not await self._ensure_connected():
-            return
+    def _close_context(self, context_id: str) -> None:
+        queue = self._contexts.pop(context_id, None)
+        if queue is not None:
+            queue.put_nowait(None)
 
+    async def _start_context(
+        self,
+        text: str,
+        voice_id: str,
+        sample_rate: int = TTS_SAMPLE_RATE,
+        encoding: str = TTS_ENCODING,
+    ) -> tuple[str, asyncio.Queue[ContextMessage]] | None:
+        """Open a context and send its generation request."""
+        if self._closed or await self._conn.wait_connected(CONNECT_WAIT) is None:
+            logger.warning("TTS unavailable (%s), skipping utterance", self._conn.state.value)
+            return None
         context_id = str(uuid.uuid4())
-        session.tts_context_id = context_id
-        session.is_speaking = True
+        queue = self._open_context(context_id)
+        request = self._build_request(context_id, text, voice_id, sample_rate, encoding)
+        logger.info("TTS sending request: %s", json.dumps(request)[:200])
+        if not await self._conn.send(json.dumps(request)):
+            self._close_context(context_id)
+            return None
+        return context_id, queue
 
-        request = {
-            "context_id": context_id,
-            "model_id": "sonic-3",
-            "transcript": text,
-            "voice": {
-                "mode": "id",
-                "id": CARTESIA_VOICE_ID,
-            },
-            "output_format": {
-                "container": "raw",
-                "encoding": "pcm_s16le",
-                "sample_rate": 24000,
-            },
-        }
+    async def speak(self, text: str, client_ws: WebSocket, session: SessionState) -> int:
+        """Send text to TTS and stream audio chunks back to the client.
+
+        Audio is produced in the session's negotiated rate/encoding. Returns the
+        number of bytes sent, so callers can estimate how long the client will
+        be playing.
+        """
+        if not text.strip():
+            return 0
+
+        cached = tts_cache.get(CARTESIA_VOICE_ID, TTS_MODEL_ID, text)
+        if cached is not None:
+            return await self.play_pcm(cached, client_ws, session)
+
+        rate, encoding = session.output_sample_rate, session.output_encoding
+        # Ask Cartesia for the client's format when it can make it; otherwise
+        # take the canonical format and resample each chunk on the way out.
+        resampler = None
+        if rate not in CARTESIA_SAMPLE_RATES:
+            resampler = StreamResampler(TTS_SAMPLE_RATE, rate)
+            request_rate, request_encoding = TTS_SAMPLE_RATE, TTS_ENCODING
+        else:
+            request_rate, request_encoding = rate, encoding
+
+        # Chunks are kept base64-encoded for the audio cache and decoded once
+        # the utterance completes; past the cache budget they aren't kept.
+        cache_chunks: list[str] = []
+        cache_budget = tts_cache.max_bytes * (request_rate * sample_width(request_encoding)) // (
+            TTS_SAMPLE_RATE * sample_width(TTS_ENCODING))
+        cache_bytes = 0
+        sent = 0
+        context_id = ""
+        session.is_speaking = True
 
         try:
-            logger.info("TTS sending request: %s", json.dumps(request)[:200])
-            await self._ws.send(json.dumps(request))
-            logger.info("TTS request sent, waiting for response...")
+            started = await self._start_context(text, CARTESIA_VOICE_ID, request_rate, request_encoding)
+            if started is None:
+                return 0
+            context_id, queue = started
+            session.tts_context_id = context_id
 
             chunk_count = 0
             while session.is_speaking:
                 try:
-                    raw = await asyncio.wait_for(self._ws.recv(), timeout=10.0)
+                    item = await asyncio.wait_for(queue.get(), timeout=RECV_TIMEOUT)
                 except asyncio.TimeoutError:
                     logger.warning("TTS recv timeout after %d chunks", chunk_count)
                     break
+                if item is None:
+                    break
+                msg, audio_b64 = item
 
-                try:
-                    msg = json.loads(raw)
-                except (json.JSONDecodeError, TypeError):
-                    continue
-
-                if msg.get("context_id") != context_id:
-                    continue
-
-                if msg.get("type") == "chunk" and "data" in msg:
+                if msg.get("type") == "chunk" and audio_b64 is not None:
                     chunk_count += 1
+                    if cache_budget > 0:
+                        cache_chunks.append(audio_b64)
+                        cache_bytes += _decoded_len(audio_b64)
+                        if cache_bytes > cache_budget:
+                            cache_budget = 0  # too long to cache
+                            cache_chunks.clear()
                     try:
-                        await client_ws.send_json({
-                            "type": MSG_AUDIO_CHUNK,
-                            "audio": msg["data"],
-                        })
+                        if resampler is None:
+                            sent += await self._send_pcm(client_ws, session, None, audio_b64)
+                        else:
+                            out = resampler.process_pcm(binascii.a2b_base64(audio_b64), TTS_ENCODING, encoding)
+                            sent += await self._send_pcm(client_ws, session, out)
                     except (WebSocketDisconnect, ClientDisconnected):
                         logger.warning("Client disconnected during TTS, stopping audio stream")
                         break
@@ -129,46 +237,169 @@ class CartesiaTTS:
 
                 if msg.get("done", False):
                     logger.info("TTS done, sent %d chunks", chunk_count)
+                    # Only complete utterances are worth replaying
+                    if cache_chunks:
+                        pcm = b"".join(binascii.a2b_base64(c) for c in cache_chunks)
+                        tts_cache.put(
+                            CARTESIA_VOICE_ID, TTS_MODEL_ID, text,
+                            convert_pcm(pcm, request_rate, TTS_SAMPLE_RATE, request_encoding, TTS_ENCODING),
+                        )
                     break
 
-        except websockets.ConnectionClosed:
-            logger.warning("TTS connection closed during speak, will reconnect next call")
-            self._ws = None
         except Exception as e:
             logger.error("TTS speak error: %s", e, exc_info=True)
-            self._ws = None
         finally:
-            session.is_speaking = False
-            session.tts_context_id = ""
-            try:
-                await client_ws.send_json({"type": MSG_AUDIO_DONE, "interrupted": False})
-            except (WebSocketDisconnect, ClientDisconnected, Exception):
-                logger.debug("Client disconnected before audio_done message")
+            self._contexts.pop(context_id, None)
+            await self._finish(client_ws, session)
+        return sent
+
+    async def play_pcm(self, pcm: bytes, client_ws: WebSocket, session: SessionState) -> int:
+        """Stream already-synthesized PCM to the client without touching Cartesia.
+
+        pcm is in the canonical format and is converted to the session's.
+        Returns the number of bytes sent.
+        """
+        rate, encoding = session.output_sample_rate, session.output_encoding
+        pcm = convert_pcm(pcm, TTS_SAMPLE_RATE, rate, TTS_ENCODING, encoding)
+        # ~100 ms pieces, sample-aligned
+        width = sample_width(encoding)
+        chunk_bytes = rate * width // 10 // width * width
+
+        session.is_speaking = True
+        sent = 0
+        try:
+            for i in range(0, len(pcm), chunk_bytes):
+                if not session.is_speaking:
+                    break
+                sent += await self._send_pcm(client_ws, session, pcm[i:i + chunk_bytes])
+        except (WebSocketDisconnect, ClientDisconnected):
+            logger.warning("Client disconnected during cached playback")
+        finally:
+            await self._finish(client_ws, session)
+        return sent
+
+    async def synthesize(self, text: str, voice_id: str = CARTESIA_VOICE_ID) -> bytes | None:
+        """Synthesize text to a single PCM buffer (no client involved).
+
+        Safe to call concurrently with speak() and other synthesize() calls on
+        the same connection, e.g. to prepare the next sentence during playback.
+        """
+        if not text.strip():
+            return None
+        started = await self._start_context(text, voice_id)
+        if started is None:
+            return None
+        context_id, queue = started
+
+        chunks: list[bytes] = []
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), timeout=RECV_TIMEOUT)
+                if item is None:
+                    return None
+                msg, audio_b64 = item
+                if msg.get("type") == "chunk" and audio_b64 is not None:
+                    chunks.append(binascii.a2b_base64(audio_b64))
+                elif msg.get("type") == "error":
+                    logger.error("TTS error response: %s", msg)
+                    return None
+                if msg.get("done", False):
+                    return b"".join(chunks)
+        finally:
+            self._contexts.pop(context_id, None)
+
+    @staticmethod
+    def _build_request(
+        context_id: str,
+        text: str,
+        voice_id: str,
+        sample_rate: int = TTS_SAMPLE_RATE,
+        encoding: str = TTS_ENCODING,
+    ) -> dict[str, Any]:
+        return {
+            "context_id": context_id,
+            "model_id": TTS_MODEL_ID,
+            "transcript": text,
+            "voice": {
+                "mode": "id",
+                "id": voice_id,
+            },
+            "output_format": {
+                "container": "raw",
+                "encoding": encoding,
+                "sample_rate": sample_rate,
+            },
+        }
+
+    async def _finish(self, client_ws: WebSocket, session: SessionState) -> None:
+        session.is_speaking = False
+        session.tts_context_id = ""
+        try:
+            if session.opus_encoder is not None:
+                # Last partial Opus frame of the utterance
+                for packet in session.opus_encoder.flush():
+                    await self._send_frame(client_ws, session, packet)
+            await client_ws.send_json({"type": MSG_AUDIO_DONE, "interrupted": False})
+        except (WebSocketDisconnect, ClientDisconnected, Exception):
+            logger.debug("Client disconnected before audio_done message")
+
+    async def _send_pcm(
+        self,
+        client_ws: WebSocket,
+        session: SessionState,
+        pcm: bytes | None,
+        audio_b64: str | None = None,
+    ) -> int:
+        """Send one audio chunk using the session's negotiated transport.
+
+        When the chunk came from Cartesia, ``audio_b64`` is its original
+        payload and pcm may be None: JSON clients get the payload spliced into
+        a pre-built envelope, so it is only decoded for binary/Opus clients.
+        Returns the number of PCM bytes sent.
+        """
+        if session.opus_encoder is None and session.audio_transport != TRANSPORT_BINARY:
+            if audio_b64 is None:
+                audio_b64 = base64.b64encode(pcm).decode()
+            await client_ws.send_text(_AUDIO_CHUNK_PREFIX + audio_b64 + _AUDIO_CHUNK_SUFFIX)
+            return len(pcm) if pcm is not None else _decoded_len(audio_b64)
+        if pcm is None:
+            pcm = binascii.a2b_base64(audio_b64)
+        if session.opus_encoder is not None:
+            for packet in session.opus_encoder.encode(pcm):
+                await self._send_frame(client_ws, session, packet)
+        else:
+            await self._send_frame(client_ws, session, pcm)
+        return len(pcm)
+
+    @staticmethod
+    async def _send_frame(client_ws: WebSocket, session: SessionState, payload: bytes) -> None:
+        await client_ws.send_bytes(pack_audio_frame(KIND_AUDIO_OUT, session.audio_out_seq, payload))
+        session.audio_out_seq += 1
 
     async def cancel(self, session: SessionState) -> None:
-        """Cancel current TTS playback (barge-in)."""
+        """Cancel current TTS playback (barge-in), including cached playback."""
+        session.is_speaking = False
         if not session.tts_context_id:
-            return
+            return  # cached audio (play_pcm) stops at its next chunk
 
-        session.is_speaking = False
+        self._close_context(session.tts_context_id)
         cancel_msg = {
             "context_id": session.tts_context_id,
             "cancel": True,
         }
-        if self._ws:
+        if self._conn.healthy:
             try:
-                await self._ws.send(json.dumps(cancel_msg))
-            except websockets.ConnectionClosed:
-                logger.warning("TTS cancel failed (connection closed)")
-                self._ws = None
+                if not await self._conn.send(json.dumps(cancel_msg)):
+                    logger.warning("TTS cancel failed (connection closed)")
             except Exception as e:
                 logger.error("TTS cancel error: %s", e)
         session.tts_context_id = ""
 
     async def close(self) -> None:
         self._closed = True
-        if self._ping_task:
-            self._ping_task.cancel()
-        if self._ws:
-            await self._ws.close()
+        if self._reader_task:
+            self._reader_task.cancel()
+        for context_id in list(self._contexts):
+            self._close_context(context_id)
+        await self._conn.close()
         logger.info("TTS closed")
@@ -11,3 +11,20 @@ NOTION_CURRICULUM_PAGE_ID = os.environ.get("NOTION_CURRICULUM_PAGE_ID", "").stri
 REPO_PATH = os.environ.get("REPO_PATH", "").strip()
 CARTESIA_VOICE_ID = os.environ.get("CARTESIA_VOICE_ID", "f114a467-c40a-4db8-964d-aaba89cd08fa").strip()
 PORT = int(os.environ.get("PORT", "3000").strip())
+STT_PACKET_MS = int(os.environ.get("STT_PACKET_MS", "40").strip())  # 20-100 ms packets to Cartesia STT
+STT_JITTER_MS = int(os.environ.get("STT_JITTER_MS", "20").strip())  # max extra wait before flushing a partial packet
+AUDIO_QUEUE_FRAMES = int(os.environ.get("AUDIO_QUEUE_FRAMES", "50").strip())  # per-session mic frames awaiting STT
+AUDIO_QUEUE_POLICY = os.environ.get("AUDIO_QUEUE_POLICY", "drop_oldest").strip()  # "drop_oldest" or "coalesce"
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tts_cache")).strip()
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)).strip())  # LRU budget for replayable TTS audio
+TTS_CACHE_PERSIST = os.environ.get("TTS_CACHE_PERSIST", "").strip().lower() in ("1", "true", "yes")
+CARTESIA_POOL_SIZE = int(os.environ.get("CARTESIA_POOL_SIZE", "2").strip())  # idle warm STT and TTS sockets each
+STT_RECONNECT_BUFFER_MS = int(os.environ.get("STT_RECONNECT_BUFFER_MS", "3000").strip())  # mic audio held while STT reconnects
+VAD_ENABLED = os.environ.get("VAD_ENABLED", "true").strip().lower() in ("1", "true", "yes")  # gate silence before STT
+VAD_HANGOVER_MS = int(os.environ.get("VAD_HANGOVER_MS", "400").strip())  # audio kept flowing after speech stops
+VAD_PREROLL_MS = int(os.environ.get("VAD_PREROLL_MS", "200").strip())  # audio sent from before speech starts
+NOTION_RATE_LIMIT = float(os.environ.get("NOTION_RATE_LIMIT", "3").strip())  # average Notion requests/second (0 = unlimited)
+NOTION_RATE_BURST = int(os.environ.get("NOTION_RATE_BURST", "10").strip())  # requests allowed back-to-back before pacing
+CURRICULUM_CACHE_DIR = os.environ.get("CURRICULUM_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".curriculum_cache")).strip()  # "" disables
+TRAIL_JOURNAL_PATH = os.environ.get("TRAIL_JOURNAL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".trail_journal.jsonl")).strip()  # "" disables
+REPO_REGISTRY_SIZE = int(os.environ.get("REPO_REGISTRY_SIZE", "8").strip())  # repo contexts kept once no session uses them
@@ -62,6 +62,10 @@ QUICK_RESPONSES = {
     ],
 }
 
+# Fixed lines spoken by the WebSocket handler
+GOODBYE_MESSAGE = "Goodbye! Great session. Check your Onboarding Trail in Notion for a summary."
+TIMEOUT_FALLBACK = "I'm still looking into that, but I can tell you this is an interesting question!"
+
 # Greeting patterns — only match standalone greetings, not words containing them
 GREETING_PATTERNS = ["hello", "hey there", "greetings"]
 # "hi" and "hey" only match at the START of the sentence to avoid false positives
@@ -80,11 +84,28 @@ def get_thinking_filler() -> str:
     return random.choice(THINKING_FILLERS)
 
 
+def get_thinking_fillers(count: int) -> list[str]:
+    """Get up to `count` distinct thinking fillers, in random order."""
+    return random.sample(THINKING_FILLERS, min(count, len(THINKING_FILLERS)))
+
+
 def get_ready_transition() -> str:
     """Get a transition phrase when ready with the answer."""
     return random.choice(READY_TRANSITIONS)
 
 
+def canned_phrases() -> list[str]:
+    """Every fixed phrase we may speak — pre-synthesized at startup (see tts_cache)."""
+    return [
+        *IMMEDIATE_RESPONSES,
+        *THINKING_FILLERS,
+        *READY_TRANSITIONS,
+        *QUICK_RESPONSES["greeting"],
+        GOODBYE_MESSAGE,
+        TIMEOUT_FALLBACK,
+    ]
+
+
 def classify_question_type(user_text: str) -> str:
     """Quick classification for immediate responses.
 
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import shutil
 from pathlib import Path
@@ -8,7 +9,11 @@ from fastapi.responses import FileResponse
 
 import config
 from ws_handler import handle_websocket
-from api_routes import api_router, set_repo_path
+from api_routes import api_router
+from tts_cache import warm_phrase_cache
+from cartesia_pool import cartesia_pool
+from notion.client import close_notion_client
+from notion.write_trail import trail_writer
 
 logging.basicConfig(
     level=logging.INFO,
@@ -49,14 +54,31 @@ async def startup():
 
     if not config.CARTESIA_API_KEY:
         logger.warning("CARTESIA_API_KEY not set")
+    else:
+        # Pre-synthesize canned acknowledgments/fillers in the background
+        app.state.phrase_cache_task = asyncio.create_task(warm_phrase_cache(config.CARTESIA_VOICE_ID))
+        # Pre-warm Cartesia STT/TTS sockets so sessions skip the handshake
+        app.state.cartesia_pool_task = asyncio.create_task(cartesia_pool.start())
     if not config.ANTHROPIC_API_KEY:
         logger.warning("ANTHROPIC_API_KEY not set")
     if not config.REPO_PATH:
         logger.warning("REPO_PATH not set — you can pass it in start_session")
 
+    # One trail writer for every session; first deliver whatever a previous
+    # run queued but never got into Notion
+    trail_writer.restore()
+    trail_writer.start()
+
     logger.info("RepoBuddy starting on port %d", config.PORT)
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    await cartesia_pool.close()
+    await trail_writer.stop()
+    await close_notion_client()
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -0,0 +1,60 @@
+"""
+Process-wide counters, gauges and summaries for the voice pipeline.
+
+Deliberately tiny: plain dicts updated from the event loop, exposed as JSON at
+GET /api/metrics. Names are dotted, e.g. "stt_uplink.packets_out".
+"""
+from __future__ import annotations
+
+from typing import Any
+
+_counters: dict[str, float] = {}
+_gauges: dict[str, float] = {}
+_summaries: dict[str, dict[str, float]] = {}
+
+
+def incr(name: str, value: float = 1) -> None:
+    """Add to a monotonically increasing counter."""
+    _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name: str, value: float) -> None:
+    """Set a gauge to an absolute value."""
+    _gauges[name] = value
+
+
+def add_gauge(name: str, delta: float) -> None:
+    """Move a gauge up or down (e.g. a depth summed across sessions)."""
+    _gauges[name] = _gauges.get(name, 0) + delta
+
+
+def observe(name: str, value: float) -> None:
+    """Record one sample into a count/sum/min/max/last summary."""
+    s = _summaries.get(name)
+    if s is None:
+        _summaries[name] = {"count": 1, "sum": value, "min": value, "max": value, "last": value}
+        return
+    s["count"] += 1
+    s["sum"] += value
+    s["min"] = min(s["min"], value)
+    s["max"] = max(s["max"], value)
+    s["last"] = value
+
+
+def snapshot() -> dict[str, Any]:
+    """Return a JSON-serializable copy of all metrics."""
+    summaries = {}
+    for name, s in _summaries.items():
+        summaries[name] = {**s, "avg": s["sum"] / s["count"] if s["count"] else 0}
+    return {
+        "counters": dict(_counters),
+        "gauges": dict(_gauges),
+        "summaries": summaries,
+    }
+
+
+def reset() -> None:
+    """Clear all metrics."""
+    _counters.clear()
+    _gauges.clear()
+    _summaries.clear()
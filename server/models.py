@@ -22,6 +22,7 @@ MSG_QUEST_RESULT = "quest_result"
 MSG_SESSION_INFO = "session_info"
 MSG_MODE_CHANGED = "mode_changed"
 MSG_CURRICULUM = "curriculum"
+MSG_TRAIL_INFO = "trail_info"
 MSG_ERROR = "error"
 
 
@@ -127,6 +128,28 @@ class Curriculum:
             ],
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> Curriculum:
+        return cls(
+            title=data.get("title", "Untitled Curriculum"),
+            goals=data.get("goals", []),
+            modules=[
+                CurriculumModule(
+                    name=m.get("name", ""),
+                    topics=m.get("topics", []),
+                    key_files=m.get("key_files", []),
+                )
+                for m in data.get("modules", [])
+            ],
+            milestones=[
+                CurriculumMilestone(
+                    description=ms.get("description", ""),
+                    day_target=ms.get("day_target", 1),
+                )
+                for ms in data.get("milestones", [])
+            ],
+        )
+
 
 # --- Quest types ---
 
@@ -171,6 +194,14 @@ class SessionState:
     glossary: dict[str, str] = field(default_factory=dict)
     is_speaking: bool = False
     tts_context_id: str = ""
+    audio_transport: str = "json"  # "json" (base64) or "binary" frames
+    audio_out_seq: int = 0
+    # Audio formats negotiated in start_session (see audio_dsp)
+    input_sample_rate: int = 16000
+    output_sample_rate: int = 24000
+    output_encoding: str = "pcm_s16le"
+    audio_codec: str = "pcm"  # "pcm" or "opus" (binary transport only, see audio_opus)
+    opus_encoder: Any = None  # audio_opus.OpusEncoder for TTS audio when audio_codec is "opus"
 
     def add_turn(self, role: str, content: str) -> None:
         self.conversation_history.append({"role": role, "content": content})
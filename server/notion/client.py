@@ -1,20 +1,50 @@
 from __future__ import annotations
 
 import logging
-from notion_client import Client
+
+import httpx
+from notion_client import AsyncClient
 
 from config import NOTION_API_KEY
 
 logger = logging.getLogger(__name__)
 
-_client: Client | None = None
+# One pooled HTTP client shared by every session; Notion requests never block
+# the event loop (audio streaming runs on the same loop).
+MAX_CONNECTIONS = 10
+KEEPALIVE_CONNECTIONS = 5
+TIMEOUT_SECONDS = 30.0
+
+_client: AsyncClient | None = None
 
 
-def get_notion_client() -> Client | None:
+def get_notion_client() -> AsyncClient | None:
     global _client
+    if _client is not None:
+        return _client
     if not NOTION_API_KEY:
         logger.warning("NOTION_API_KEY not set — Notion features disabled")
         return None
-    if _client is None:
-        _client = Client(auth=NOTION_API_KEY)
+    http = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=TIMEOUT_SECONDS,
+    )
+    _client = AsyncClient(auth=NOTION_API_KEY, client=http, timeout_ms=int(TIMEOUT_SECONDS * 1000))
     return _client
+
+
+def set_notion_client(client: AsyncClient | None) -> None:
+    """Replace the shared client (e.g. one pointed at a local fake server in tests)."""
+    global _client
+    _client = client
+
+
+async def close_notion_client() -> None:
+    """Close the shared client's connection pool on shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
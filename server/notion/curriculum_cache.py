@@ -0,0 +1,110 @@
+"""
+On-disk cache of parsed curricula.
+
+Loading a curriculum means crawling every block of the Notion page and an LLM
+extraction. Both only depend on the page content, so the parsed Curriculum is
+stored under CURRICULUM_CACHE_DIR keyed by page id and the page's
+``last_edited_time`` (one cheap ``pages.retrieve`` per session start). Editing
+any block bumps that timestamp, which invalidates the entry.
+
+Notion only keeps last_edited_time to the minute, so an edit made later in the
+same minute as the crawl leaves it unchanged. Entries therefore also record
+when the crawl started, and one crawled within the minute of the page's last
+edit is not trusted: the next load crawls again.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import metrics
+from config import CURRICULUM_CACHE_DIR
+from models import Curriculum
+
+logger = logging.getLogger(__name__)
+
+# Bump when the parsing changes so entries built by the old parser are ignored.
+CACHE_VERSION = 3
+
+EDIT_TIME_RESOLUTION = timedelta(minutes=1)  # precision of Notion's last_edited_time
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _settled(last_edited_time: str, crawled_at: str | None) -> bool:
+    """Whether a crawl is guaranteed to include every edit up to last_edited_time."""
+    edited, crawled = _parse_time(last_edited_time), _parse_time(crawled_at)
+    if edited is None or crawled is None:
+        return False
+    edited = edited.replace(second=0, microsecond=0)
+    return crawled >= edited + EDIT_TIME_RESOLUTION
+
+
+class CurriculumCache:
+    def __init__(self, cache_dir: str = CURRICULUM_CACHE_DIR) -> None:
+        self._dir = Path(cache_dir) if cache_dir else None
+
+    def _path(self, page_id: str) -> Path | None:
+        if self._dir is None:
+            return None
+        return self._dir / f"{page_id.replace('-', '')}.json"
+
+    def get(self, page_id: str, last_edited_time: str) -> Curriculum | None:
+        path = self._path(page_id)
+        if path is None or not path.is_file():
+            metrics.incr("curriculum_cache.misses")
+            return None
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read cached curriculum %s: %s", path, e)
+            metrics.incr("curriculum_cache.misses")
+            return None
+        if entry.get("version") != CACHE_VERSION or entry.get("last_edited_time") != last_edited_time:
+            metrics.incr("curriculum_cache.misses")
+            return None
+        if not _settled(last_edited_time, entry.get("crawled_at")):
+            # Crawled in the same minute as the last edit; a later edit could be hiding
+            metrics.incr("curriculum_cache.misses")
+            metrics.incr("curriculum_cache.unsettled")
+            return None
+        metrics.incr("curriculum_cache.hits")
+        return Curriculum.from_dict(entry["curriculum"])
+
+    def put(
+        self,
+        page_id: str,
+        last_edited_time: str,
+        curriculum: Curriculum,
+        crawled_at: datetime | None = None,
+    ) -> None:
+        """Store a curriculum; crawled_at is when its block crawl started (default now)."""
+        path = self._path(page_id)
+        if path is None:
+            return
+        crawled_at = crawled_at or datetime.now(timezone.utc)
+        entry = {
+            "version": CACHE_VERSION,
+            "page_id": page_id,
+            "last_edited_time": last_edited_time,
+            "crawled_at": crawled_at.isoformat(),
+            "curriculum": curriculum.to_dict(),
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entry, indent=2))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Could not persist curriculum %s: %s", path, e)
+
+
+curriculum_cache = CurriculumCache()
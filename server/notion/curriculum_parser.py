@@ -0,0 +1,193 @@
+"""
+Deterministic curriculum parser for well-structured Notion pages.
+
+Most curriculum pages follow the same layout, which can be read straight from
+the blocks without an LLM:
+
+    # Backend onboarding            <- title (the only top-level heading)
+    ## Goals                        <- list items become goals
+    - Ship a fix in week one
+    ## Modules                      <- optional wrapper heading
+    ### Audio pipeline              <- each heading / toggle below is a module
+    - Speech to text `server/cartesia_stt.py`
+    ## Milestones                   <- list items; "Day N" / "Week N" -> day_target
+    - Day 5: first PR merged
+
+List items (bullets, numbers, to-dos, toggles) under a module are its topics;
+inline code that looks like a path is a key file. Sections with only prose
+(an intro) and reference sections ("Resources", "Who to ask", ...) are
+skipped. parse_curriculum returns None when the page does not fit — no
+modules found, modules given as a flat list, or nothing marking the page as a
+curriculum (a Modules, Goals or Milestones heading, or a key file) — and
+load_curriculum falls back to the LLM extractor.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from models import Curriculum, CurriculumMilestone, CurriculumModule
+
+_HEADINGS = {"heading_1": 1, "heading_2": 2, "heading_3": 3}
+_TOGGLE_LEVEL = 4  # a top-level toggle nests below any heading
+_LIST_TYPES = {"bulleted_list_item", "numbered_list_item", "to_do", "toggle"}
+
+_GOAL_NAMES = {"goals", "goal", "objectives", "learning goals", "outcomes"}
+_MILESTONE_NAMES = {"milestones", "milestone", "timeline", "schedule", "checkpoints"}
+_MODULE_NAMES = {"modules", "curriculum", "topics", "syllabus"}
+_SKIP_NAMES = {
+    "resources", "links", "references", "further reading", "reading",
+    "who to ask", "contacts", "people", "team", "faq", "notes",
+    "intro", "introduction", "overview", "about", "welcome",
+}
+
+_DAY_RE = re.compile(r"\b(day|week)\s*(\d+)\b", re.IGNORECASE)
+_BACKTICK_RE = re.compile(r"`([^`]+)`")
+_PATH_RE = re.compile(r"^[\w.\-]+(/[\w.\-]*)*$")
+_ITEM_PUNCT = " \t:-–—,;"
+
+
+@dataclass
+class _Section:
+    level: int
+    name: str
+    body: list[dict[str, Any]] = field(default_factory=list)
+
+
+def _rich_text(block: dict[str, Any]) -> list[dict[str, Any]]:
+    return block.get(block.get("type", ""), {}).get("rich_text", [])
+
+
+def _plain(block: dict[str, Any]) -> str:
+    return "".join(rt.get("plain_text", "") for rt in _rich_text(block)).strip()
+
+
+def _looks_like_path(text: str) -> bool:
+    return ("/" in text or "." in text) and " " not in text and bool(_PATH_RE.match(text))
+
+
+def _split_item(block: dict[str, Any]) -> tuple[str, list[str]]:
+    """Block text with code-formatted paths removed, and the paths."""
+    text_parts: list[str] = []
+    files: list[str] = []
+    for rt in _rich_text(block):
+        plain = rt.get("plain_text", "")
+        if rt.get("annotations", {}).get("code") and _looks_like_path(plain.strip()):
+            files.append(plain.strip())
+        else:
+            text_parts.append(plain)
+    text = "".join(text_parts)
+    for match in _BACKTICK_RE.finditer(text):
+        if _looks_like_path(match.group(1).strip()):
+            files.append(match.group(1).strip())
+    text = _BACKTICK_RE.sub(lambda m: "" if _looks_like_path(m.group(1).strip()) else m.group(1), text)
+    return re.sub(r"\s+", " ", text).strip(_ITEM_PUNCT), files
+
+
+def _sections(blocks: list[dict[str, Any]]) -> list[_Section]:
+    """Split top-level blocks into sections at headings and toggles."""
+    sections = [_Section(level=0, name="")]
+    for block in blocks:
+        btype = block.get("type", "")
+        if btype in _HEADINGS or (btype == "toggle" and block.get("children")):
+            level = _HEADINGS.get(btype, _TOGGLE_LEVEL)
+            # Toggleable headings carry their content as children
+            sections.append(_Section(level=level, name=_plain(block), body=list(block.get("children", []))))
+        else:
+            sections[-1].body.append(block)
+    return sections
+
+
+def _items(blocks: list[dict[str, Any]]) -> list[tuple[str, list[str]]]:
+    """Topic text and key files of every list item, including nested ones."""
+    items: list[tuple[str, list[str]]] = []
+    for block in blocks:
+        btype = block.get("type", "")
+        if btype in _LIST_TYPES:
+            items.append(_split_item(block))
+        elif btype == "code":
+            lines = [ln.strip() for ln in _plain(block).splitlines()]
+            items.append(("", [ln for ln in lines if _looks_like_path(ln)]))
+        elif btype in ("paragraph", "callout", "quote"):
+            items.append(("", _split_item(block)[1]))
+        items.extend(_items(block.get("children", [])))
+    return items
+
+
+def _module(section: _Section) -> CurriculumModule:
+    topics: list[str] = []
+    key_files: list[str] = []
+    for text, files in _items(section.body):
+        if text and text not in topics:
+            topics.append(text)
+        key_files.extend(f for f in files if f not in key_files)
+    return CurriculumModule(name=section.name, topics=topics, key_files=key_files)
+
+
+def _milestones(section: _Section) -> list[CurriculumMilestone]:
+    milestones: list[CurriculumMilestone] = []
+    for text, _ in _items(section.body):
+        if not text:
+            continue
+        match = _DAY_RE.search(text)
+        if match:
+            n = int(match.group(2))
+            day = n if match.group(1).lower() == "day" else (n - 1) * 5 + 1  # first working day of week N
+            description = (text[:match.start()] + text[match.end():]).strip(_ITEM_PUNCT) or text
+        else:
+            day = milestones[-1].day_target + 1 if milestones else 1
+            description = text
+        milestones.append(CurriculumMilestone(description=description, day_target=day))
+    return milestones
+
+
+def parse_curriculum(blocks: list[dict[str, Any]], title: str = "") -> Curriculum | None:
+    """Build a Curriculum from the page structure, or None if it doesn't fit."""
+    sections = _sections(blocks)[1:]  # text before the first heading is an intro
+    if not sections:
+        return None
+
+    # A single top-level heading is the page title, not a module
+    top = min(s.level for s in sections)
+    if sum(1 for s in sections if s.level == top) == 1 and sections[0].level == top and len(sections) > 1:
+        title = title or sections[0].name
+        sections = sections[1:]
+
+    goals: list[str] = []
+    milestones: list[CurriculumMilestone] = []
+    modules: list[CurriculumModule] = []
+    structured = False  # saw a heading or key file that only a curriculum has
+    skip_level = None  # inside a skipped section, down to this heading level
+    for section in sections:
+        if skip_level is not None and section.level > skip_level:
+            continue
+        skip_level = None
+        key = section.name.lower().strip(_ITEM_PUNCT)
+        if key in _SKIP_NAMES:
+            skip_level = section.level
+        elif key in _GOAL_NAMES:
+            structured = True
+            goals.extend(text for text, _ in _items(section.body) if text)
+        elif key in _MILESTONE_NAMES:
+            structured = True
+            milestones.extend(_milestones(section))
+        elif key in _MODULE_NAMES:
+            # Wrapper heading; the modules are the sections under it
+            structured = True
+            if any(b.get("type") in _LIST_TYPES for b in section.body):
+                return None  # modules as a flat list — no structure to read
+        else:
+            module = _module(section)
+            if module.topics or module.key_files:
+                modules.append(module)
+                structured = structured or bool(module.key_files)
+
+    if not modules or not structured:
+        return None
+    return Curriculum(
+        title=title or "Untitled Curriculum",
+        goals=goals,
+        modules=modules,
+        milestones=milestones,
+    )
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from config import NOTION_RATE_BURST, NOTION_RATE_LIMIT
+
+
+class RateLimiter:
+    """Token bucket shared by every Notion request in the process.
+
+    Notion allows an average of ~3 requests/second per integration with short
+    bursts above that; callers ``await acquire()`` before each request. Tokens
+    are reserved synchronously (the balance may go negative), so waiters are
+    served in arrival order without a lock tied to one event loop.
+    """
+
+    def __init__(self, rate: float = NOTION_RATE_LIMIT, burst: int = NOTION_RATE_BURST) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return  # unlimited
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+notion_rate_limiter = RateLimiter()
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+from datetime import datetime, timezone
 from typing import Any
 
+from notion_client import AsyncClient
+
+import metrics
 from notion.client import get_notion_client
+from notion.curriculum_cache import curriculum_cache
+from notion.curriculum_parser import parse_curriculum
+from notion.rate_limit import RateLimiter, notion_rate_limiter
 from anthropic_client import call_claude
 from orchestrator.prompts import CURRICULUM_EXTRACTOR_PROMPT
-from models import Curriculum, CurriculumModule, CurriculumMilestone
+from models import Curriculum
 
 logger = logging.getLogger(__name__)
 
+FETCH_CONCURRENCY = 6  # block-children requests in flight while loading a curriculum
+
 
 def _blocks_to_text(blocks: list[dict[str, Any]], indent: int = 0) -> str:
     """Convert Notion blocks to markdown-like text."""
@@ -64,84 +74,131 @@ def _extract_rich_text(block_data: dict[str, Any]) -> str:
     return "".join(parts)
 
 
-async def _fetch_all_blocks(page_id: str) -> list[dict[str, Any]]:
-    """Fetch all blocks from a Notion page, including children."""
-    client = get_notion_client()
-    if not client:
-        return []
-
+async def _list_children(
+    client: AsyncClient,
+    block_id: str,
+    slots: asyncio.Semaphore,
+    limiter: RateLimiter,
+) -> list[dict[str, Any]]:
+    """All direct children of one block (cursor pages are inherently sequential)."""
     blocks: list[dict[str, Any]] = []
     cursor = None
-
     while True:
-        kwargs: dict[str, Any] = {"block_id": page_id}
+        kwargs: dict[str, Any] = {"block_id": block_id}
         if cursor:
             kwargs["start_cursor"] = cursor
-        response = client.blocks.children.list(**kwargs)
-        results = response.get("results", [])
-        blocks.extend(results)
-
-        # Fetch children for blocks that have them
-        for block in results:
-            if block.get("has_children"):
-                children = await _fetch_all_blocks(block["id"])
-                block["children"] = children
-
+        async with slots:
+            await limiter.acquire()
+            response = await client.blocks.children.list(**kwargs)
+        blocks.extend(response.get("results", []))
         if not response.get("has_more"):
-            break
+            return blocks
         cursor = response.get("next_cursor")
 
-    return blocks
+
+async def _fetch_all_blocks(
+    page_id: str,
+    concurrency: int = FETCH_CONCURRENCY,
+    limiter: RateLimiter = notion_rate_limiter,
+) -> list[dict[str, Any]]:
+    """Fetch all blocks from a Notion page, including children.
+
+    Every block with children is fetched as soon as its parent's listing
+    arrives, so siblings (and their subtrees) load in parallel — at most
+    ``concurrency`` requests in flight, paced by the shared Notion rate limiter.
+    """
+    client = get_notion_client()
+    if not client:
+        return []
+
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_tree(block_id: str) -> list[dict[str, Any]]:
+        blocks = await _list_children(client, block_id, slots, limiter)
+        parents = [b for b in blocks if b.get("has_children")]
+        subtrees = await asyncio.gather(*(fetch_tree(b["id"]) for b in parents))
+        for block, children in zip(parents, subtrees):
+            block["children"] = children
+        return blocks
+
+    return await fetch_tree(page_id)
+
+
+async def _page_meta(page_id: str) -> tuple[str | None, str]:
+    """The page's last_edited_time and title — one metadata request, no block crawl."""
+    client = get_notion_client()
+    if not client:
+        return None, ""
+    try:
+        await notion_rate_limiter.acquire()
+        page = await client.pages.retrieve(page_id=page_id)
+    except Exception as e:
+        logger.warning("Could not read curriculum page metadata %s: %s", page_id, e)
+        return None, ""
+    title = ""
+    for prop in page.get("properties", {}).values():
+        if prop.get("type") == "title":
+            title = "".join(rt.get("plain_text", "") for rt in prop.get("title", [])).strip()
+    return page.get("last_edited_time"), title
+
+
+async def _extract_with_llm(blocks: list[dict[str, Any]]) -> Curriculum | None:
+    markdown_text = _blocks_to_text(blocks)
+    if not markdown_text.strip():
+        return None
+
+    # Use Claude to extract structured curriculum
+    prompt = CURRICULUM_EXTRACTOR_PROMPT.format(page_content=markdown_text)
+    result = await call_claude(prompt, max_tokens=2000)
+
+    # Parse JSON from response
+    # Try to find JSON in the response
+    json_str = result
+    if "```json" in result:
+        json_str = result.split("```json")[1].split("```")[0]
+    elif "```" in result:
+        json_str = result.split("```")[1].split("```")[0]
+
+    data = json.loads(json_str.strip())
+    return Curriculum.from_dict(data)
 
 
 async def load_curriculum(page_id: str) -> Curriculum | None:
-    """Read a Notion page and extract curriculum structure via Claude."""
+    """Read a Notion page and extract its curriculum structure.
+
+    Unchanged pages are served from the on-disk curriculum cache. Pages that
+    follow the standard layout are parsed locally; anything else goes to Claude.
+    """
     if not page_id:
         return None
 
+    last_edited, title = await _page_meta(page_id)
+    if last_edited:
+        cached = curriculum_cache.get(page_id, last_edited)
+        if cached:
+            logger.info("Curriculum %s unchanged since %s, using cached copy", page_id, last_edited)
+            return cached
+
+    crawled_at = datetime.now(timezone.utc)
     try:
         blocks = await _fetch_all_blocks(page_id)
         if not blocks:
             logger.warning("No blocks found in curriculum page %s", page_id)
             return None
 
-        markdown_text = _blocks_to_text(blocks)
-        if not markdown_text.strip():
-            return None
-
-        # Use Claude to extract structured curriculum
-        prompt = CURRICULUM_EXTRACTOR_PROMPT.format(page_content=markdown_text)
-        result = await call_claude(prompt, max_tokens=2000)
-
-        # Parse JSON from response
-        # Try to find JSON in the response
-        json_str = result
-        if "```json" in result:
-            json_str = result.split("```json")[1].split("```")[0]
-        elif "```" in result:
-            json_str = result.split("```")[1].split("```")[0]
-
-        data = json.loads(json_str.strip())
-
-        return Curriculum(
-            title=data.get("title", "Untitled Curriculum"),
-            goals=data.get("goals", []),
-            modules=[
-                CurriculumModule(
-                    name=m.get("name", ""),
-                    topics=m.get("topics", []),
-                    key_files=m.get("key_files", []),
-                )
-                for m in data.get("modules", [])
-            ],
-            milestones=[
-                CurriculumMilestone(
-                    description=ms.get("description", ""),
-                    day_target=ms.get("day_target", 1),
-                )
-                for ms in data.get("milestones", [])
-            ],
-        )
+        curriculum = parse_curriculum(blocks, title)
+        if curriculum:
+            metrics.incr("curriculum.parsed_locally")
+        else:
+            logger.info("Curriculum page %s doesn't follow the standard layout, extracting with Claude", page_id)
+            metrics.incr("curriculum.llm_extractions")
+            curriculum = await _extract_with_llm(blocks)
+            if not curriculum:
+                return None
     except Exception as e:
         logger.error("Failed to load curriculum: %s", e, exc_info=True)
         return None
+
+    if last_edited:
+        curriculum_cache.put(page_id, last_edited, curriculum, crawled_at)
+    return curriculum
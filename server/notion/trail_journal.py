@@ -0,0 +1,151 @@
+"""
+Append-only write-ahead journal for trail blocks waiting to reach Notion.
+
+Every block queued by a TrailWriter is written here first, as one JSON line,
+and acknowledged once Notion accepts it (or it is dropped as rejected). On
+startup the unacknowledged blocks are replayed into the writer, so a crash or
+``uvicorn --reload`` loses nothing that was queued. Records:
+
+    {"op": "add", "id": 7, "page": "<page id>", "block": {...}}
+    {"op": "ack", "ids": [5, 6, 7]}
+    {"op": "move", "from": "<placeholder>", "to": "<page id>"}
+
+The file is truncated once nothing is pending and otherwise rewritten with
+only the pending blocks every COMPACT_AFTER acknowledgements.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, TextIO
+
+from config import TRAIL_JOURNAL_PATH
+
+logger = logging.getLogger(__name__)
+
+COMPACT_AFTER = 500  # acknowledged records tolerated in the file before rewriting it
+
+
+class TrailJournal:
+    def __init__(self, path: str = TRAIL_JOURNAL_PATH) -> None:
+        self._path = Path(path) if path else None
+        self._file: TextIO | None = None
+        self._pending: dict[int, tuple[str, dict[str, Any]]] = {}
+        self._next_id = 1
+        self._acked_in_file = 0
+        self._loaded = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._path is not None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def replay(self) -> list[tuple[int, str, dict[str, Any]]]:
+        """Load the journal; returns unacknowledged (id, page_id, block) in order."""
+        self._load()
+        return [(entry_id, page_id, block) for entry_id, (page_id, block) in self._pending.items()]
+
+    def append(self, page_id: str, blocks: list[dict[str, Any]]) -> list[int]:
+        """Record blocks as pending; returns their journal ids."""
+        self._load()
+        ids = list(range(self._next_id, self._next_id + len(blocks)))
+        self._next_id += len(blocks)
+        lines = []
+        for entry_id, block in zip(ids, blocks):
+            self._pending[entry_id] = (page_id, block)
+            lines.append(json.dumps({"op": "add", "id": entry_id, "page": page_id, "block": block}))
+        self._write(lines)
+        return ids
+
+    def ack(self, ids: list[int]) -> None:
+        """Mark blocks as delivered (or given up on)."""
+        ids = [i for i in ids if i in self._pending]
+        if not ids:
+            return
+        for entry_id in ids:
+            del self._pending[entry_id]
+        if not self._pending:
+            self._rewrite()  # nothing left: truncate
+            return
+        self._write([json.dumps({"op": "ack", "ids": ids})])
+        self._acked_in_file += len(ids)
+        if self._acked_in_file >= COMPACT_AFTER:
+            self._rewrite()
+
+    def move(self, old_page_id: str, new_page_id: str) -> None:
+        """Re-target pending blocks (a placeholder page that now exists in Notion)."""
+        self._load()
+        for entry_id, (page_id, block) in self._pending.items():
+            if page_id == old_page_id:
+                self._pending[entry_id] = (new_page_id, block)
+        self._write([json.dumps({"op": "move", "from": old_page_id, "to": new_page_id})])
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._path is None or not self._path.is_file():
+            return
+        try:
+            with self._path.open() as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash mid-write
+                    if record.get("op") == "add":
+                        self._pending[record["id"]] = (record["page"], record["block"])
+                        self._next_id = max(self._next_id, record["id"] + 1)
+                    elif record.get("op") == "ack":
+                        for entry_id in record.get("ids", []):
+                            self._pending.pop(entry_id, None)
+                    elif record.get("op") == "move":
+                        for entry_id, (page_id, block) in self._pending.items():
+                            if page_id == record["from"]:
+                                self._pending[entry_id] = (record["to"], block)
+        except OSError as e:
+            logger.warning("Could not read trail journal %s: %s", self._path, e)
+            return
+        if self._pending:
+            logger.info("Trail journal has %d undelivered blocks", len(self._pending))
+        self._rewrite()
+
+    def _write(self, lines: list[str]) -> None:
+        if self._path is None:
+            return
+        try:
+            if self._file is None:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self._path.open("a")
+            self._file.write("".join(line + "\n" for line in lines))
+            self._file.flush()
+        except OSError as e:
+            logger.warning("Could not write trail journal %s: %s", self._path, e)
+
+    def _rewrite(self) -> None:
+        """Replace the file with just the pending blocks."""
+        if self._path is None:
+            return
+        self.close()
+        self._acked_in_file = 0
+        try:
+            tmp = self._path.with_suffix(".tmp")
+            with tmp.open("w") as f:
+                for entry_id, (page_id, block) in self._pending.items():
+                    f.write(json.dumps({"op": "add", "id": entry_id, "page": page_id, "block": block}) + "\n")
+            os.replace(tmp, self._path)
+        except OSError as e:
+            logger.warning("Could not compact trail journal %s: %s", self._path, e)
+
+
+trail_journal = TrailJournal()
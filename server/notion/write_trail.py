@@ -1,21 +1,93 @@
+"""
+Trail page writer.
+
+Appends are queued per page and sent by a background flush loop, so callers
+never wait on Notion. The scheduler:
+
+- coalesces everything queued for a page into as few append requests as
+  possible (up to Notion's 100 blocks each), flushing early once a full batch
+  is waiting;
+- paces requests through the shared Notion rate limiter, and on a 429 pauses
+  all writes for Retry-After and stretches the flush interval (it relaxes
+  again as writes succeed);
+- keeps a failed batch at the head of its page's queue and retries it with
+  backoff — transient failures (timeouts, 5xx) are retried indefinitely,
+  batches Notion rejects outright are dropped after MAX_ATTEMPTS;
+- serves pages round robin, one batch each per round, so a session with a
+  large backlog doesn't hold up everyone else's trail;
+- reports queue depth and write lag under ``notion.trail.*`` in /api/metrics.
+
+open_trail_page returns a placeholder id immediately and creates the Notion
+page in the background; blocks appended meanwhile are held until it exists.
+
+One process-wide ``trail_writer`` (one flush loop) serves every WebSocket
+session and the HTTP API.
+
+With a TrailJournal, queued blocks are also written ahead to disk and
+acknowledged once delivered, so restore() can pick them up after a restart.
+"""
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import Any, Awaitable, Callable
+
+from notion_client import AsyncClient
 
+import metrics
+from cartesia_conn import backoff_delay
 from notion.client import get_notion_client
 from notion.blocks import heading_2, heading_3, paragraph, code_block, toggle, divider, bulleted_list_item
+from notion.rate_limit import notion_rate_limiter
+from notion.trail_journal import TrailJournal, trail_journal
 from models import EvidencePack, Quest, QuestResult
 
 logger = logging.getLogger(__name__)
 
+FLUSH_INTERVAL = 3.0        # seconds between flushes while Notion is healthy
+MAX_FLUSH_INTERVAL = 60.0   # ceiling while Notion keeps rate limiting us
+MAX_BATCH_BLOCKS = 100      # Notion's limit per append request
+MIN_BATCH_BLOCKS = 5
+MAX_ATTEMPTS = 5            # for batches Notion rejects (4xx other than 429)
+RETRY_BASE = 1.0
+RETRY_MAX = 60.0
+PENDING_PAGE_PREFIX = "pending:"  # placeholder ids for trail pages still being created
+
+
+@dataclass
+class _PageQueue:
+    blocks: deque[tuple[float, int, dict[str, Any]]] = field(default_factory=deque)  # (queued at, journal id, block)
+    attempts: int = 0
+    retry_at: float = 0.0
+
 
 class TrailWriter:
-    def __init__(self) -> None:
-        self._queue: list[tuple[str, list[dict[str, Any]]]] = []
+    def __init__(self, journal: TrailJournal | None = None) -> None:
+        self._journal = journal
+        self._pages: dict[str, _PageQueue] = {}
+        self._creating: set[asyncio.Task] = set()
         self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.interval = FLUSH_INTERVAL
+        self.batch_size = MAX_BATCH_BLOCKS
+        self._paused_until = 0.0  # set by a 429; applies to every page
+
+    @property
+    def pending_blocks(self) -> int:
+        return sum(len(q.blocks) for q in self._pages.values())
+
+    @property
+    def lag(self) -> float:
+        """Seconds the oldest queued block has been waiting."""
+        oldest = min((q.blocks[0][0] for q in self._pages.values() if q.blocks), default=None)
+        return time.monotonic() - oldest if oldest is not None else 0.0
 
     async def create_trail_page(self, repo_name: str) -> tuple[str, str]:
         """Create a new trail page under the parent page. Returns (page_id, url)."""
@@ -31,7 +103,7 @@ class TrailWriter:
         title = f"Onboarding Trail — {repo_name} — {now}"
 
         try:
-            page = client.pages.create(
+            page = await client.pages.create(
                 parent={"page_id": NOTION_PARENT_PAGE_ID},
                 properties={
                     "title": {
@@ -122,41 +194,215 @@ class TrailWriter:
         blocks = [bulleted_list_item(f"**{k}**: {v}") for k, v in glossary.items()]
         self._enqueue(page_id, blocks)
 
-    def _enqueue(self, page_id: str, blocks: list[dict[str, Any]]) -> None:
-        self._queue.append((page_id, blocks))
+    def _enqueue(self, page_id: str, blocks: list[dict[str, Any]], ids: list[int] | None = None) -> None:
+        if ids is None:
+            ids = self._journal.append(page_id, blocks) if self._journal else [0] * len(blocks)
+        queue = self._pages.setdefault(page_id, _PageQueue())
+        now = time.monotonic()
+        queue.blocks.extend((now, entry_id, b) for entry_id, b in zip(ids, blocks))
+        metrics.add_gauge("notion.trail.queued_blocks", len(blocks))
+        if len(queue.blocks) >= self.batch_size:
+            self._wake.set()
+
+    def _dequeue(self, queue: _PageQueue, count: int) -> None:
+        ids = [queue.blocks.popleft()[1] for _ in range(count)]
+        if self._journal:
+            self._journal.ack(ids)
+        metrics.add_gauge("notion.trail.queued_blocks", -count)
+
+    def open_trail_page(
+        self,
+        repo_name: str,
+        on_created: Callable[[str, str], Awaitable[None]] | None = None,
+    ) -> str:
+        """Start creating a trail page in the background; returns a placeholder id.
+
+        Blocks appended under the placeholder are held (and journaled) until
+        the page exists, then sent to it. on_created(page_id, url) runs right
+        after — page_id is "" if creation failed and the blocks were dropped.
+        Callers should append under the real page id from then on.
+        """
+        placeholder = f"{PENDING_PAGE_PREFIX}{uuid.uuid4()}"
+        task = asyncio.create_task(self._create_page(placeholder, repo_name, on_created))
+        self._creating.add(task)
+        task.add_done_callback(self._creating.discard)
+        return placeholder
+
+    async def _create_page(
+        self,
+        placeholder: str,
+        repo_name: str,
+        on_created: Callable[[str, str], Awaitable[None]] | None,
+    ) -> None:
+        start = time.monotonic()
+        page_id, page_url = await self.create_trail_page(repo_name)
+        metrics.observe("notion.trail.page_create_seconds", time.monotonic() - start)
+        self._resolve_page(placeholder, page_id)
+        if on_created:
+            try:
+                await on_created(page_id, page_url)
+            except Exception as e:
+                logger.warning("Trail page callback failed: %s", e)
+
+    def _resolve_page(self, placeholder: str, page_id: str) -> None:
+        """Send blocks held under a placeholder to the created page, or drop them."""
+        queue = self._pages.pop(placeholder, None)
+        if queue is None:
+            return
+        if not page_id:
+            logger.warning("Trail page was not created, dropping %d blocks", len(queue.blocks))
+            metrics.incr("notion.trail.dropped_blocks", len(queue.blocks))
+            self._dequeue(queue, len(queue.blocks))
+            return
+        if self._journal:
+            self._journal.move(placeholder, page_id)
+        target = self._pages.get(page_id)
+        if target is not None:
+            target.blocks.extend(queue.blocks)
+        else:
+            self._pages[page_id] = queue
+        self._wake.set()
+
+    def restore(self) -> int:
+        """Queue blocks left undelivered in the journal by a previous run."""
+        if not self._journal:
+            return 0
+        entries = self._journal.replay()
+        orphaned = [entry_id for entry_id, page_id, _ in entries if page_id.startswith(PENDING_PAGE_PREFIX)]
+        if orphaned:
+            # The page was still being created when the process died
+            logger.warning("Dropping %d journaled trail blocks for a page that was never created", len(orphaned))
+            self._journal.ack(orphaned)
+            entries = [e for e in entries if not e[1].startswith(PENDING_PAGE_PREFIX)]
+        by_page: dict[str, tuple[list[int], list[dict[str, Any]]]] = {}
+        for entry_id, page_id, block in entries:
+            ids, blocks = by_page.setdefault(page_id, ([], []))
+            ids.append(entry_id)
+            blocks.append(block)
+        for page_id, (ids, blocks) in by_page.items():
+            self._enqueue(page_id, blocks, ids)
+        if entries:
+            logger.info("Restored %d undelivered trail blocks for %d pages", len(entries), len(by_page))
+        return len(entries)
 
     async def flush(self) -> None:
+        """Send every page's queued blocks that are due; failed batches stay queued."""
         async with self._lock:
-            if not self._queue:
+            if not self._pages:
                 return
             client = get_notion_client()
             if not client:
-                self._queue.clear()
+                for queue in self._pages.values():
+                    self._dequeue(queue, len(queue.blocks))
+                self._pages.clear()
                 return
 
-            # Group by page_id
-            by_page: dict[str, list[dict[str, Any]]] = {}
-            for page_id, blocks in self._queue:
-                by_page.setdefault(page_id, []).extend(blocks)
-            self._queue.clear()
+            # Round robin: one batch per due page per round, and a served page
+            # moves to the back, so one busy session can't starve the others.
+            while True:
+                sent = False
+                for page_id in list(self._pages):
+                    if time.monotonic() < self._paused_until:
+                        return
+                    queue = self._pages.get(page_id)
+                    if queue is None or page_id.startswith(PENDING_PAGE_PREFIX) or time.monotonic() < queue.retry_at:
+                        continue
+                    await self._send_batch(client, page_id, queue)
+                    sent = True
+                    if self._pages.get(page_id) is queue:
+                        del self._pages[page_id]
+                        if queue.blocks:
+                            self._pages[page_id] = queue
+                metrics.set_gauge("notion.trail.pages", len(self._pages))
+                if not sent:
+                    return
 
-            for page_id, blocks in by_page.items():
-                try:
-                    # Notion limits to 100 blocks per request
-                    for i in range(0, len(blocks), 100):
-                        chunk = blocks[i:i+100]
-                        client.blocks.children.append(
-                            block_id=page_id,
-                            children=chunk,
-                        )
-                except Exception as e:
-                    logger.error("Notion flush error for %s: %s", page_id, e)
+    async def _send_batch(self, client: AsyncClient, page_id: str, queue: _PageQueue) -> None:
+        batch = [block for _, _, block in itertools.islice(queue.blocks, self.batch_size)]
+        await notion_rate_limiter.acquire()
+        try:
+            await client.blocks.children.append(block_id=page_id, children=batch)
+        except Exception as e:
+            self._on_error(page_id, queue, len(batch), e)
+            return
+
+        metrics.observe("notion.trail.lag_seconds", time.monotonic() - queue.blocks[0][0])
+        metrics.incr("notion.trail.blocks_written", len(batch))
+        self._dequeue(queue, len(batch))
+        queue.attempts = 0
+        # Notion is keeping up: relax back toward the normal cadence
+        self.interval = max(FLUSH_INTERVAL, self.interval / 2)
+        self.batch_size = min(MAX_BATCH_BLOCKS, self.batch_size * 2)
+
+    def _on_error(self, page_id: str, queue: _PageQueue, size: int, error: Exception) -> None:
+        status = getattr(error, "status", None)
+        now = time.monotonic()
+        metrics.incr("notion.trail.errors")
+
+        if status == 429:
+            headers = getattr(error, "headers", None) or {}
+            try:
+                wait = float(headers.get("retry-after", ""))
+            except ValueError:
+                # No Retry-After: back off further on each consecutive 429
+                wait = backoff_delay(queue.attempts, RETRY_BASE, RETRY_MAX)
+                queue.attempts += 1
+            self._paused_until = max(self._paused_until, now + wait)
+            self.interval = min(MAX_FLUSH_INTERVAL, self.interval * 2)
+            metrics.incr("notion.trail.rate_limited")
+            logger.warning("Notion rate limited trail writes, pausing %.1fs", wait)
+            return
+
+        queue.attempts += 1
+        if status is not None and 400 <= status < 500:
+            if size > MIN_BATCH_BLOCKS and status in (400, 413):
+                # Possibly too large a payload: retry smaller batches
+                self.batch_size = max(MIN_BATCH_BLOCKS, size // 2)
+            if queue.attempts >= MAX_ATTEMPTS:
+                logger.error("Notion rejected %d trail blocks for %s, dropping them: %s", size, page_id, error)
+                metrics.incr("notion.trail.dropped_blocks", size)
+                self._dequeue(queue, size)
+                queue.attempts = 0
+                return
+        queue.retry_at = now + backoff_delay(queue.attempts - 1, RETRY_BASE, RETRY_MAX)
+        logger.warning(
+            "Notion trail write for %s failed (attempt %d), retrying in %.1fs: %s",
+            page_id, queue.attempts, queue.retry_at - now, error,
+        )
+
+    def kick(self) -> None:
+        """Flush soon rather than waiting out the interval (e.g. a session ended)."""
+        self._wake.set()
+
+    def _next_flush_delay(self) -> float:
+        return max(self.interval, self._paused_until - time.monotonic())
 
     async def flush_loop(self) -> None:
-        """Background task that flushes every 3 seconds."""
+        """Background task: flush every interval, or as soon as a full batch is waiting."""
         try:
             while True:
-                await asyncio.sleep(3)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self._next_flush_delay())
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
                 await self.flush()
         except asyncio.CancelledError:
             await self.flush()
+
+    def start(self) -> None:
+        """Run flush_loop in the background (no-op if it's already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the flush loop after a final flush."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        else:
+            await self.flush()
+
+
+trail_writer = TrailWriter(trail_journal)
@@ -0,0 +1,197 @@
+"""
+Local stand-in for the Notion REST API, for tests and benchmarks.
+
+Runs a threaded HTTP server (outside the asyncio event loop, like the real
+API) with a configurable per-request latency. Supports the endpoints the
+notion package uses:
+
+    GET   /v1/blocks/{id}/children   paginated via start_cursor / page_size
+    PATCH /v1/blocks/{id}/children   append blocks
+    POST  /v1/pages                  create a page
+    GET   /v1/pages/{id}             page metadata (last_edited_time)
+
+Usage:
+    with NotionStub(latency=0.05) as stub:
+        stub.add_children("page", [stub.block("paragraph", "hi")])
+        client = stub.client()   # notion_client.AsyncClient aimed at the stub
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+from notion_client import AsyncClient
+
+_CHILDREN_RE = re.compile(r"^/v1/blocks/([^/]+)/children$")
+_PAGE_RE = re.compile(r"^/v1/pages/([^/]+)$")
+_EPOCH = "2024-01-01T00:00:00.000Z"
+_ERROR_CODES = {400: "validation_error", 404: "object_not_found", 429: "rate_limited", 503: "service_unavailable"}
+
+
+class NotionStub:
+    def __init__(self, latency: float = 0.0, page_size: int = 100) -> None:
+        self.latency = latency
+        self.page_size = page_size
+        self.children: dict[str, list[dict[str, Any]]] = {}
+        self._blocks: dict[str, dict[str, Any]] = {}
+        self.last_edited: dict[str, str] = {}
+        self.requests: list[tuple[str, str]] = []
+        self._failures: list[tuple[int, float | None]] = []  # injected into the next appends
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    # --- Content ---
+
+    @staticmethod
+    def block(btype: str, text: str = "", block_id: str | None = None) -> dict[str, Any]:
+        return {
+            "object": "block",
+            "id": block_id or str(uuid.uuid4()),
+            "type": btype,
+            "has_children": False,
+            btype: {"rich_text": [{"type": "text", "plain_text": text, "text": {"content": text}}]},
+        }
+
+    def add_children(self, parent_id: str, blocks: list[dict[str, Any]]) -> None:
+        """Attach blocks under a page or an already-added block."""
+        self.children.setdefault(parent_id, []).extend(blocks)
+        if parent_id in self._blocks:
+            self._blocks[parent_id]["has_children"] = True
+        for b in blocks:
+            self._blocks[b["id"]] = b
+
+    def touch(self, page_id: str) -> None:
+        """Bump a page's last_edited_time, as an edit in Notion would (minute precision)."""
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        self.last_edited[page_id] = now.strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+    def fail_appends(self, status: int, count: int = 1, retry_after: float | None = None) -> None:
+        """Make the next count block appends fail with status (429s carry Retry-After)."""
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * count)
+
+    # --- Server lifecycle ---
+
+    @property
+    def base_url(self) -> str:
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def client(self) -> AsyncClient:
+        """A notion_client.AsyncClient talking to this stub."""
+        http = httpx.AsyncClient(limits=httpx.Limits(max_connections=20))
+        return AsyncClient(auth="stub-token", base_url=self.base_url, client=http, retry=False)
+
+    def start(self) -> NotionStub:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                stub._handle(self, "GET")
+
+            def do_PATCH(self) -> None:
+                stub._handle(self, "PATCH")
+
+            def do_POST(self) -> None:
+                stub._handle(self, "POST")
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> NotionStub:
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # --- Request handling ---
+
+    def _handle(self, req: BaseHTTPRequestHandler, method: str) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            url = urlparse(req.path)
+            with self._lock:
+                self.requests.append((method, url.path))
+            length = int(req.headers.get("Content-Length") or 0)
+            body = json.loads(req.rfile.read(length) or b"{}") if length else {}
+            headers: dict[str, str] = {}
+            with self._lock:
+                failure = self._failures.pop(0) if self._failures and method == "PATCH" else None
+            if failure:
+                status, retry_after = failure
+                payload = {"object": "error", "status": status, "code": _ERROR_CODES.get(status, "internal_server_error"), "message": "injected"}
+                if retry_after is not None:
+                    headers["Retry-After"] = str(retry_after)
+            else:
+                status, payload = self._route(method, url.path, parse_qs(url.query), body)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        data = json.dumps(payload).encode()
+        req.send_response(status)
+        for name, value in headers.items():
+            req.send_header(name, value)
+        req.send_header("Content-Type", "application/json")
+        req.send_header("Content-Length", str(len(data)))
+        req.end_headers()
+        req.wfile.write(data)
+
+    def _route(self, method: str, path: str, query: dict[str, list[str]], body: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        match = _CHILDREN_RE.match(path)
+        if match and method == "GET":
+            block_id = match.group(1)
+            items = self.children.get(block_id, [])
+            start = int(query.get("start_cursor", ["0"])[0] or 0)
+            size = min(int(query.get("page_size", [str(self.page_size)])[0]), self.page_size)
+            page = items[start:start + size]
+            has_more = start + size < len(items)
+            return 200, {
+                "object": "list",
+                "results": page,
+                "has_more": has_more,
+                "next_cursor": str(start + size) if has_more else None,
+            }
+        if match and method == "PATCH":
+            blocks = body.get("children", [])
+            with self._lock:
+                self.children.setdefault(match.group(1), []).extend(blocks)
+            return 200, {"object": "list", "results": blocks}
+        if path == "/v1/pages" and method == "POST":
+            page_id = str(uuid.uuid4())
+            with self._lock:
+                self.children[page_id] = list(body.get("children", []))
+            return 200, {"object": "page", "id": page_id, "url": f"https://notion.so/{page_id.replace('-', '')}"}
+        match = _PAGE_RE.match(path)
+        if match and method == "GET" and match.group(1) in self.children:
+            page_id = match.group(1)
+            return 200, {"object": "page", "id": page_id, "last_edited_time": self.last_edited.get(page_id, _EPOCH)}
+        return 404, {"object": "error", "status": 404, "code": "object_not_found", "message": path}
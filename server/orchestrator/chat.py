@@ -14,7 +14,6 @@ from models import SessionState, EvidencePack
 from cache import get_cached_response, cache_response
 from conversation_flow import (
     get_immediate_acknowledgment, 
-    get_thinking_filler, 
     get_ready_transition,
     classify_question_type
 )
@@ -22,12 +21,20 @@ from conversation_flow import (
 logger = logging.getLogger(__name__)
 
 
-async def handle_chat_turn(session: SessionState, user_text: str) -> dict[str, Any] | None:
+async def handle_chat_turn(
+    session: SessionState,
+    user_text: str,
+    prefetch: asyncio.Task | None = None,
+) -> dict[str, Any] | None:
     """
     Natural conversation flow with immediate acknowledgments:
     1. Instant acknowledgment (under 1 second)
     2. Thinking filler while processing
     3. Ready transition + actual answer
+
+    ``prefetch`` is an already-running prefetch_plan_and_evidence task
+    (started speculatively on interim transcripts); it replaces the
+    router + evidence steps when given.
     """
     try:
         logger.info("Chat turn started for: %s", user_text[:50])
@@ -41,6 +48,8 @@ async def handle_chat_turn(session: SessionState, user_text: str) -> dict[str, A
         cached_response = get_cached_response(user_text, session_context)
         if cached_response:
             logger.info("Returning cached response for: %s", user_text[:50])
+            if prefetch:
+                prefetch.cancel()
             return cached_response
 
         # Step 1: Get immediate acknowledgment (instant!)
@@ -49,6 +58,8 @@ async def handle_chat_turn(session: SessionState, user_text: str) -> dict[str, A
         
         # Only greetings get canned responses — everything else goes to Claude
         if question_type == "greeting":
+            if prefetch:
+                prefetch.cancel()
             response = {
                 "voice_answer": immediate_response,
                 "detailed_answer": immediate_response,
@@ -61,7 +72,7 @@ async def handle_chat_turn(session: SessionState, user_text: str) -> dict[str, A
 
         # Step 2: Start processing in background
         processing_task = asyncio.create_task(
-            _process_question_with_evidence(session, user_text)
+            _process_question_with_evidence(session, user_text, prefetch)
         )
         
         # Step 3: Return immediate acknowledgment + thinking filler
@@ -86,30 +97,49 @@ async def handle_chat_turn(session: SessionState, user_text: str) -> dict[str, A
         }
 
 
-async def _process_question_with_evidence(session: SessionState, user_text: str) -> dict[str, Any]:
+async def prefetch_plan_and_evidence(session: SessionState, user_text: str) -> tuple[dict[str, Any], EvidencePack]:
+    """Route the question and gather evidence — the part of a turn that does not need the final wording."""
+    # Route and plan
+    logger.info("Calling route_and_plan...")
+    plan = await route_and_plan(session, user_text)
+    logger.info("Route and plan complete: intent=%s", plan.get("intent"))
+
+    # Quick evidence collection (limited for speed)
+    evidence = EvidencePack()
+    try:
+        evidence = await asyncio.wait_for(
+            _collect_evidence_background(session.repo_path, plan["rg_patterns"], plan["candidate_files"]),
+            timeout=3.0,  # 3 second timeout
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Evidence collection timed out, proceeding without evidence")
+    return plan, evidence
+
+
+async def _process_question_with_evidence(
+    session: SessionState,
+    user_text: str,
+    prefetch: asyncio.Task | None = None,
+) -> dict[str, Any]:
     """Process the question in background with evidence collection."""
     logger.info("Starting background processing for: %s", user_text[:50])
     try:
-        # Route and plan
-        logger.info("Calling route_and_plan...")
-        plan = await route_and_plan(session, user_text)
-        logger.info("Route and plan complete: intent=%s", plan.get("intent"))
-        
-        # Quick evidence collection (limited for speed)
-        evidence_task = asyncio.create_task(_collect_evidence_background(
-            session.repo_path, plan["rg_patterns"], plan["candidate_files"]
-        ))
-        
-        # Generate thinking filler
-        thinking_filler = get_thinking_filler()
-        
-        # Wait for evidence (with timeout)
-        evidence = EvidencePack()
-        try:
-            evidence = await asyncio.wait_for(evidence_task, timeout=3.0)  # 3 second timeout
-        except asyncio.TimeoutError:
-            logger.warning("Evidence collection timed out, proceeding without evidence")
-        
+        plan_evidence = None
+        if prefetch and not prefetch.cancelled():
+            try:
+                plan_evidence = await prefetch
+                logger.info("Reusing speculative plan + evidence")
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if current is not None and current.cancelling():
+                    raise  # this turn was cancelled, not just the speculation
+                logger.info("Speculative prefetch was cancelled, recomputing")
+            except Exception as e:
+                logger.warning("Speculative prefetch failed (%s), recomputing", e)
+        if plan_evidence is None:
+            plan_evidence = await prefetch_plan_and_evidence(session, user_text)
+        plan, evidence = plan_evidence
+
         # Generate detailed answer
         logger.info("Generating detailed answer...")
         answer_data = await _generate_detailed_answer(
@@ -124,7 +154,6 @@ async def _process_question_with_evidence(session: SessionState, user_text: str)
 
         logger.info("Background processing complete, returning result")
         return {
-            "thinking_filler": thinking_filler,
             "transition": transition,
             "voice_answer": voice_answer,
             "detailed_answer": detailed_answer,
@@ -135,7 +164,6 @@ async def _process_question_with_evidence(session: SessionState, user_text: str)
     except Exception as e:
         logger.error("Background processing error: %s", e, exc_info=True)
         return {
-            "thinking_filler": "Let me try a different approach...",
             "transition": "Here's what I can tell you:",
             "detailed_answer": f"I encountered an issue: {e}",
             "evidence": EvidencePack(),
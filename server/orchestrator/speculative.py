@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import difflib
+import logging
+import re
+import time
+
+import metrics
+from models import SessionState
+from orchestrator.chat import prefetch_plan_and_evidence
+
+logger = logging.getLogger(__name__)
+
+STABLE_EVENTS = 2       # identical interim transcripts in a row before we speculate
+MIN_WORDS = 3           # too-short partials ("where is") make useless search plans
+MATCH_THRESHOLD = 0.9   # final vs. speculative text similarity needed for reuse
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_PUNCT_RE.sub("", text.lower()).split())
+
+
+class SpeculativePrefetch:
+    """Start routing + evidence gathering on stable interim transcripts.
+
+    Interim transcripts are fed through ``on_interim``; once the same text has
+    been seen STABLE_EVENTS times in a row, prefetch_plan_and_evidence starts
+    in the background. ``take`` hands that task over if the final transcript
+    (nearly) matches, and cancels it otherwise.
+    """
+
+    def __init__(self, session: SessionState) -> None:
+        self._session = session
+        self._last_text = ""
+        self._repeats = 0
+        self._task: asyncio.Task | None = None
+        self._task_text = ""
+        self._started_at = 0.0
+        self._finished_at: float | None = None
+
+    def on_interim(self, text: str) -> None:
+        normalized = _normalize(text)
+        if not normalized:
+            return
+        if normalized == self._last_text:
+            self._repeats += 1
+        else:
+            self._last_text = normalized
+            self._repeats = 1
+
+        if self._repeats < STABLE_EVENTS or len(normalized.split()) < MIN_WORDS:
+            return
+        if self._task and self._task_text == normalized:
+            return
+
+        self.discard()
+        logger.info("Speculating on interim transcript: %s", text[:80])
+        metrics.incr("speculative.started")
+        self._task_text = normalized
+        self._started_at = time.monotonic()
+        self._finished_at = None
+        self._task = asyncio.create_task(prefetch_plan_and_evidence(self._session, text))
+        self._task.add_done_callback(self._mark_finished)
+
+    def take(self, final_text: str) -> asyncio.Task | None:
+        """Return the speculative task if it matches final_text, else discard it."""
+        task, spec_text = self._task, self._task_text
+        self._task = None
+        self._reset_stability()
+        if task is None:
+            return None
+
+        ratio = difflib.SequenceMatcher(None, _normalize(final_text), spec_text).ratio()
+        if ratio < MATCH_THRESHOLD or task.cancelled():
+            task.cancel()
+            metrics.incr("speculative.discarded")
+            logger.info("Discarding speculation (similarity %.2f)", ratio)
+            return None
+
+        # Work already done before the final transcript arrived is latency saved
+        finished = self._finished_at if self._finished_at is not None else time.monotonic()
+        saved_ms = (finished - self._started_at) * 1000
+        metrics.incr("speculative.reused")
+        metrics.observe("speculative.latency_saved_ms", saved_ms)
+        logger.info("Reusing speculation (similarity %.2f, saved %.0f ms)", ratio, saved_ms)
+        return task
+
+    def discard(self) -> None:
+        """Cancel any in-flight speculation."""
+        if self._task:
+            self._task.cancel()
+            metrics.incr("speculative.discarded")
+        self._task = None
+        self._task_text = ""
+
+    def _reset_stability(self) -> None:
+        self._last_text = ""
+        self._repeats = 0
+        self._task_text = ""
+
+    def _mark_finished(self, task: asyncio.Task) -> None:
+        if task is self._task:
+            self._finished_at = time.monotonic()
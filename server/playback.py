@@ -0,0 +1,97 @@
+"""
+Per-turn playback scheduling for the voice channel.
+
+CartesiaTTS.speak returns once the audio has been *sent*, which is well before
+the browser finishes *playing* it. PlaybackScheduler keeps an estimate of when
+the client's playback queue runs dry, so a thinking filler is only spoken when
+work is still outstanding and the listener would otherwise hear silence, and
+the answer starts the moment it is ready. Silence gaps between utterances are
+recorded per turn in /api/metrics.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from fastapi import WebSocket
+
+import metrics
+from audio_dsp import sample_width
+from cartesia_tts import CartesiaTTS
+from models import SessionState
+
+logger = logging.getLogger(__name__)
+
+FILLER_LEAD = 0.3  # seconds — queue the filler just before the client runs out of audio
+
+
+class PlaybackScheduler:
+    """Tracks the client's estimated playback clock for one conversational turn."""
+
+    def __init__(self, tts: CartesiaTTS | None, ws: WebSocket, session: SessionState) -> None:
+        self._tts = tts
+        self._ws = ws
+        self._session = session
+        self._turn_start = time.monotonic()
+        self._playing_until: float | None = None  # monotonic time queued audio runs out
+        self._silence = 0.0
+        self._utterances = 0
+
+    def remaining(self) -> float:
+        """Seconds of audio the client still has queued."""
+        if self._playing_until is None:
+            return 0.0
+        return max(0.0, self._playing_until - time.monotonic())
+
+    async def say(self, text: str) -> None:
+        """Speak text, recording any silence the listener sat through before it."""
+        if not self._tts or not text.strip():
+            return
+        start = time.monotonic()
+        if self._playing_until is None:
+            gap = start - self._turn_start
+            metrics.observe("playback.first_audio_ms", gap * 1000)
+        else:
+            gap = max(0.0, start - self._playing_until)
+            if gap > 0:
+                metrics.observe("playback.silence_gap_ms", gap * 1000)
+        self._silence += gap
+        self._utterances += 1
+
+        sent = await self._tts.speak(text, self._ws, self._session)
+        bytes_per_second = self._session.output_sample_rate * sample_width(self._session.output_encoding)
+        self._playing_until = max(start, self._playing_until or start) + sent / bytes_per_second
+
+    async def say_while_pending(self, task: asyncio.Task, fillers: list[str], timeout: float) -> Any:
+        """Wait for task, covering silence with fillers. Returns the task's result.
+
+        Fillers are spoken one at a time, only when the task is still running
+        and the previous audio is about to run out. Raises asyncio.TimeoutError
+        (and cancels the task) if it is not done within timeout seconds.
+        """
+        deadline = time.monotonic() + timeout
+        pending_fillers = list(fillers)
+        while True:
+            # Checked before the deadline: the task may have finished while a
+            # filler was being spoken
+            if task.done():
+                return task.result()
+            left = deadline - time.monotonic()
+            if left <= 0:
+                task.cancel()
+                raise asyncio.TimeoutError
+            wait = max(0.0, self.remaining() - FILLER_LEAD)
+            if not pending_fillers:
+                wait = left
+            await asyncio.wait({task}, timeout=min(wait, left))
+            if task.done():
+                continue
+            if pending_fillers and self.remaining() <= FILLER_LEAD:
+                await self.say(pending_fillers.pop(0))
+
+    def finish(self) -> None:
+        """Record the turn's total perceived silence."""
+        if self._utterances:
+            metrics.observe("playback.turn_silence_ms", self._silence * 1000)
@@ -0,0 +1,180 @@
+"""
+Registry of repositories the server is working on, one RepoContext each.
+
+Every WebSocket session binds its session id (the token the /api endpoints
+accept) to the repo it started with, so concurrent sessions on different repos
+no longer clobber each other. A session may open further repos, and can only
+reach the repos it opened. A context holds what is worth sharing between
+sessions on the same repo — today the scan — and the least recently used
+contexts with no live session are evicted beyond REPO_REGISTRY_SIZE.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any
+
+import metrics
+from config import REPO_PATH, REPO_REGISTRY_SIZE
+from models import RepoScan
+from repo.scan import scan_repo
+
+logger = logging.getLogger(__name__)
+
+
+def repo_id_for(path: str) -> str:
+    """Stable short id for a repo path (what /api callers pass as repo_id)."""
+    resolved = os.path.realpath(os.path.expanduser(path))
+    return hashlib.sha1(resolved.encode()).hexdigest()[:12]
+
+
+class RepoContext:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.repo_id = repo_id_for(path)
+        self.sessions = 0
+        self.last_used = time.monotonic()
+        self._scan: RepoScan | None = None
+        self._scan_lock: asyncio.Lock | None = None
+
+    async def get_scan(self) -> RepoScan:
+        """Scan the repo once; concurrent callers share the result."""
+        if self._scan is not None:
+            return self._scan
+        if self._scan_lock is None:
+            self._scan_lock = asyncio.Lock()
+        async with self._scan_lock:
+            if self._scan is None:
+                self._scan = await scan_repo(self.path)
+        return self._scan
+
+    async def scan_summary(self) -> dict[str, Any]:
+        scan = await self.get_scan()
+        return {
+            "repo_id": self.repo_id,
+            "tree": scan.tree,
+            "extensions": scan.extensions,
+            "frameworks": scan.frameworks,
+            "languages": scan.languages,
+            "total_files": scan.total_files,
+            "summary": scan.summary(),
+        }
+
+    def invalidate(self) -> None:
+        """Drop the cached scan so the next get_scan rescans the repo."""
+        self._scan = None
+
+
+class RepoRegistry:
+    def __init__(self, max_repos: int = REPO_REGISTRY_SIZE, default_path: str = REPO_PATH) -> None:
+        self.max_repos = max(1, max_repos)
+        self.default_path = default_path
+        self._repos: OrderedDict[str, RepoContext] = OrderedDict()  # LRU order, oldest first
+        # session token -> repo ids it may use: the repo it started with, then any it opened
+        self._session_repos: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._repos)
+
+    def __contains__(self, repo_id: str) -> bool:
+        return repo_id in self._repos
+
+    def open(self, path: str) -> RepoContext:
+        """The context for path, created if needed, marked most recently used."""
+        repo_id = repo_id_for(path)
+        ctx = self._repos.get(repo_id)
+        if ctx is None:
+            ctx = RepoContext(path)
+            self._repos[repo_id] = ctx
+            self._evict()
+        self._touch(ctx)
+        return ctx
+
+    def bind_session(self, token: str, path: str) -> RepoContext:
+        """Attach a session to a repo; it stays registered until released."""
+        self.release_session(token)
+        self._session_repos[token] = []
+        ctx = self.open(path)
+        if ctx.sessions == 0:
+            # Nobody is mid-session on it, so rescan to pick up changes since the last one
+            ctx.invalidate()
+        return self.open_for_session(token, path)
+
+    def open_for_session(self, token: str, path: str) -> RepoContext:
+        """Open another repo on behalf of a live session, which may then use it."""
+        ctx = self.open(path)
+        repos = self._session_repos[token]
+        if ctx.repo_id not in repos:
+            repos.append(ctx.repo_id)
+            ctx.sessions += 1
+        return ctx
+
+    def has_session(self, token: str) -> bool:
+        return token in self._session_repos
+
+    @property
+    def has_sessions(self) -> bool:
+        return bool(self._session_repos)
+
+    def session_opened(self, token: str, repo_id: str) -> bool:
+        return repo_id in self._session_repos.get(token, ())
+
+    def release_session(self, token: str) -> None:
+        for repo_id in self._session_repos.pop(token, []):
+            ctx = self._repos.get(repo_id)
+            if ctx is not None:
+                ctx.sessions -= 1
+        self._evict()
+
+    def resolve(self, session_token: str | None = None, repo_id: str | None = None) -> RepoContext | None:
+        """Find the repo an API call is about.
+
+        With a session token, repo_id (default: the session's own repo) must be
+        one the session opened. Without one, repo_id or the default REPO_PATH is
+        only served while no sessions exist — the single-repo setup that
+        predates sessions. Returns None when the call may not use any repo.
+        """
+        if session_token:
+            repos = self._session_repos.get(session_token)
+            if not repos:
+                return None
+            if repo_id is None:
+                repo_id = repos[0]
+            elif repo_id not in repos:
+                return None
+        elif self._session_repos:
+            return None
+        if repo_id:
+            ctx = self._repos.get(repo_id)
+        elif self.default_path:
+            ctx = self.open(self.default_path)
+        else:
+            ctx = None
+        if ctx is not None:
+            self._touch(ctx)
+        return ctx
+
+    def _touch(self, ctx: RepoContext) -> None:
+        ctx.last_used = time.monotonic()
+        self._repos.move_to_end(ctx.repo_id)
+
+    def _evict(self) -> None:
+        """Drop least recently used repos without live sessions beyond max_repos."""
+        excess = len(self._repos) - self.max_repos
+        for repo_id in list(self._repos):
+            if excess <= 0:
+                break
+            if self._repos[repo_id].sessions > 0:
+                continue
+            ctx = self._repos.pop(repo_id)
+            excess -= 1
+            metrics.incr("repo_registry.evictions")
+            logger.info("Evicted idle repo context %s (%s)", repo_id, ctx.path)
+        metrics.set_gauge("repo_registry.repos", len(self._repos))
+
+
+repo_registry = RepoRegistry()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test audio_dsp resampling and PCM conversion.
+Run with pytest or directly: python test_audio_dsp.py
+"""
+
+import numpy as np
+
+from audio_dsp import (
+    ENCODING_F32, ENCODING_S16, StreamResampler, convert_pcm, decode_pcm, encode_pcm,
+    negotiate_encoding, negotiate_rate,
+)
+
+
+def _tone(freq: float, rate: int, seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def _peak_hz(samples: np.ndarray, rate: int) -> float:
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.argmax(spectrum) * rate / len(samples)
+
+
+def test_chunked_stream_matches_one_shot():
+    tone = _tone(1000, 44100)
+    whole = StreamResampler(44100, 16000).process(tone)
+    resampler = StreamResampler(44100, 16000)
+    chunked = np.concatenate([resampler.process(tone[i:i + 1000]) for i in range(0, tone.size, 1000)])
+    assert chunked.size == whole.size
+    assert np.allclose(chunked, whole, atol=1e-5)
+
+
+def test_resampling_preserves_pitch():
+    for src, dst in ((48000, 16000), (24000, 44100), (22050, 16000)):
+        out = StreamResampler(src, dst).process(_tone(440, src))
+        assert abs(out.size - dst) <= 1
+        assert abs(_peak_hz(out, dst) - 440) <= 2
+
+
+def test_downsampling_filters_content_above_nyquist():
+    out = StreamResampler(48000, 16000).process(_tone(10000, 48000))
+    assert np.sqrt(np.mean(out[100:] ** 2)) < 0.01
+
+
+def test_pcm_round_trip_and_encodings():
+    tone = _tone(440, 16000, 0.1)
+    assert np.abs(decode_pcm(encode_pcm(tone)) - tone).max() < 1e-4
+    s16 = encode_pcm(tone)
+    f32 = convert_pcm(s16, 16000, 16000, ENCODING_S16, ENCODING_F32)
+    assert len(f32) == 2 * len(s16)
+    assert convert_pcm(s16, 16000, 16000) is s16
+
+
+def test_negotiation_falls_back_to_defaults():
+    assert negotiate_rate(44100, 16000) == 44100
+    assert negotiate_rate("48000", 16000) == 48000
+    assert negotiate_rate(None, 16000) == 16000
+    assert negotiate_rate(1_000_000, 24000) == 24000
+    assert negotiate_encoding("pcm_f32le") == ENCODING_F32
+    assert negotiate_encoding("opus") == ENCODING_S16
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
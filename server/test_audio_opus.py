@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Round-trip test of the optional Opus codec (skipped without opuslib/libopus).
+Run with pytest or directly: python test_audio_opus.py
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("opuslib")
+
+from audio_dsp import decode_pcm, encode_pcm
+from audio_opus import OPUS_FRAME_MS, OpusDecoder, OpusEncoder
+
+
+def _voiced(rate: int, seconds: float) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.3 * np.sin(2 * np.pi * 220 * t) + 0.1 * np.sin(2 * np.pi * 660 * t)).astype(np.float32)
+
+
+def _rms(signal: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(signal ** 2)))
+
+
+def test_round_trip_keeps_length_and_level():
+    rate = 16000
+    signal = _voiced(rate, 1.0)
+    encoder = OpusEncoder(rate)
+    decoder = OpusDecoder(rate)
+    pcm = encode_pcm(signal)
+    packets = encoder.encode(pcm[:5000]) + encoder.encode(pcm[5000:]) + encoder.flush()
+    assert len(packets) == 1000 // OPUS_FRAME_MS
+    assert sum(len(p) for p in packets) < len(pcm) / 5  # well compressed
+
+    decoded = decode_pcm(b"".join(decoder.decode(p) for p in packets))
+    assert len(decoded) == len(signal)
+    # Skip the codec's start-up delay before comparing levels
+    assert abs(_rms(decoded[rate // 10:]) - _rms(signal[rate // 10:])) < 0.05
+
+
+def test_flush_pads_the_last_partial_frame():
+    rate = 24000
+    encoder = OpusEncoder(rate)
+    pcm = encode_pcm(_voiced(rate, 0.03))  # 1.5 frames
+    assert len(encoder.encode(pcm)) == 1
+    tail = encoder.flush()
+    assert len(tail) == 1
+    assert encoder.flush() == []
+    assert len(OpusDecoder(rate).decode(tail[0])) == encoder.frame_samples * 2
+
+
+def test_decoder_resamples_to_its_own_rate():
+    packets = OpusEncoder(48000).encode(encode_pcm(_voiced(48000, 0.02)))
+    decoded = OpusDecoder(16000).decode(packets[0])
+    assert len(decoded) == 16000 * OPUS_FRAME_MS // 1000 * 2
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test the binary audio frame header, transport negotiation, and that a bad
+JSON audio chunk doesn't end the session. Run with pytest or directly:
+python test_audio_protocol.py
+"""
+
+import struct
+
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+from audio_protocol import (
+    HEADER_SIZE, KIND_AUDIO_IN, KIND_AUDIO_OUT, PROTOCOL_VERSION, TRANSPORT_BINARY, TRANSPORT_JSON,
+    FrameError, negotiate_transport, pack_audio_frame, unpack_audio_frame,
+)
+from ws_handler import handle_websocket
+
+
+def test_frame_header_layout_and_round_trip():
+    frame = pack_audio_frame(KIND_AUDIO_OUT, 0x1_0203, b"\x01\x02\x03\x04")
+    assert HEADER_SIZE == 4
+    # version, kind, uint16 little-endian seq (wrapped to 16 bits)
+    assert frame[:HEADER_SIZE] == struct.pack("<BBH", PROTOCOL_VERSION, KIND_AUDIO_OUT, 0x0203)
+    kind, seq, payload = unpack_audio_frame(frame)
+    assert (kind, seq, bytes(payload)) == (KIND_AUDIO_OUT, 0x0203, b"\x01\x02\x03\x04")
+
+
+def test_malformed_frames_are_rejected():
+    for bad in (b"", b"\x01\x01", struct.pack("<BBH", PROTOCOL_VERSION + 1, KIND_AUDIO_IN, 0) + b"pcm"):
+        try:
+            unpack_audio_frame(bad)
+        except FrameError:
+            continue
+        raise AssertionError(f"accepted malformed frame {bad!r}")
+
+
+def test_transport_negotiation_falls_back_to_json():
+    assert negotiate_transport(TRANSPORT_BINARY) == TRANSPORT_BINARY
+    assert negotiate_transport(TRANSPORT_JSON) == TRANSPORT_JSON
+    assert negotiate_transport(None) == TRANSPORT_JSON
+    assert negotiate_transport("carrier-pigeon") == TRANSPORT_JSON
+
+
+def test_bad_base64_audio_keeps_session_alive():
+    app = FastAPI()
+
+    @app.websocket("/ws")
+    async def endpoint(ws: WebSocket):
+        await handle_websocket(ws)
+
+    with TestClient(app).websocket_connect("/ws") as ws:
+        ws.send_json({"type": "audio_in", "audio": "not*base64="})
+        assert ws.receive_json() == {"type": "error", "message": "Invalid audio data"}
+        ws.send_json({"type": "mode_switch", "mode": "chat"})
+        assert ws.receive_json()["type"] == "mode_changed"
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test the STT uplink: packet sizing, partial flushes and the overflow policies.
+Run with pytest or directly: python test_audio_uplink.py
+"""
+
+import asyncio
+
+import metrics
+from audio_uplink import COALESCE_MAX_BYTES, AudioAggregator, AudioUplink
+
+PACKET_20MS = 16000 * 2 * 20 // 1000  # 640 bytes of 16 kHz s16le
+
+
+def _collector() -> tuple[list[bytes], object]:
+    sent: list[bytes] = []
+
+    async def send(packet: bytes) -> None:
+        sent.append(packet)
+
+    return sent, send
+
+
+def test_frames_are_cut_into_20ms_packets():
+    async def run():
+        sent, send = _collector()
+        agg = AudioAggregator(send, packet_ms=20, jitter_ms=1000)
+        assert agg.packet_bytes == PACKET_20MS
+        for _ in range(10):
+            await agg.push(b"\x01\x00" * 150)  # 300-byte frames, not packet aligned
+        assert [len(p) for p in sent] == [PACKET_20MS] * 4
+        assert agg.buffered_bytes == 3000 - 4 * PACKET_20MS
+        assert b"".join(sent) == (b"\x01\x00" * 1500)[:4 * PACKET_20MS]
+
+    asyncio.run(run())
+
+
+def test_packet_ms_is_clamped():
+    _, send = _collector()
+    assert AudioAggregator(send, packet_ms=5).packet_ms == 20
+    assert AudioAggregator(send, packet_ms=500).packet_ms == 100
+
+
+def test_partial_packet_flushed_after_jitter_timeout():
+    async def run():
+        sent, send = _collector()
+        agg = AudioAggregator(send, packet_ms=20, jitter_ms=20)
+        agg.start()
+        await agg.push(b"\x00" * 100)
+        await asyncio.sleep(0.01)
+        assert sent == []  # still within packet + jitter allowance
+        await asyncio.sleep(0.08)
+        assert sent == [b"\x00" * 100]
+        assert agg.buffered_bytes == 0
+        await agg.close()
+
+    asyncio.run(run())
+
+
+def test_close_flushes_remaining_audio():
+    async def run():
+        sent, send = _collector()
+        agg = AudioAggregator(send, packet_ms=20, jitter_ms=1000)
+        agg.start()
+        await agg.push(b"\x02" * (PACKET_20MS + 200))
+        await agg.close()
+        assert [len(p) for p in sent] == [PACKET_20MS, 200]
+        await agg.push(b"\x02" * 10)  # ignored once closed
+        assert len(sent) == 2
+
+    asyncio.run(run())
+
+
+def test_depth_gauge_and_summary_are_separate():
+    async def run():
+        metrics.reset()
+        _, send = _collector()
+        agg = AudioAggregator(send, packet_ms=20, jitter_ms=1000)
+        await agg.push(b"\x00" * 700)
+        snap = metrics.snapshot()
+        assert snap["gauges"]["stt_uplink.queue_depth_bytes"] == 60
+        assert snap["summaries"]["stt_uplink.buffered_bytes_on_push"]["max"] == 700
+        await agg.close()
+        assert metrics.snapshot()["gauges"]["stt_uplink.queue_depth_bytes"] == 0
+
+    asyncio.run(run())
+
+
+class _StalledAggregator:
+    """Stands in for the aggregator; the sender task is never started."""
+
+    def __init__(self) -> None:
+        self.pushed: list[bytes] = []
+
+    def start(self) -> None:
+        pass
+
+    async def push(self, pcm: bytes) -> None:
+        self.pushed.append(pcm)
+
+    async def close(self) -> None:
+        pass
+
+
+def test_drop_oldest_keeps_newest_frames():
+    metrics.reset()
+    uplink = AudioUplink(_StalledAggregator(), max_frames=3, overflow="drop_oldest")
+    for i in range(5):
+        uplink.submit(bytes([i]) * 10)
+    assert uplink.depth == 3
+    assert list(uplink._frames) == [bytes([i]) * 10 for i in (2, 3, 4)]
+    counters = metrics.snapshot()["counters"]
+    assert counters["stt_uplink.frames_dropped"] == 2
+    assert counters["stt_uplink.bytes_dropped"] == 20
+
+
+def test_coalesce_keeps_audio_until_byte_bound():
+    metrics.reset()
+    uplink = AudioUplink(_StalledAggregator(), max_frames=2, overflow="coalesce")
+    half = COALESCE_MAX_BYTES // 2
+    uplink.submit(b"a" * 10)
+    uplink.submit(b"b" * half)
+    uplink.submit(b"c" * half)  # merged into the newest frame
+    assert uplink.depth == 2
+    assert list(uplink._frames) == [b"a" * 10, b"b" * half + b"c" * half]
+    assert metrics.snapshot()["counters"]["stt_uplink.frames_coalesced"] == 1
+
+    uplink.submit(b"d" * 10)  # newest frame is full: the oldest audio goes
+    assert list(uplink._frames) == [b"b" * half + b"c" * half, b"d" * 10]
+    assert all(len(f) <= COALESCE_MAX_BYTES for f in uplink._frames)
+    assert metrics.snapshot()["counters"]["stt_uplink.frames_dropped"] == 1
+
+
+def test_close_forwards_queued_frames_in_order():
+    async def run():
+        metrics.reset()
+        agg = _StalledAggregator()
+        uplink = AudioUplink(agg, max_frames=8)
+        for i in range(4):
+            uplink.submit(bytes([i]))
+        uplink.start()
+        await uplink.close()
+        assert agg.pushed == [bytes([i]) for i in range(4)]
+        assert metrics.snapshot()["gauges"]["stt_uplink.audio_queue_depth"] == 0
+        uplink.submit(b"late")
+        assert uplink.depth == 0
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
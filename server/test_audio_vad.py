@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test the VAD gate on synthetic speech/silence.
+Run with pytest or directly: python test_audio_vad.py
+"""
+
+import numpy as np
+
+from audio_dsp import encode_pcm
+from audio_vad import VoiceActivityGate
+
+RATE = 16000
+BYTES_PER_SECOND = RATE * 2
+rng = np.random.default_rng(0)
+
+
+def _noise(seconds: float) -> np.ndarray:
+    return rng.normal(0, 0.002, int(RATE * seconds)).astype(np.float32)
+
+
+def _voiced(seconds: float) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (0.2 * np.sin(2 * np.pi * 200 * t)).astype(np.float32) + _noise(seconds)
+
+
+def _run(gate: VoiceActivityGate, signal: np.ndarray, chunk: int = 4096) -> bytes:
+    pcm = encode_pcm(signal)
+    return b"".join(gate.process(pcm[i:i + chunk]) for i in range(0, len(pcm), chunk))
+
+
+def test_silence_is_suppressed():
+    gate = VoiceActivityGate(hangover_ms=400, preroll_ms=200)
+    assert _run(gate, _noise(3)) == b""
+    assert gate.suppressed_fraction == 1.0
+
+
+def test_speech_forwarded_with_preroll_and_hangover():
+    gate = VoiceActivityGate(hangover_ms=400, preroll_ms=200)
+    out = _run(gate, np.concatenate([_noise(2), _voiced(1), _noise(2)]))
+    # 1 s of speech + 0.2 s pre-roll + 0.4 s hangover
+    assert abs(len(out) / BYTES_PER_SECOND - 1.6) < 0.05
+    assert 0.6 < gate.suppressed_fraction < 0.75
+
+
+def test_frames_split_across_chunks_are_kept():
+    gate = VoiceActivityGate(hangover_ms=0, preroll_ms=0)
+    out = _run(gate, _voiced(1), chunk=1000)  # not a multiple of the 640-byte frame
+    assert len(out) == BYTES_PER_SECOND
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
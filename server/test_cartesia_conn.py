@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test CartesiaConnection reconnect behaviour against a local flaky WebSocket stub
+(no Cartesia account needed). Run with pytest or directly: python test_cartesia_conn.py
+"""
+
+import asyncio
+
+import websockets
+
+from cartesia_conn import CartesiaConnection, ConnState, backoff_delay
+
+
+class FlakyServer:
+    """Records binary frames; can be taken down and brought back on the same port."""
+
+    def __init__(self) -> None:
+        self.received = bytearray()
+        self.handshakes = 0
+        self.port = 0
+        self._server = None
+        self._conns: list = []
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def handler(self, ws) -> None:
+        self.handshakes += 1
+        self._conns.append(ws)
+        async for msg in ws:
+            if isinstance(msg, bytes):
+                self.received.extend(msg)
+
+    async def up(self) -> None:
+        self._server = await websockets.serve(self.handler, "127.0.0.1", self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def down(self) -> None:
+        self._server.close()
+        for ws in self._conns:
+            await ws.close()
+        self._conns.clear()
+        await self._server.wait_closed()
+
+
+def _make_conn(server: FlakyServer, buffer_bytes: int = 0) -> CartesiaConnection:
+    conn: CartesiaConnection
+
+    def watch(ws) -> None:
+        # Stand-in for the STT/TTS reader task: report the socket when it dies
+        async def read() -> None:
+            async for _ in ws:
+                pass
+            conn.connection_lost(ws)
+        asyncio.create_task(read())
+
+    conn = CartesiaConnection("test", server.url, on_connect=watch,
+                              buffer_bytes=buffer_bytes, backoff_base=0.02, backoff_max=0.1)
+    return conn
+
+
+async def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_backoff_delay_grows_and_caps():
+    for attempt, ceiling in [(0, 0.5), (1, 1.0), (3, 4.0), (10, 30.0)]:
+        for _ in range(20):
+            assert ceiling / 2 <= backoff_delay(attempt) <= ceiling
+
+
+def test_outage_buffers_audio_and_flushes_after_reconnect():
+    async def run():
+        server = FlakyServer()
+        await server.up()
+        conn = _make_conn(server, buffer_bytes=1000)
+        await conn.connect()
+        assert await conn.send(b"a" * 10)
+
+        await server.down()
+        await _wait_for(lambda: conn.state is not ConnState.CONNECTED)
+
+        frames = [bytes([i]) * 10 for i in range(200)]
+        for frame in frames:
+            assert not await conn.send(frame)
+        assert conn.dropped_bytes == 1000  # 2000 sent, 1000 kept
+
+        await server.up()
+        await _wait_for(lambda: len(server.received) == 1010)
+        assert conn.state is ConnState.CONNECTED
+        assert conn.reconnects == 1
+        assert bytes(server.received) == b"a" * 10 + b"".join(frames[100:])
+        await conn.close()
+        await server.down()
+
+    asyncio.run(run())
+
+
+def test_sends_during_outage_do_not_storm_reconnects():
+    async def run():
+        server = FlakyServer()
+        await server.up()
+        conn = _make_conn(server)
+        await conn.connect()
+        await server.down()
+        await _wait_for(lambda: conn.state is not ConnState.CONNECTED)
+
+        for _ in range(300):
+            await conn.send(b"\x00" * 640)
+            await asyncio.sleep(0.001)
+        # ~0.4 s of outage at 20-100 ms backoff: a handful of attempts, not 300
+        assert 1 <= conn.connect_failures <= 10
+        assert conn.dropped_bytes == 300 * 640  # no buffer configured
+
+        await server.up()
+        await _wait_for(lambda: conn.state is ConnState.CONNECTED)
+        assert server.handshakes == 2
+        await conn.close()
+        await server.down()
+
+    asyncio.run(run())
+
+
+def test_wait_connected_times_out_then_recovers():
+    async def run():
+        server = FlakyServer()
+        await server.up()
+        conn = _make_conn(server)
+        await conn.connect()
+        await server.down()
+        await _wait_for(lambda: conn.state is not ConnState.CONNECTED)
+
+        assert await conn.wait_connected(timeout=0.05) is None
+        await server.up()
+        ws = await conn.wait_connected(timeout=2)
+        assert ws is not None and conn.healthy
+        await conn.close()
+        assert await conn.wait_connected(timeout=0.05) is None
+        await server.down()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Test the Cartesia connection pool against a local fake WebSocket server
+(no Cartesia account needed). Run with pytest or directly: python test_cartesia_pool.py
+"""
+
+import asyncio
+import json
+
+import websockets
+
+import cartesia_stt
+from cartesia_pool import CartesiaPool
+from cartesia_stt import CartesiaSTT
+from cartesia_tts import CartesiaTTS
+
+
+class FakeCartesia:
+    """Counts handshakes; answers audio with a final transcript.
+
+    A finalize is answered after finalize_delay with a last transcript
+    ("late words") and then flush_done, unless ack_finalize is off.
+    """
+
+    def __init__(self, finalize_delay: float = 0.0, ack_finalize: bool = True) -> None:
+        self.finalize_delay = finalize_delay
+        self.ack_finalize = ack_finalize
+        self.handshakes = 0
+        self.connections: list = []
+        self.url = ""
+
+    async def handler(self, ws) -> None:
+        self.handshakes += 1
+        self.connections.append(ws)
+        async for msg in ws:
+            if isinstance(msg, bytes):
+                await ws.send(json.dumps({"type": "transcript", "text": "hello there", "is_final": True}))
+            elif msg == "finalize" and self.ack_finalize:
+                await asyncio.sleep(self.finalize_delay)
+                await ws.send(json.dumps({"type": "transcript", "text": "late words", "is_final": True}))
+                await ws.send(json.dumps({"type": "flush_done"}))
+
+    async def __aenter__(self) -> "FakeCartesia":
+        self._server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+
+def _make_pool(fake: FakeCartesia, size: int = 2) -> CartesiaPool:
+    return CartesiaPool(
+        size=size,
+        stt_factory=lambda: CartesiaSTT(url=fake.url),
+        tts_factory=lambda: CartesiaTTS(url=fake.url),
+    )
+
+
+def test_start_prewarms_connections():
+    async def run():
+        async with FakeCartesia() as fake:
+            pool = _make_pool(fake, size=2)
+            await pool.start()
+            assert fake.handshakes == 4  # 2 STT + 2 TTS
+            assert pool.stt.idle_count == 2
+            assert pool.tts.idle_count == 2
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_lease_reuses_warm_connection():
+    async def run():
+        async with FakeCartesia() as fake:
+            pool = _make_pool(fake, size=1)
+            await pool.start()
+            before = fake.handshakes
+
+            tts = await pool.lease_tts()
+            assert tts.healthy
+            assert fake.handshakes == before  # no handshake on the lease path
+
+            await asyncio.sleep(0.05)  # background refill tops the pool back up
+            assert pool.tts.idle_count == 1
+            await pool.release_tts(tts)
+            assert pool.tts.idle_count == 1  # pool already full, extra is closed
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_stt_lease_rebinds_transcript_handler():
+    async def run():
+        async with FakeCartesia() as fake:
+            pool = _make_pool(fake, size=1)  # not started: no refill, so the client comes back
+
+            first: list[str] = []
+            second: list[str] = []
+
+            async def on_first(text: str) -> None:
+                first.append(text)
+
+            async def on_second(text: str) -> None:
+                second.append(text)
+
+            stt = await pool.lease_stt(on_first)
+            await stt.send_pcm(b"\x00" * 640)
+            await asyncio.sleep(0.1)
+            await pool.release_stt(stt)
+
+            stt2 = await pool.lease_stt(on_second)
+            assert stt2 is stt
+            await stt2.send_pcm(b"\x00" * 640)
+            await asyncio.sleep(0.1)
+
+            assert first == ["hello there"]
+            assert second == ["hello there"]
+            await pool.release_stt(stt2)
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_late_finalize_transcript_not_delivered_to_next_lessee():
+    async def run():
+        async with FakeCartesia(finalize_delay=0.2) as fake:
+            pool = _make_pool(fake, size=1)
+            first: list[str] = []
+            second: list[str] = []
+
+            async def on_first(text: str) -> None:
+                first.append(text)
+
+            async def on_second(text: str) -> None:
+                second.append(text)
+
+            stt = await pool.lease_stt(on_first)
+            releasing = asyncio.create_task(pool.release_stt(stt))
+            await asyncio.sleep(0.05)
+            # Not back in the pool until Cartesia acknowledges the finalize
+            assert pool.stt.idle_count == 0
+            await releasing
+            assert pool.stt.idle_count == 1
+
+            stt2 = await pool.lease_stt(on_second)
+            assert stt2 is stt
+            await asyncio.sleep(0.1)
+            assert first == []
+            assert second == []
+            await pool.release_stt(stt2)
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_unacknowledged_finalize_closes_client():
+    async def run():
+        original = cartesia_stt.FINALIZE_TIMEOUT
+        cartesia_stt.FINALIZE_TIMEOUT = 0.1
+        try:
+            async with FakeCartesia(ack_finalize=False) as fake:
+                pool = _make_pool(fake, size=1)
+                stt = await pool.lease_stt(lambda text: asyncio.sleep(0))
+                await pool.release_stt(stt)
+                assert pool.stt.idle_count == 0
+                assert not stt.healthy
+                await pool.close()
+        finally:
+            cartesia_stt.FINALIZE_TIMEOUT = original
+
+    asyncio.run(run())
+
+
+def test_sweep_does_not_resurrect_clients_leased_during_it():
+    async def run():
+        async with FakeCartesia() as fake:
+            pool = _make_pool(fake, size=2)
+            await pool.start()
+            healthy, dead = pool.tts._idle
+            await dead._conn.ws.close()
+            await asyncio.sleep(0.1)
+            assert not dead.healthy
+            close = dead.close
+            closes = 0
+
+            async def slow_close() -> None:
+                nonlocal closes
+                closes += 1
+                if closes == 1:  # only the sweep's close is slow
+                    await asyncio.sleep(0.05)
+                await close()
+            dead.close = slow_close
+
+            sweeping = asyncio.create_task(pool.tts.sweep())
+            await asyncio.sleep(0.01)  # sweep is now closing the dead client
+            leased = await pool.tts.lease()
+            assert leased is healthy
+            await sweeping
+            # A leased client must not also be handed out from the idle list
+            assert pool.tts._idle == []
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_sweep_replaces_dead_connections():
+    async def run():
+        async with FakeCartesia() as fake:
+            pool = _make_pool(fake, size=1)
+            await pool.start()
+            for ws in list(fake.connections):
+                await ws.close()
+            await asyncio.sleep(0.1)
+
+            await pool.tts.sweep()
+            assert pool.tts.idle_count == 0
+            await pool.tts.fill()
+            assert pool.tts.idle_count == 1
+            assert pool.tts._idle[0].healthy
+            await pool.close()
+
+    asyncio.run(run())
+
+
+def test_lease_without_start_connects_on_demand():
+    async def run():
+        async with FakeCartesia() as fake:
+            pool = _make_pool(fake, size=1)
+            tts = await pool.lease_tts()
+            assert tts.healthy
+            assert fake.handshakes == 1
+            await pool.release_tts(tts)
+            assert pool.tts.idle_count == 1
+            await pool.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test TTS context demultiplexing against a local fake Cartesia server
+(no Cartesia account needed). Run with pytest or directly: python test_cartesia_tts.py
+"""
+
+import asyncio
+import base64
+import json
+
+import websockets
+
+import cartesia_tts
+from cartesia_tts import CARTESIA_VOICE_ID, TTS_MODEL_ID, CartesiaTTS
+from models import SessionState
+from tts_cache import TTSAudioCache
+
+
+class FakeTTSServer:
+    """Streams each request's transcript back as 3 interleaved audio chunks."""
+
+    def __init__(self, drop_after_request: bool = False) -> None:
+        self.drop_after_request = drop_after_request
+        self.handshakes = 0
+        self.url = ""
+
+    async def handler(self, ws) -> None:
+        self.handshakes += 1
+        async for raw in ws:
+            req = json.loads(raw)
+            if req.get("cancel"):
+                continue
+            if self.drop_after_request:
+                await ws.close()
+                return
+            asyncio.create_task(self._stream(ws, req))
+
+    async def _stream(self, ws, req) -> None:
+        payload = req["transcript"].encode()
+        for i in range(3):
+            await asyncio.sleep(0.01)  # yield so concurrent contexts interleave
+            await ws.send(json.dumps({
+                "type": "chunk",
+                "context_id": req["context_id"],
+                "data": base64.b64encode(payload + bytes([i])).decode(),
+                "done": False,
+            }))
+        await ws.send(json.dumps({"type": "done", "context_id": req["context_id"], "done": True}))
+
+    async def __aenter__(self) -> "FakeTTSServer":
+        self._server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+
+class FakeClientWS:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.texts: list[str] = []
+        self.delay = delay
+
+    async def send_text(self, text: str) -> None:
+        await asyncio.sleep(self.delay)
+        self.texts.append(text)
+
+    async def send_json(self, msg) -> None:
+        self.texts.append(json.dumps(msg))
+
+
+def _expected(text: str) -> bytes:
+    return b"".join(text.encode() + bytes([i]) for i in range(3))
+
+
+def test_concurrent_synthesize_on_one_socket():
+    async def run():
+        async with FakeTTSServer() as fake:
+            tts = CartesiaTTS(url=fake.url)
+            await tts.connect()
+            texts = ["first sentence", "second sentence", "third sentence"]
+            results = await asyncio.gather(*(tts.synthesize(t, voice_id="v") for t in texts))
+            assert results == [_expected(t) for t in texts]
+            assert fake.handshakes == 1
+            assert tts._contexts == {}
+            await tts.close()
+
+    asyncio.run(run())
+
+
+def test_speak_while_prefetching_next_sentence():
+    async def run():
+        async with FakeTTSServer() as fake:
+            tts = CartesiaTTS(url=fake.url)
+            await tts.connect()
+            client = FakeClientWS()
+            session = SessionState(session_id="s")
+            sent, prefetched = await asyncio.gather(
+                tts.speak("spoken now (uncached)", client, session),
+                tts.synthesize("spoken next", voice_id="v"),
+            )
+            assert sent == len(_expected("spoken now (uncached)"))
+            assert prefetched == _expected("spoken next")
+            await tts.close()
+
+    asyncio.run(run())
+
+
+def test_lost_socket_wakes_waiting_contexts():
+    async def run():
+        async with FakeTTSServer(drop_after_request=True) as fake:
+            tts = CartesiaTTS(url=fake.url)
+            await tts.connect()
+            result = await asyncio.wait_for(tts.synthesize("hello", voice_id="v"), timeout=2)
+            assert result is None
+            assert not tts.healthy
+            await tts.close()
+
+    asyncio.run(run())
+
+
+def test_speak_caches_completed_utterance():
+    async def run():
+        original = cartesia_tts.tts_cache
+        cartesia_tts.tts_cache = cache = TTSAudioCache(cache_dir="", persist=False)
+        try:
+            async with FakeTTSServer() as fake:
+                tts = CartesiaTTS(url=fake.url)
+                await tts.connect()
+                client = FakeClientWS()
+                text = "worth caching"
+                sent = await tts.speak(text, client, SessionState(session_id="s"))
+                assert sent == len(_expected(text))
+                assert cache.get(CARTESIA_VOICE_ID, TTS_MODEL_ID, text) == _expected(text)
+                # JSON clients get Cartesia's payloads relayed verbatim
+                chunks = [json.loads(t) for t in client.texts if '"audio"' in t]
+                assert [base64.b64decode(c["audio"]) for c in chunks] == [
+                    text.encode() + bytes([i]) for i in range(3)]
+                await tts.close()
+        finally:
+            cartesia_tts.tts_cache = original
+
+    asyncio.run(run())
+
+
+def test_cancel_stops_cached_playback():
+    async def run():
+        tts = CartesiaTTS(url="ws://127.0.0.1:9")
+        client = FakeClientWS(delay=0.01)
+        session = SessionState(session_id="s")
+        pcm = b"\x00" * 24000 * 2 * 2  # 2 s of canonical audio, sent in 100 ms pieces
+        playback = asyncio.create_task(tts.play_pcm(pcm, client, session))
+        await asyncio.sleep(0.035)
+        assert session.is_speaking
+        await tts.cancel(session)
+        sent = await playback
+        assert 0 < sent < len(pcm)
+        assert not session.is_speaking
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
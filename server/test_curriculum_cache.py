@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test that an unchanged curriculum page is served from the on-disk cache without
+re-crawling blocks or calling the LLM. Run with pytest or directly:
+python test_curriculum_cache.py
+"""
+
+import asyncio
+import json
+import tempfile
+from datetime import datetime, timezone
+
+from models import Curriculum
+from notion import read_curriculum
+from notion.client import set_notion_client
+from notion.curriculum_cache import CurriculumCache
+from notion_stub import NotionStub
+
+EXTRACTED = {
+    "title": "Backend onboarding",
+    "goals": ["Ship a fix in week one"],
+    "modules": [{"name": "Audio", "topics": ["STT"], "key_files": ["server/cartesia_stt.py"]}],
+    "milestones": [{"description": "First PR", "day_target": 5}],
+}
+
+
+def test_unchanged_page_skips_crawl_and_llm():
+    llm_calls = 0
+
+    async def fake_claude(prompt: str, max_tokens: int = 0) -> str:
+        nonlocal llm_calls
+        llm_calls += 1
+        return json.dumps(EXTRACTED)
+
+    async def run():
+        with NotionStub() as stub, tempfile.TemporaryDirectory() as tmp:
+            stub.add_children("curriculum", [stub.block("heading_1", "Backend onboarding")])
+            client = stub.client()
+            set_notion_client(client)
+            original = read_curriculum.call_claude, read_curriculum.curriculum_cache
+            read_curriculum.call_claude = fake_claude
+            read_curriculum.curriculum_cache = CurriculumCache(tmp)
+            try:
+                first = await read_curriculum.load_curriculum("curriculum")
+                crawled = len(stub.requests)
+                second = await read_curriculum.load_curriculum("curriculum")
+                repeat_requests = stub.requests[crawled:]
+
+                stub.touch("curriculum")
+                third = await read_curriculum.load_curriculum("curriculum")
+                # Crawled in the minute of the edit: not trusted yet
+                fourth = await read_curriculum.load_curriculum("curriculum")
+            finally:
+                read_curriculum.call_claude, read_curriculum.curriculum_cache = original
+                set_notion_client(None)
+                await client.aclose()
+
+        assert first.to_dict() == EXTRACTED
+        assert second.to_dict() == EXTRACTED
+        assert repeat_requests == [("GET", "/v1/pages/curriculum")]
+        assert third.to_dict() == EXTRACTED
+        assert fourth.to_dict() == EXTRACTED
+        assert llm_calls == 3  # first load, after the edit, and again within its minute
+
+    asyncio.run(run())
+
+
+def test_crawl_in_same_minute_as_edit_is_not_trusted():
+    curriculum = Curriculum.from_dict(EXTRACTED)
+    edited = "2024-05-01T10:15:00.000Z"
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CurriculumCache(tmp)
+        cache.put("page", edited, curriculum, crawled_at=datetime(2024, 5, 1, 10, 15, 40, tzinfo=timezone.utc))
+        assert cache.get("page", edited) is None  # a 10:15:50 edit would keep the same timestamp
+        cache.put("page", edited, curriculum, crawled_at=datetime(2024, 5, 1, 10, 16, 0, tzinfo=timezone.utc))
+        assert cache.get("page", edited).to_dict() == EXTRACTED
+        assert cache.get("page", "2024-05-01T10:17:00.000Z") is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
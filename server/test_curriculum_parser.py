@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test the local curriculum parser on a standard-layout page and its fallback on
+free-form pages. Run with pytest or directly: python test_curriculum_parser.py
+"""
+
+from notion.curriculum_parser import parse_curriculum
+from notion_stub import NotionStub
+
+block = NotionStub.block
+
+
+def code_item(text: str, path: str) -> dict:
+    item = block("bulleted_list_item", text)
+    item["bulleted_list_item"]["rich_text"].append(
+        {"type": "text", "plain_text": path, "annotations": {"code": True}}
+    )
+    return item
+
+
+def with_children(parent: dict, children: list[dict]) -> dict:
+    parent["has_children"] = True
+    parent["children"] = children
+    return parent
+
+
+def test_standard_layout_parses_locally():
+    blocks = [
+        block("heading_1", "Backend onboarding"),
+        block("paragraph", "Welcome! Work through this over your first two weeks."),
+        block("heading_2", "Goals"),
+        block("bulleted_list_item", "Understand the audio pipeline"),
+        block("bulleted_list_item", "Ship a fix"),
+        block("heading_2", "Modules"),
+        block("heading_3", "Audio pipeline"),
+        code_item("Speech to text ", "server/cartesia_stt.py"),
+        block("bulleted_list_item", "Playback pacing `server/playback.py`"),
+        with_children(block("toggle", "Notion sync"), [
+            block("to_do", "Trail pages"),
+            block("paragraph", "See `server/notion/write_trail.py`."),
+        ]),
+        block("heading_2", "Milestones"),
+        block("numbered_list_item", "Day 3: local server running"),
+        block("numbered_list_item", "Week 2 - first PR merged"),
+        block("heading_2", "Resources"),
+        block("bulleted_list_item", "Design doc `docs/audio.md`"),
+    ]
+    curriculum = parse_curriculum(blocks)
+
+    assert curriculum is not None
+    assert curriculum.title == "Backend onboarding"
+    assert curriculum.goals == ["Understand the audio pipeline", "Ship a fix"]
+    assert [m.name for m in curriculum.modules] == ["Audio pipeline", "Notion sync"]
+    audio, notion = curriculum.modules
+    assert audio.topics == ["Speech to text", "Playback pacing"]
+    assert audio.key_files == ["server/cartesia_stt.py", "server/playback.py"]
+    assert notion.topics == ["Trail pages"]
+    assert notion.key_files == ["server/notion/write_trail.py"]
+    assert [(m.description, m.day_target) for m in curriculum.milestones] == [
+        ("local server running", 3),
+        ("first PR merged", 6),
+    ]
+
+
+def test_free_form_page_falls_back():
+    prose = [
+        block("heading_1", "Hi!"),
+        block("paragraph", "Spend the first week reading the server code, then pair with the team."),
+    ]
+    flat_modules = [
+        block("heading_2", "Modules"),
+        block("bulleted_list_item", "Audio"),
+        block("bulleted_list_item", "Notion"),
+    ]
+    # Headings with bullets, but nothing that makes it a curriculum
+    team_page = [
+        block("heading_1", "Team wiki"),
+        block("heading_2", "Who to ask"),
+        block("bulleted_list_item", "Audio: Sam"),
+        block("bulleted_list_item", "Notion sync: Alex"),
+        block("heading_2", "Resources"),
+        block("bulleted_list_item", "Design docs"),
+        block("bulleted_list_item", "Incident runbook"),
+    ]
+    untitled_lists = [
+        block("heading_2", "Audio"),
+        block("bulleted_list_item", "Speech to text"),
+        block("heading_2", "Notion"),
+        block("bulleted_list_item", "Trail pages"),
+    ]
+    assert parse_curriculum(prose) is None
+    assert parse_curriculum(flat_modules) is None
+    assert parse_curriculum(team_page) is None
+    assert parse_curriculum(untitled_lists) is None
+    assert parse_curriculum([]) is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
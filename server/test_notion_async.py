@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test that Notion calls don't stall the event loop, against a local fake Notion
+server (no Notion account needed). Run with pytest or directly: python test_notion_async.py
+"""
+
+import asyncio
+import time
+
+import config
+from notion.client import set_notion_client
+from notion.rate_limit import RateLimiter
+from notion.read_curriculum import _fetch_all_blocks
+from notion.write_trail import TrailWriter
+from notion_stub import NotionStub
+
+LATENCY = 0.1  # seconds per fake Notion request
+
+
+async def _max_loop_gap(work) -> tuple[float, object]:
+    """Run work while a 10 ms ticker measures the longest gap between ticks."""
+    gaps: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.01)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    try:
+        result = await work
+    finally:
+        done.set()
+        await tick
+    return max(gaps), result
+
+
+def test_curriculum_fetch_does_not_block_loop():
+    async def run():
+        with NotionStub(latency=LATENCY) as stub:
+            parent = stub.block("toggle", "Module 1")
+            stub.add_children("curriculum", [stub.block("heading_1", "Onboarding"), parent])
+            stub.add_children(parent["id"], [stub.block("paragraph", "Read server/main.py")])
+            client = stub.client()
+            set_notion_client(client)
+            try:
+                gap, blocks = await _max_loop_gap(_fetch_all_blocks("curriculum"))
+            finally:
+                set_notion_client(None)
+                await client.aclose()
+
+        assert [b["type"] for b in blocks] == ["heading_1", "toggle"]
+        assert blocks[1]["children"][0]["paragraph"]["rich_text"][0]["plain_text"] == "Read server/main.py"
+        assert gap < LATENCY / 2, f"event loop stalled for {gap * 1000:.0f} ms"
+
+    asyncio.run(run())
+
+
+def test_curriculum_fetch_is_parallel_and_ordered():
+    async def run():
+        with NotionStub(latency=0.02, page_size=3) as stub:
+            modules = [stub.block("toggle", f"Module {m}") for m in range(5)]
+            stub.add_children("curriculum", modules)
+            for m, module in enumerate(modules):
+                stub.add_children(module["id"], [stub.block("to_do", f"Step {m}.{s}") for s in range(4)])
+            client = stub.client()
+            set_notion_client(client)
+            try:
+                blocks = await _fetch_all_blocks("curriculum", concurrency=3, limiter=RateLimiter(rate=0))
+            finally:
+                set_notion_client(None)
+                await client.aclose()
+
+        texts = [[c["to_do"]["rich_text"][0]["plain_text"] for c in b["children"]] for b in blocks]
+        assert texts == [[f"Step {m}.{s}" for s in range(4)] for m in range(5)]
+        assert 1 < stub.max_in_flight <= 3
+
+    asyncio.run(run())
+
+
+def test_trail_writes_do_not_block_loop():
+    async def run():
+        with NotionStub(latency=LATENCY) as stub:
+            client = stub.client()
+            set_notion_client(client)
+            parent_id = config.NOTION_PARENT_PAGE_ID
+            config.NOTION_PARENT_PAGE_ID = "parent"
+            try:
+                writer = TrailWriter()
+                gap_create, (page_id, url) = await _max_loop_gap(writer.create_trail_page("demo"))
+                await writer.append_glossary(page_id, {"VAD": "voice activity detection"})
+                gap_flush, _ = await _max_loop_gap(writer.flush())
+            finally:
+                config.NOTION_PARENT_PAGE_ID = parent_id
+                set_notion_client(None)
+                await client.aclose()
+
+        assert page_id and url
+        assert stub.children[page_id][-1]["type"] == "bulleted_list_item"
+        for gap in (gap_create, gap_flush):
+            assert gap < LATENCY / 2, f"event loop stalled for {gap * 1000:.0f} ms"
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test PlaybackScheduler: the playback clock, filler cadence and timeouts.
+Run with pytest or directly: python test_playback.py
+"""
+
+import asyncio
+import time
+
+import metrics
+from models import SessionState
+from playback import FILLER_LEAD, PlaybackScheduler
+
+
+class FakeTTS:
+    """speak() 'sends' seconds of audio per utterance, taking send_time to do it."""
+
+    def __init__(self, seconds: float, send_time: float = 0.0) -> None:
+        self.seconds = seconds
+        self.send_time = send_time
+        self.spoken: list[tuple[float, str]] = []
+
+    async def speak(self, text, ws, session) -> int:
+        self.spoken.append((time.monotonic(), text))
+        await asyncio.sleep(self.send_time)
+        return int(self.seconds * session.output_sample_rate * 2)
+
+
+def _scheduler(tts: FakeTTS) -> PlaybackScheduler:
+    return PlaybackScheduler(tts, ws=None, session=SessionState(session_id="s"))
+
+
+async def _answer(delay: float, value: str = "answer") -> str:
+    await asyncio.sleep(delay)
+    return value
+
+
+def test_playback_clock_follows_sent_audio():
+    async def run():
+        metrics.reset()
+        playback = _scheduler(FakeTTS(seconds=1.0))
+        assert playback.remaining() == 0.0
+        await playback.say("hello")
+        assert 0.9 < playback.remaining() <= 1.0
+        await playback.say("again")  # queued behind the first utterance
+        assert 1.9 < playback.remaining() <= 2.0
+        playback.finish()
+        assert metrics.snapshot()["summaries"]["playback.first_audio_ms"]["count"] == 1
+        assert "playback.silence_gap_ms" not in metrics.snapshot()["summaries"]
+
+    asyncio.run(run())
+
+
+def test_no_filler_when_answer_arrives_during_audio():
+    async def run():
+        tts = FakeTTS(seconds=1.0)
+        playback = _scheduler(tts)
+        await playback.say("on it")
+        task = asyncio.create_task(_answer(0.1))
+        assert await playback.say_while_pending(task, ["hmm", "still looking"], timeout=2) == "answer"
+        assert [text for _, text in tts.spoken] == ["on it"]
+
+    asyncio.run(run())
+
+
+def test_fillers_spaced_by_queued_audio():
+    async def run():
+        tts = FakeTTS(seconds=0.5)
+        playback = _scheduler(tts)
+        task = asyncio.create_task(_answer(0.45))
+        start = time.monotonic()
+        result = await playback.say_while_pending(task, ["one", "two", "three"], timeout=2)
+        assert result == "answer"
+        times = [t - start for t, _ in tts.spoken]
+        assert [text for _, text in tts.spoken] == ["one", "two"]
+        # The second filler waits until the first is nearly played out
+        assert abs(times[1] - (0.5 - FILLER_LEAD)) < 0.08
+
+    asyncio.run(run())
+
+
+def test_timeout_cancels_task():
+    async def run():
+        playback = _scheduler(FakeTTS(seconds=0.05))
+        task = asyncio.create_task(_answer(10))
+        try:
+            await playback.say_while_pending(task, ["hmm"], timeout=0.1)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("expected a timeout")
+        await asyncio.sleep(0)
+        assert task.cancelled()
+
+    asyncio.run(run())
+
+
+def test_task_finishing_during_filler_past_deadline_is_returned():
+    async def run():
+        # The filler takes longer to send than the whole timeout
+        playback = _scheduler(FakeTTS(seconds=0.5, send_time=0.2))
+        task = asyncio.create_task(_answer(0.05))
+        assert await playback.say_while_pending(task, ["hmm"], timeout=0.1) == "answer"
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
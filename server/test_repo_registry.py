@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test per-session repo contexts for the /api endpoints and LRU eviction of idle
+repos. Run with pytest or directly: python test_repo_registry.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api_routes
+from repo_registry import RepoRegistry
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "line_agent"))
+from repo_api import RepoApi  # noqa: E402
+
+
+def _repo(root: str, name: str, filename: str) -> str:
+    path = os.path.join(root, name)
+    os.makedirs(path)
+    with open(os.path.join(path, filename), "w") as f:
+        f.write("print('hi')\n")
+    return path
+
+
+def test_sessions_on_different_repos_do_not_clobber():
+    with tempfile.TemporaryDirectory() as root:
+        py_repo = _repo(root, "alpha", "app.py")
+        js_repo = _repo(root, "beta", "app.js")
+        registry = RepoRegistry(max_repos=4, default_path="")
+        original = api_routes.repo_registry
+        api_routes.repo_registry = registry
+        try:
+            alpha = registry.bind_session("session-a", py_repo)
+            beta = registry.bind_session("session-b", js_repo)
+            app = FastAPI()
+            app.include_router(api_routes.api_router)
+            client = TestClient(app)
+
+            by_session = client.get("/api/repo_scan", params={"session": "session-a"}).json()
+            by_header = client.get("/api/repo_scan", headers={"X-Session-Token": "session-b"}).json()
+            by_id = client.post(
+                "/api/read_file", params={"session": "session-a", "repo_id": alpha.repo_id}, json={"path": "app.py"}
+            ).json()
+            unknown = client.get("/api/repo_scan", params={"session": "nope"})
+            batch = client.post("/api/batch", params={"session": "session-a"}, json={"ops": [
+                {"op": "read_file", "args": {"path": "app.py"}},
+                {"op": "read_file", "args": {"path": "missing.py"}},
+                {"op": "repo_scan"},
+                {"op": "delete_repo"},
+            ]}).json()["results"]
+        finally:
+            api_routes.repo_registry = original
+
+        assert by_session["repo_id"] == alpha.repo_id and ".py" in by_session["extensions"]
+        assert by_header["repo_id"] == beta.repo_id and ".js" in by_header["extensions"]
+        assert "print('hi')" in by_id["text"]
+        assert unknown.status_code == 404
+        assert [r["ok"] for r in batch] == [True, False, True, False]
+        assert "print('hi')" in batch[0]["result"]["text"]
+        assert batch[1]["status"] == 404 and batch[3]["status"] == 400
+        assert batch[2]["result"]["repo_id"] == alpha.repo_id
+
+
+def test_agent_api_calls_scoped_to_their_session():
+    """Two Line agents on different repos, each through its session's RepoApi."""
+    with tempfile.TemporaryDirectory() as root:
+        registry = RepoRegistry(max_repos=4, default_path="")
+        registry.bind_session("session-a", _repo(root, "alpha", "app.py"))
+        beta = registry.bind_session("session-b", _repo(root, "beta", "app.js"))
+        original = api_routes.repo_registry
+        api_routes.repo_registry = registry
+        app = FastAPI()
+        app.include_router(api_routes.api_router)
+        transport = httpx.ASGITransport(app=app)
+
+        async def run():
+            agent_a = RepoApi(session_token="session-a", server_url="http://test", transport=transport)
+            agent_b = RepoApi(session_token="session-b", server_url="http://test", transport=transport)
+            by_id = RepoApi(
+                session_token="session-b", repo_id=beta.repo_id, server_url="http://test", transport=transport
+            )
+            return await asyncio.gather(
+                agent_a.get("/api/repo_scan"),
+                agent_b.get("/api/repo_scan"),
+                agent_a.post("/api/read_file", {"path": "app.py"}),
+                by_id.post("/api/read_file", {"path": "app.js"}),
+                agent_b.batch([
+                    {"op": "read_file", "args": {"path": "app.js"}},
+                    {"op": "read_file", "args": {"path": "app.py"}},
+                    {"op": "search", "args": {"pattern": "print"}},
+                ]),
+            )
+
+        try:
+            scan_a, scan_b, file_a, file_b, batch_b = asyncio.run(run())
+        finally:
+            api_routes.repo_registry = original
+        assert list(scan_a["extensions"]) == [".py"]
+        assert list(scan_b["extensions"]) == [".js"]
+        assert file_a["path"] == "app.py" and file_b["path"] == "app.js"
+        # The batch runs against session-b's repo only
+        assert [r["ok"] for r in batch_b] == [True, False, True]
+        assert batch_b[1]["status"] == 404
+
+
+def test_registering_a_repo_needs_a_live_session():
+    with tempfile.TemporaryDirectory() as root:
+        registry = RepoRegistry(max_repos=4, default_path="")
+        registry.bind_session("session-a", _repo(root, "alpha", "app.py"))
+        extra = _repo(root, "extra", "lib.py")
+        original = api_routes.repo_registry
+        api_routes.repo_registry = registry
+        try:
+            app = FastAPI()
+            app.include_router(api_routes.api_router)
+            client = TestClient(app)
+            anonymous = client.post("/api/repos", json={"path": extra})
+            forged = client.post("/api/repos", json={"path": extra}, headers={"X-Session-Token": "guess"})
+            allowed = client.post("/api/repos", json={"path": extra}, headers={"X-Session-Token": "session-a"})
+        finally:
+            api_routes.repo_registry = original
+        assert anonymous.status_code == 401
+        assert forged.status_code == 403
+        assert allowed.status_code == 200
+        assert len(registry) == 2
+
+
+def test_repo_id_only_reaches_repos_the_session_opened():
+    with tempfile.TemporaryDirectory() as root:
+        registry = RepoRegistry(max_repos=4, default_path="")
+        alpha = registry.bind_session("session-a", _repo(root, "alpha", "app.py"))
+        beta = registry.bind_session("session-b", _repo(root, "beta", "app.js"))
+        extra = _repo(root, "extra", "lib.py")
+        original = api_routes.repo_registry
+        api_routes.repo_registry = registry
+        try:
+            app = FastAPI()
+            app.include_router(api_routes.api_router)
+            client = TestClient(app)
+            a = {"X-Session-Token": "session-a"}
+
+            own = client.get("/api/repo_scan", params={"repo_id": alpha.repo_id}, headers=a)
+            other = client.get("/api/repo_scan", params={"repo_id": beta.repo_id}, headers=a)
+            other_batch = client.post(
+                "/api/batch", params={"repo_id": beta.repo_id}, headers=a, json={"ops": [{"op": "repo_scan"}]}
+            )
+            no_token = client.get("/api/repo_scan", params={"repo_id": alpha.repo_id})
+            anonymous = client.get("/api/repo_scan")
+            extra_id = client.post("/api/repos", json={"path": extra}, headers=a).json()["repo_id"]
+            opened = client.post("/api/read_file", params={"repo_id": extra_id}, headers=a, json={"path": "lib.py"})
+            not_b = client.get("/api/repo_scan", params={"repo_id": extra_id}, headers={"X-Session-Token": "session-b"})
+        finally:
+            api_routes.repo_registry = original
+
+        assert own.status_code == 200 and own.json()["repo_id"] == alpha.repo_id
+        assert other.status_code == 403 and other_batch.status_code == 403
+        assert no_token.status_code == 401 and anonymous.status_code == 401
+        assert opened.status_code == 200 and "print('hi')" in opened.json()["text"]
+        assert not_b.status_code == 403
+
+        # Repos a session opened stay registered until it ends
+        registry.release_session("session-a")
+        assert registry.resolve("session-a", extra_id) is None
+        assert registry.resolve("session-b") is beta
+
+
+def test_new_session_rescans_an_idle_repo():
+    with tempfile.TemporaryDirectory() as root:
+        path = _repo(root, "alpha", "app.py")
+        registry = RepoRegistry(max_repos=4, default_path="")
+
+        async def files(token: str) -> int:
+            return (await registry.bind_session(token, path).get_scan()).total_files
+
+        async def run():
+            first = await files("one")
+            with open(os.path.join(path, "extra.py"), "w") as f:
+                f.write("x = 1\n")
+            shared = await files("two")       # "one" is still live: reuse its scan
+            registry.release_session("one")
+            registry.release_session("two")
+            fresh = await files("three")      # idle again: rescan
+            return first, shared, fresh
+
+        assert asyncio.run(run()) == (1, 1, 2)
+
+
+def test_idle_repos_are_evicted_lru():
+    registry = RepoRegistry(max_repos=2, default_path="")
+    pinned = registry.bind_session("live", "/repos/pinned")
+    first = registry.open("/repos/one")
+    second = registry.open("/repos/two")
+
+    assert len(registry) == 2
+    assert pinned.repo_id in registry        # live session keeps it
+    assert first.repo_id not in registry     # least recently used idle repo
+
+    # Once released it ages out like any idle repo
+    registry.release_session("live")
+    registry.open("/repos/three")
+    assert pinned.repo_id not in registry
+    registry.open("/repos/four")
+    assert second.repo_id not in registry
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test speculative prefetch on interim transcripts.
+Run with pytest or directly: python test_speculative.py
+"""
+
+import asyncio
+
+import metrics
+from models import SessionState
+from orchestrator import chat, speculative
+from orchestrator.speculative import STABLE_EVENTS, SpeculativePrefetch
+
+QUESTION = "where is the audio pipeline"
+
+
+def _fake_prefetch(calls: list[str], delay: float = 0.0):
+    async def prefetch(session, text):
+        calls.append(text)
+        await asyncio.sleep(delay)
+        return {"intent": "find"}, text
+    return prefetch
+
+
+def _patched(calls: list[str], delay: float = 0.0):
+    original = speculative.prefetch_plan_and_evidence
+    speculative.prefetch_plan_and_evidence = _fake_prefetch(calls, delay)
+    return original
+
+
+def test_speculates_only_once_stable():
+    async def run():
+        calls: list[str] = []
+        original = _patched(calls)
+        try:
+            spec = SpeculativePrefetch(SessionState("s1"))
+            spec.on_interim("where is")  # too short, however stable
+            spec.on_interim("where is")
+            spec.on_interim(QUESTION)
+            await asyncio.sleep(0)
+            assert calls == []
+            for _ in range(STABLE_EVENTS - 1):
+                spec.on_interim(QUESTION + "!")  # punctuation doesn't reset stability
+            await asyncio.sleep(0)
+            assert len(calls) == 1
+            spec.on_interim(QUESTION)  # same text: no second task
+            await asyncio.sleep(0)
+            assert len(calls) == 1
+            spec.discard()
+        finally:
+            speculative.prefetch_plan_and_evidence = original
+
+    asyncio.run(run())
+
+
+def test_matching_final_reuses_task():
+    async def run():
+        metrics.reset()
+        calls: list[str] = []
+        original = _patched(calls)
+        try:
+            spec = SpeculativePrefetch(SessionState("s1"))
+            for _ in range(STABLE_EVENTS):
+                spec.on_interim(QUESTION)
+            task = spec.take("Where is the audio pipeline?")
+            assert task is not None
+            assert (await task)[1] == QUESTION
+            assert metrics.snapshot()["counters"]["speculative.reused"] == 1
+            assert spec.take(QUESTION) is None  # handed over once
+        finally:
+            speculative.prefetch_plan_and_evidence = original
+
+    asyncio.run(run())
+
+
+def test_mismatched_final_discards_task():
+    async def run():
+        metrics.reset()
+        calls: list[str] = []
+        original = _patched(calls, delay=1.0)
+        try:
+            spec = SpeculativePrefetch(SessionState("s1"))
+            for _ in range(STABLE_EVENTS):
+                spec.on_interim(QUESTION)
+            await asyncio.sleep(0)
+            running = spec._task
+            assert spec.take("how do I run the tests") is None
+            await asyncio.sleep(0)
+            assert running.cancelled()
+            assert metrics.snapshot()["counters"]["speculative.discarded"] == 1
+        finally:
+            speculative.prefetch_plan_and_evidence = original
+
+    asyncio.run(run())
+
+
+def test_cancelled_prefetch_is_recomputed():
+    async def run():
+        calls: list[str] = []
+        original_prefetch = chat.prefetch_plan_and_evidence
+        original_answer = chat._generate_detailed_answer
+        chat.prefetch_plan_and_evidence = _fake_prefetch(calls)
+
+        async def answer(session, user_text, plan, evidence):
+            return {"voice_answer": "here", "detailed_answer": evidence}
+        chat._generate_detailed_answer = answer
+        try:
+            prefetch = asyncio.create_task(asyncio.sleep(10))
+            await asyncio.sleep(0)
+            prefetch.cancel()
+            result = await chat._process_question_with_evidence(SessionState("s1"), QUESTION, prefetch)
+            assert calls == [QUESTION]
+            assert result["detailed_answer"] == QUESTION
+            assert "thinking_filler" not in result
+        finally:
+            chat.prefetch_plan_and_evidence = original_prefetch
+            chat._generate_detailed_answer = original_answer
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
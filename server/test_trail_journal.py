@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test that trail blocks Notion never received survive a restart via the
+journal, and that the journal is compacted. Run with pytest or directly:
+python test_trail_journal.py
+"""
+
+import asyncio
+import os
+import tempfile
+
+from notion import trail_journal as journal_module
+from notion.client import set_notion_client
+from notion.trail_journal import TrailJournal
+from notion.write_trail import TrailWriter
+from notion_stub import NotionStub
+
+
+def test_undelivered_blocks_replay_after_restart():
+    async def run():
+        with NotionStub() as stub, tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "journal.jsonl")
+            client = stub.client()
+            set_notion_client(client)
+            try:
+                # First run: Notion is down when the writer flushes, then the process dies
+                stub.fail_appends(503)
+                writer = TrailWriter(TrailJournal(path))
+                await writer.append_glossary("page", {"STT": "speech to text", "TTS": "text to speech"})
+                await writer.flush()
+                assert "page" not in stub.children
+
+                # Next run: a fresh journal on the same file restores and delivers them
+                journal = TrailJournal(path)
+                restarted = TrailWriter(journal)
+                assert restarted.restore() == 2
+                await restarted.flush()
+            finally:
+                set_notion_client(None)
+                await client.aclose()
+
+            journal.close()
+            assert len(stub.children["page"]) == 2
+            assert journal.pending == 0
+            assert os.path.getsize(path) == 0
+
+    asyncio.run(run())
+
+
+def test_journal_compacts_acknowledged_records():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "journal.jsonl")
+        compact_after = journal_module.COMPACT_AFTER
+        journal_module.COMPACT_AFTER = 10
+        try:
+            journal = TrailJournal(path)
+            keep = journal.append("page", [{"n": 0}])
+            for n in range(1, 20):
+                journal.ack(journal.append("page", [{"n": n}]))
+            journal.close()
+        finally:
+            journal_module.COMPACT_AFTER = compact_after
+
+        with open(path) as f:
+            assert sum(1 for _ in f) < 20
+        replayed = TrailJournal(path).replay()
+        assert [(entry_id, block) for entry_id, _, block in replayed] == [(keep[0], {"n": 0})]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test TrailWriter's scheduling against the local Notion stub: per-page
+coalescing, 429/Retry-After pauses, and retries. Run with pytest or directly:
+python test_trail_writer.py
+"""
+
+import asyncio
+import time
+
+import config
+from notion import write_trail
+from notion.client import set_notion_client
+from notion.write_trail import FLUSH_INTERVAL, MAX_ATTEMPTS, TrailWriter
+from notion_stub import NotionStub
+
+
+async def _with_stub(fn):
+    with NotionStub() as stub:
+        client = stub.client()
+        set_notion_client(client)
+        try:
+            await fn(stub, TrailWriter())
+        finally:
+            set_notion_client(None)
+            await client.aclose()
+
+
+def _appends(stub: NotionStub) -> list[str]:
+    return [path for method, path in stub.requests if method == "PATCH"]
+
+
+def test_appends_are_coalesced_per_page():
+    async def run(stub, writer):
+        for term in ("STT", "TTS", "VAD"):
+            await writer.append_glossary("page-a", {term: "..."})
+        await writer.append_glossary("page-b", {"PCM": "...", "Opus": "..."})
+        await writer.flush()
+
+        assert sorted(_appends(stub)) == ["/v1/blocks/page-a/children", "/v1/blocks/page-b/children"]
+        texts = [b["bulleted_list_item"]["rich_text"][0]["text"]["content"] for b in stub.children["page-a"]]
+        assert [t.split(":")[0] for t in texts] == ["**STT**", "**TTS**", "**VAD**"]
+        assert writer.pending_blocks == 0
+
+    asyncio.run(_with_stub(run))
+
+
+def test_pages_are_served_round_robin():
+    async def run(stub, writer):
+        await writer.append_glossary("busy", {f"term {i}": "..." for i in range(250)})
+        for page in ("quiet-1", "quiet-2"):
+            await writer.append_glossary(page, {"STT": "..."})
+        await writer.flush()
+
+        pages = [path.split("/")[3] for path in _appends(stub)]
+        assert pages == ["busy", "quiet-1", "quiet-2", "busy", "busy"]
+        assert len(stub.children["busy"]) == 250
+
+    asyncio.run(_with_stub(run))
+
+
+def test_blocks_wait_for_background_page_creation():
+    async def run(stub, writer):
+        stub.latency = 0.1
+        created: list[tuple[str, str]] = []
+
+        async def on_created(page_id: str, url: str) -> None:
+            created.append((page_id, url))
+
+        parent_id = config.NOTION_PARENT_PAGE_ID
+        config.NOTION_PARENT_PAGE_ID = "parent"
+        try:
+            start = time.perf_counter()
+            placeholder = writer.open_trail_page("demo", on_created)
+            assert time.perf_counter() - start < 0.05  # no Notion round trip
+            await writer.append_glossary(placeholder, {"STT": "speech to text"})
+            await writer.flush()
+            assert _appends(stub) == []
+
+            while not created:
+                await asyncio.sleep(0.01)
+            await writer.flush()
+        finally:
+            config.NOTION_PARENT_PAGE_ID = parent_id
+
+        page_id, url = created[0]
+        assert page_id and url
+        assert stub.children[page_id][-1]["type"] == "bulleted_list_item"
+        assert writer.pending_blocks == 0
+
+    asyncio.run(_with_stub(run))
+
+
+def test_rate_limit_pauses_and_keeps_blocks():
+    async def run(stub, writer):
+        stub.fail_appends(429, retry_after=0.3)
+        await writer.append_glossary("page", {"STT": "speech to text"})
+        await writer.flush()
+        assert writer.pending_blocks == 1
+        assert writer.interval == FLUSH_INTERVAL * 2
+
+        await writer.flush()  # still inside Retry-After: no request sent
+        assert len(_appends(stub)) == 1
+
+        await asyncio.sleep(0.35)
+        await writer.flush()
+        assert writer.pending_blocks == 0
+        assert len(stub.children["page"]) == 1
+        assert writer.interval == FLUSH_INTERVAL
+
+    asyncio.run(_with_stub(run))
+
+
+def test_rate_limit_without_retry_after_backs_off():
+    async def run(stub, writer):
+        retry_base = write_trail.RETRY_BASE
+        write_trail.RETRY_BASE = 0.02
+        try:
+            stub.fail_appends(429, count=3)
+            await writer.append_glossary("page", {"STT": "speech to text"})
+            pauses = []
+            for _ in range(3):
+                await asyncio.sleep(max(0.0, writer._paused_until - time.monotonic()))
+                await writer.flush()
+                pauses.append(writer._paused_until - time.monotonic())
+            # base * 2^n with 50-100% jitter: the third wait is at least 0.04s
+            assert pauses[2] > 0.035
+            assert pauses[2] > pauses[0]
+
+            await asyncio.sleep(max(0.0, writer._paused_until - time.monotonic()))
+            await writer.flush()
+            assert writer.pending_blocks == 0
+            assert len(_appends(stub)) == 4
+        finally:
+            write_trail.RETRY_BASE = retry_base
+
+    asyncio.run(_with_stub(run))
+
+
+def test_transient_errors_retry_and_rejections_drop():
+    async def run(stub, writer):
+        retry_base = write_trail.RETRY_BASE
+        write_trail.RETRY_BASE = 0.01
+        try:
+            stub.fail_appends(503, count=2)
+            await writer.append_glossary("flaky", {"STT": "..."})
+            deadline = time.monotonic() + 2
+            while writer.pending_blocks and time.monotonic() < deadline:
+                await writer.flush()
+                await asyncio.sleep(0.02)
+            assert len(stub.children["flaky"]) == 1
+
+            stub.fail_appends(400, count=MAX_ATTEMPTS)
+            await writer.append_glossary("rejected", {"VAD": "..."})
+            deadline = time.monotonic() + 2
+            while writer.pending_blocks and time.monotonic() < deadline:
+                await writer.flush()
+                await asyncio.sleep(0.02)
+            assert writer.pending_blocks == 0
+            assert "rejected" not in stub.children
+        finally:
+            write_trail.RETRY_BASE = retry_base
+
+    asyncio.run(_with_stub(run))
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the TTS audio cache: LRU byte budget and pinned phrase persistence.
+Run with pytest or directly: python test_tts_cache.py
+"""
+
+import asyncio
+import tempfile
+
+from tts_cache import TTSAudioCache
+
+
+class FakeTTS:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def synthesize(self, text: str, voice_id: str) -> bytes:
+        self.calls.append(text)
+        return text.encode()
+
+
+def test_lru_evicts_oldest_past_byte_budget():
+    cache = TTSAudioCache(max_bytes=10, cache_dir="", persist=False)
+    cache.put("v", "m", "a", b"1111")
+    cache.put("v", "m", "b", b"2222")
+    assert cache.get("v", "m", "a") == b"1111"  # a is now most recently used
+    cache.put("v", "m", "c", b"3333")
+    assert cache.size_bytes == 8
+    assert cache.get("v", "m", "b") is None
+    assert cache.get("v", "m", "a") == b"1111"
+    assert cache.get("v", "m", "c") == b"3333"
+
+    cache.put("v", "m", "huge", b"x" * 11)  # larger than the whole budget
+    assert cache.get("v", "m", "huge") is None
+    assert cache.size_bytes == 8
+    assert cache.hit_rate == 3 / 5
+
+
+def test_keys_include_voice_and_model():
+    cache = TTSAudioCache(max_bytes=100, cache_dir="", persist=False)
+    cache.put("v1", "m", "hello", b"one")
+    assert cache.get("v2", "m", "hello") is None
+    assert cache.get("v1", "m2", "hello") is None
+    assert cache.get("v1", "m", " hello ") == b"one"
+
+
+def test_pinned_phrases_persist_and_reload():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            tts = FakeTTS()
+            first = TTSAudioCache(max_bytes=4, cache_dir=tmp, persist=False)
+            await first.warm(tts, ["Welcome back!", "Goodbye!", "Goodbye!"], "v", "m")
+            assert sorted(tts.calls) == ["Goodbye!", "Welcome back!"]
+            # Pinned entries sit outside the LRU budget
+            assert first.get("v", "m", "Welcome back!") == b"Welcome back!"
+            assert first.size_bytes == 0
+
+            restarted = TTSAudioCache(max_bytes=4, cache_dir=tmp, persist=False)
+            await restarted.warm(tts, ["Welcome back!", "Goodbye!", "See you"], "v", "m")
+            assert sorted(tts.calls) == ["Goodbye!", "See you", "Welcome back!"]
+            assert restarted.get("v", "m", "Goodbye!") == b"Goodbye!"
+            restarted.put("v", "m", "Goodbye!", b"other")  # pinned wins
+            assert restarted.get("v", "m", "Goodbye!") == b"Goodbye!"
+
+    asyncio.run(run())
+
+
+def test_regular_entries_persist_only_when_enabled():
+    with tempfile.TemporaryDirectory() as tmp:
+        TTSAudioCache(max_bytes=100, cache_dir=tmp, persist=False).put("v", "m", "a", b"aa")
+        assert TTSAudioCache(max_bytes=100, cache_dir=tmp, persist=True).get("v", "m", "a") is None
+        TTSAudioCache(max_bytes=100, cache_dir=tmp, persist=True).put("v", "m", "a", b"aa")
+        assert TTSAudioCache(max_bytes=100, cache_dir=tmp, persist=True).get("v", "m", "a") == b"aa"
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
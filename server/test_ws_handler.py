@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test session lifecycle in the WebSocket handler with fake Cartesia clients
+(no Cartesia or Notion account needed). Run with pytest or directly:
+python test_ws_handler.py
+"""
+
+import tempfile
+
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+import audio_uplink
+import cartesia_pool
+from notion.write_trail import trail_writer
+from ws_handler import handle_websocket
+
+
+class FakeSTT:
+    async def send_pcm(self, pcm: bytes) -> None:
+        pass
+
+
+class FakeTTS:
+    pass
+
+
+class FakePool:
+    """Records leases and releases instead of talking to Cartesia."""
+
+    def __init__(self) -> None:
+        self.leased: list = []
+        self.released: list = []
+
+    async def lease_stt(self, on_transcript, on_event=None):
+        client = FakeSTT()
+        self.leased.append(client)
+        return client
+
+    async def lease_tts(self):
+        client = FakeTTS()
+        self.leased.append(client)
+        return client
+
+    async def release_stt(self, client) -> None:
+        self.released.append(client)
+
+    async def release_tts(self, client) -> None:
+        self.released.append(client)
+
+
+class RecordingUplink(audio_uplink.AudioUplink):
+    instances: list = []
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        RecordingUplink.instances.append(self)
+
+
+def _run_session(fn) -> FakePool:
+    """Drive one WebSocket session against fakes; fn gets (ws, repo_path, pool)."""
+    pool = FakePool()
+    patched = [
+        (cartesia_pool, "cartesia_pool", pool),
+        (audio_uplink, "AudioUplink", RecordingUplink),
+        (trail_writer, "open_trail_page", lambda repo_name, on_created=None: ""),
+    ]
+    originals = [(obj, name, getattr(obj, name)) for obj, name, _ in patched]
+    for obj, name, value in patched:
+        setattr(obj, name, value)
+    RecordingUplink.instances = []
+    app = FastAPI()
+
+    @app.websocket("/ws")
+    async def endpoint(ws: WebSocket):
+        await handle_websocket(ws)
+
+    try:
+        with tempfile.TemporaryDirectory() as repo, TestClient(app).websocket_connect("/ws") as ws:
+            fn(ws, repo, pool)
+    finally:
+        for obj, name, value in originals:
+            setattr(obj, name, value)
+    return pool
+
+
+def _start(ws, repo: str) -> dict:
+    ws.send_json({"type": "start_session", "repo_path": repo, "curriculum_page_id": ""})
+    while True:
+        msg = ws.receive_json()
+        if msg["type"] == "session_info":
+            return msg
+
+
+def test_restarted_session_closes_previous_uplink():
+    def session(ws, repo, pool):
+        _start(ws, repo)
+        _start(ws, repo)
+        first, second = RecordingUplink.instances
+        assert first._closed and first._task is None
+        assert not second._closed
+
+    _run_session(session)
+    assert all(u._closed for u in RecordingUplink.instances)
+
+
+def test_restarted_session_returns_previous_clients_to_the_pool():
+    def session(ws, repo, pool):
+        _start(ws, repo)
+        _start(ws, repo)
+        assert len(pool.leased) == 4
+        # The first STT/TTS pair went back before the second was leased
+        assert pool.released == pool.leased[:2]
+
+    pool = _run_session(session)
+    assert sorted(map(id, pool.released)) == sorted(map(id, pool.leased))
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,207 @@
+"""
+Content-addressed cache of synthesized TTS audio.
+
+Entries are keyed by (voice_id, model_id, text) and hold the full PCM for an
+utterance, so any repeated line — quest announcements, goodbyes, cached chat
+answers — replays without a Cartesia round-trip. CartesiaTTS.speak checks the
+cache before opening a TTS context and stores every utterance it completes.
+
+Two kinds of entries:
+- Pinned: the fixed phrases from conversation_flow, synthesized once per
+  voice at startup and always persisted under TTS_CACHE_DIR so restarts
+  (including uvicorn --reload) skip Cartesia entirely. Never evicted.
+- Regular: everything else, evicted least-recently-used once the total
+  exceeds TTS_CACHE_MAX_BYTES. Persisted only when TTS_CACHE_PERSIST is on.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import metrics
+from config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, TTS_CACHE_PERSIST
+
+if TYPE_CHECKING:
+    from cartesia_tts import CartesiaTTS
+
+logger = logging.getLogger(__name__)
+
+WARM_CONCURRENCY = 4  # phrases synthesized at once during warm-up
+
+CacheKey = tuple[str, str, str]  # (voice_id, model_id, sha1 of text)
+
+
+def _cache_key(voice_id: str, model_id: str, text: str) -> CacheKey:
+    return (voice_id, model_id, hashlib.sha1(text.strip().encode()).hexdigest())
+
+
+class TTSAudioCache:
+    """LRU byte-budgeted PCM cache with pinned entries and optional disk persistence."""
+
+    def __init__(
+        self,
+        max_bytes: int = TTS_CACHE_MAX_BYTES,
+        cache_dir: str = TTS_CACHE_DIR,
+        persist: bool = TTS_CACHE_PERSIST,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self._dir = Path(cache_dir) if cache_dir else None
+        self._persist = persist
+        self._lru: OrderedDict[CacheKey, bytes] = OrderedDict()
+        self._pinned: dict[CacheKey, bytes] = {}
+        self._lru_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    # --- Lookup / store ---
+
+    def get(self, voice_id: str, model_id: str, text: str) -> bytes | None:
+        key = _cache_key(voice_id, model_id, text)
+        pcm = self._pinned.get(key)
+        if pcm is None:
+            pcm = self._lru.get(key)
+            if pcm is not None:
+                self._lru.move_to_end(key)
+            elif self._persist:
+                pcm = self._read(key)
+                if pcm is not None:
+                    self._insert(key, pcm)
+
+        if pcm is None:
+            self.misses += 1
+            metrics.incr("tts_cache.misses")
+        else:
+            self.hits += 1
+            self.bytes_saved += len(pcm)
+            metrics.incr("tts_cache.hits")
+            metrics.incr("tts_cache.bytes_saved", len(pcm))
+        metrics.set_gauge("tts_cache.hit_rate", self.hit_rate)
+        return pcm
+
+    def put(self, voice_id: str, model_id: str, text: str, pcm: bytes) -> None:
+        """Cache a completed utterance (no-op if it alone exceeds the budget)."""
+        key = _cache_key(voice_id, model_id, text)
+        if not pcm or key in self._pinned or len(pcm) > self.max_bytes:
+            return
+        self._insert(key, pcm)
+        if self._persist:
+            self._write(key, pcm)
+
+    def pin(self, voice_id: str, model_id: str, text: str, pcm: bytes) -> None:
+        """Cache a canned phrase permanently (outside the LRU budget)."""
+        key = _cache_key(voice_id, model_id, text)
+        self._pinned[key] = pcm
+        self._write(key, pcm)
+        metrics.set_gauge("tts_cache.pinned_bytes", sum(len(p) for p in self._pinned.values()))
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._lru_bytes
+
+    # --- Warm-up ---
+
+    async def warm(self, tts: CartesiaTTS, phrases: list[str], voice_id: str, model_id: str) -> None:
+        """Pin phrases from disk and synthesize whatever is missing."""
+        missing: list[str] = []
+        found = 0
+        for text in dict.fromkeys(phrases):
+            if not text.strip():
+                continue
+            key = _cache_key(voice_id, model_id, text)
+            pcm = self._pinned.get(key) or self._read(key)
+            if pcm is None:
+                missing.append(text)
+            else:
+                self._pinned[key] = pcm
+                found += 1
+        logger.info(
+            "Phrase audio cache: %d on disk, %d to synthesize",
+            found, len(missing),
+        )
+        # Contexts are multiplexed on one socket, so phrases synthesize in parallel
+        limit = asyncio.Semaphore(WARM_CONCURRENCY)
+
+        async def _synthesize(text: str) -> None:
+            async with limit:
+                try:
+                    pcm = await tts.synthesize(text, voice_id=voice_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning("Phrase synthesis failed for %r: %s", text, e)
+                    return
+            if pcm:
+                self.pin(voice_id, model_id, text, pcm)
+
+        await asyncio.gather(*(_synthesize(text) for text in missing))
+
+    # --- Internals ---
+
+    def _insert(self, key: CacheKey, pcm: bytes) -> None:
+        old = self._lru.pop(key, None)
+        if old is not None:
+            self._lru_bytes -= len(old)
+        self._lru[key] = pcm
+        self._lru_bytes += len(pcm)
+        while self._lru_bytes > self.max_bytes and self._lru:
+            _, evicted = self._lru.popitem(last=False)
+            self._lru_bytes -= len(evicted)
+            metrics.incr("tts_cache.evictions")
+        metrics.set_gauge("tts_cache.bytes", self._lru_bytes)
+
+    def _path(self, key: CacheKey) -> Path | None:
+        if self._dir is None:
+            return None
+        voice_id, model_id, digest = key
+        return self._dir / voice_id / model_id / f"{digest}.pcm"
+
+    def _read(self, key: CacheKey) -> bytes | None:
+        path = self._path(key)
+        if path is None or not path.is_file():
+            return None
+        try:
+            return path.read_bytes()
+        except OSError as e:
+            logger.warning("Could not read cached audio %s: %s", path, e)
+            return None
+
+    def _write(self, key: CacheKey, pcm: bytes) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(pcm)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Could not persist cached audio %s: %s", path, e)
+
+
+tts_cache = TTSAudioCache()
+
+
+async def warm_phrase_cache(voice_id: str) -> None:
+    """Background startup task: pre-synthesize every canned phrase for a voice."""
+    from cartesia_tts import CartesiaTTS, TTS_MODEL_ID
+    from conversation_flow import canned_phrases
+
+    tts = CartesiaTTS()
+    try:
+        await tts.connect()
+        await tts_cache.warm(tts, canned_phrases(), voice_id, TTS_MODEL_ID)
+    except Exception as e:
+        logger.warning("Phrase cache warm-up failed: %s", e)
+    finally:
+        await tts.close()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import binascii
 import json
 import logging
 import uuid
@@ -8,15 +10,23 @@ from typing import Any
 
 from fastapi import WebSocket, WebSocketDisconnect
 
-from config import REPO_PATH, NOTION_CURRICULUM_PAGE_ID
+from config import REPO_PATH, NOTION_CURRICULUM_PAGE_ID, VAD_ENABLED
 from models import (
     MSG_AUDIO_IN, MSG_MODE_SWITCH, MSG_START_SESSION, MSG_STOP_SESSION,
     MSG_TRANSCRIPT, MSG_RESPONSE_TEXT, MSG_AUDIO_CHUNK, MSG_AUDIO_DONE,
     MSG_EVIDENCE, MSG_SESSION_INFO, MSG_MODE_CHANGED, MSG_CURRICULUM,
-    MSG_ERROR, MSG_QUEST, MSG_QUEST_RESULT,
+    MSG_ERROR, MSG_QUEST, MSG_QUEST_RESULT, MSG_TRAIL_INFO,
     SessionState,
 )
-from api_routes import set_repo_path
+from repo_registry import repo_registry
+from conversation_flow import GOODBYE_MESSAGE, TIMEOUT_FALLBACK, get_thinking_fillers
+from playback import PlaybackScheduler
+from audio_protocol import (
+    KIND_AUDIO_IN, FrameError, negotiate_transport, unpack_audio_frame,
+)
+from audio_dsp import StreamResampler, negotiate_encoding, negotiate_rate
+from audio_vad import VoiceActivityGate
+from audio_opus import CODEC_OPUS, OpusDecoder, OpusEncoder, negotiate_codec
 
 logger = logging.getLogger(__name__)
 
@@ -33,21 +43,38 @@ async def handle_websocket(ws: WebSocket) -> None:
     session = SessionState(session_id=str(uuid.uuid4()))
     stt_client = None
     tts_client = None
-    notion_flush_task: asyncio.Task | None = None
+    uplink = None
+    mic_resampler: StreamResampler | None = None
+    mic_decoder: OpusDecoder | None = None
+    vad_gate = VoiceActivityGate() if VAD_ENABLED else None
 
     # Lazy imports to avoid circular deps at module level
-    from cartesia_stt import CartesiaSTT
-    from cartesia_tts import CartesiaTTS
+    from audio_uplink import STT_SAMPLE_RATE, AudioAggregator, AudioUplink
+    from cartesia_tts import TTS_ENCODING, TTS_SAMPLE_RATE
+    from cartesia_pool import cartesia_pool
     from orchestrator.chat import handle_chat_turn
     from orchestrator.dm import handle_dm_turn, start_quest
-    from repo.scan import scan_repo
+    from orchestrator.speculative import SpeculativePrefetch
     from notion.read_curriculum import load_curriculum
-    from notion.write_trail import TrailWriter
+    from notion.write_trail import trail_writer
 
-    trail_writer = TrailWriter()
+    speculator = SpeculativePrefetch(session)
 
     GOODBYE_PHRASES = {"goodbye", "good bye", "bye bye", "bye", "end session", "stop session", "i'm done", "im done"}
 
+    async def _release_audio() -> None:
+        """Close the STT uplink and return the Cartesia clients to the pool."""
+        nonlocal stt_client, tts_client, uplink
+        if uplink:
+            await uplink.close()
+            uplink = None
+        if stt_client:
+            await cartesia_pool.release_stt(stt_client)
+            stt_client = None
+        if tts_client:
+            await cartesia_pool.release_tts(tts_client)
+            tts_client = None
+
     async def on_final_transcript(text: str) -> None:
         """Called when STT delivers a final transcript."""
         if not text.strip():
@@ -58,10 +85,11 @@ async def handle_websocket(ws: WebSocket) -> None:
         # Check for goodbye / end-session phrases
         lowered = text.strip().lower().rstrip(".!?,")
         if lowered in GOODBYE_PHRASES:
+            speculator.discard()
             session.add_turn("user", text)
             if tts_client:
-                await tts_client.speak("Goodbye! Great session. Check your Onboarding Trail in Notion for a summary.", ws, session)
-            await trail_writer.flush()
+                await tts_client.speak(GOODBYE_MESSAGE, ws, session)
+            trail_writer.kick()
             await send_json(ws, "session_ended", {})
             return
 
@@ -69,6 +97,7 @@ async def handle_websocket(ws: WebSocket) -> None:
 
         try:
             if session.mode == "practice" and session.current_quest:
+                speculator.discard()
                 result = await handle_dm_turn(session, text)
                 if result:
                     await send_json(ws, MSG_QUEST_RESULT, {
@@ -92,7 +121,8 @@ async def handle_websocket(ws: WebSocket) -> None:
                         await _start_next_quest()
             else:
                 logger.info(">>> Running natural conversation flow...")
-                response = await handle_chat_turn(session, text)
+                playback = PlaybackScheduler(tts_client, ws, session)
+                response = await handle_chat_turn(session, text, prefetch=speculator.take(text))
                 
                 if response:
                     conversation_stage = response.get("conversation_stage", "complete")
@@ -106,9 +136,8 @@ async def handle_websocket(ws: WebSocket) -> None:
                         })
                         logger.info(">>> Sent complete response")
                         
-                        if tts_client:
-                            logger.info(">>> Starting TTS: %s", voice_answer[:80])
-                            await tts_client.speak(voice_answer, ws, session)
+                        logger.info(">>> Starting TTS: %s", voice_answer[:80])
+                        await playback.say(voice_answer)
                         
                         evidence = response.get("evidence")
                         if evidence:
@@ -123,23 +152,17 @@ async def handle_websocket(ws: WebSocket) -> None:
                         logger.info(">>> Sent immediate acknowledgment")
                         
                         # Start TTS immediately with acknowledgment
-                        if tts_client:
-                            logger.info(">>> Starting acknowledgment TTS: %s", voice_answer[:80])
-                            await tts_client.speak(voice_answer, ws, session)
+                        logger.info(">>> Starting acknowledgment TTS: %s", voice_answer[:80])
+                        await playback.say(voice_answer)
                         
-                        # Wait for background processing
+                        # Wait for background processing; fillers only play if the
+                        # acknowledgment runs out before the answer is ready
                         processing_task = response.get("processing_task")
                         if processing_task:
                             try:
-                                result = await asyncio.wait_for(processing_task, timeout=10.0)
-                                
-                                # Send thinking filler
-                                thinking_filler = result.get("thinking_filler", "Let me check...")
-                                if tts_client:
-                                    await tts_client.speak(thinking_filler, ws, session)
-                                
-                                # Small pause for natural rhythm
-                                await asyncio.sleep(0.5)
+                                result = await playback.say_while_pending(
+                                    processing_task, get_thinking_fillers(2), timeout=10.0,
+                                )
                                 
                                 # Send final response
                                 transition = result.get("transition", "Here's what I found:")
@@ -149,7 +172,7 @@ async def handle_websocket(ws: WebSocket) -> None:
 
                                 # Use voice_answer for TTS (clean spoken text),
                                 # detailed_answer for the text panel (markdown with code refs)
-                                tts_text = f"{transition} {final_voice}" if final_voice else detailed_answer
+                                tts_text = final_voice or detailed_answer
 
                                 await send_json(ws, MSG_RESPONSE_TEXT, {
                                     "voice_answer": final_voice,
@@ -160,20 +183,24 @@ async def handle_websocket(ws: WebSocket) -> None:
                                 if evidence:
                                     await send_json(ws, MSG_EVIDENCE, {"evidence": evidence.to_dict()})
 
-                                # Speak the voice-optimized answer (no markdown/code)
-                                if tts_client and tts_text:
+                                # Speak the voice-optimized answer (no markdown/code).
+                                # The transition is a canned phrase, spoken on its own
+                                # so it plays from the pre-synthesized cache.
+                                if tts_text:
+                                    if final_voice:
+                                        await playback.say(transition)
                                     logger.info(">>> Starting detailed TTS: %s", tts_text[:80])
-                                    await tts_client.speak(tts_text, ws, session)
+                                    await playback.say(tts_text)
                                 
                             except asyncio.TimeoutError:
                                 logger.warning("Background processing timed out")
-                                fallback = "I'm still looking into that, but I can tell you this is an interesting question!"
+                                fallback = TIMEOUT_FALLBACK
                                 await send_json(ws, MSG_RESPONSE_TEXT, {
                                     "voice_answer": voice_answer,
                                     "detailed_answer": fallback,
                                 })
-                                if tts_client:
-                                    await tts_client.speak(fallback, ws, session)
+                                await playback.say(fallback)
+                    playback.finish()
                     
                     # Log to Notion (non-blocking)
                     await trail_writer.append_chat_turn(
@@ -186,6 +213,12 @@ async def handle_websocket(ws: WebSocket) -> None:
         except Exception as e:
             logger.error(">>> on_final_transcript ERROR: %s", e, exc_info=True)
 
+    async def on_transcript_event(event: dict[str, Any]) -> None:
+        """Push every interim/final transcript to the client as soon as STT emits it."""
+        if not event.get("is_final") and session.mode == "chat":
+            speculator.on_interim(event.get("text", ""))
+        await send_json(ws, MSG_TRANSCRIPT, event)
+
     async def _start_next_quest() -> None:
         quest = await start_quest(session)
         if quest:
@@ -201,14 +234,55 @@ async def handle_websocket(ws: WebSocket) -> None:
                     f"Quest: {quest.title}. {quest.description}", ws, session
                 )
 
+    async def _handle_audio(audio: bytes | memoryview) -> None:
+        """Queue one chunk of mic PCM for STT (shared by JSON and binary transports)."""
+        if stt_client and uplink:
+            # Don't feed audio to STT while TTS is playing — prevents
+            # the mic from picking up speaker output and cancelling TTS.
+            if session.is_speaking:
+                return
+            if mic_decoder is not None:
+                try:
+                    audio = mic_decoder.decode(audio)
+                except Exception as e:
+                    logger.debug("Dropping undecodable Opus packet: %s", e)
+                    return
+            elif mic_resampler is not None:
+                audio = mic_resampler.process_pcm(audio)
+            if vad_gate is not None:
+                audio = vad_gate.process(audio)
+                if not audio:
+                    return
+            # Never awaits Cartesia — the uplink's sender task does that
+            uplink.submit(audio)
+        else:
+            # User is trying to speak before session start - send helpful message
+            logger.warning(">>> audio_in received but stt_client is None! Session not started.")
+            await send_json(ws, MSG_ERROR, {
+                "message": "Please start a session first by entering a repository path and clicking 'Start Session'"
+            })
+
     try:
         while True:
             try:
-                raw = await ws.receive_text()
+                frame = await ws.receive()
             except Exception as e:
                 logger.info("WebSocket receive error: %s", e)
                 break
-                
+            if frame.get("type") == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+
+            if frame.get("bytes") is not None:
+                try:
+                    kind, _seq, payload = unpack_audio_frame(frame["bytes"])
+                except FrameError as e:
+                    logger.debug("Dropping malformed binary frame: %s", e)
+                    continue
+                if kind == KIND_AUDIO_IN and payload:
+                    await _handle_audio(payload)
+                continue
+
+            raw = frame.get("text") or ""
             try:
                 msg = json.loads(raw)
             except json.JSONDecodeError:
@@ -218,21 +292,40 @@ async def handle_websocket(ws: WebSocket) -> None:
             msg_type = msg.get("type", "")
 
             if msg_type == MSG_START_SESSION:
+                # Restarted on the same socket: hand back the previous leases first
+                await _release_audio()
                 repo_path = msg.get("repo_path", REPO_PATH)
                 curriculum_page_id = msg.get("curriculum_page_id", NOTION_CURRICULUM_PAGE_ID)
                 session.repo_path = repo_path
+                session.audio_transport = negotiate_transport(msg.get("audio_transport"))
+                # Browsers may not honour the AudioContext rates we ask for;
+                # the client reports what it actually got
+                session.input_sample_rate = negotiate_rate(msg.get("input_sample_rate"), STT_SAMPLE_RATE)
+                session.output_sample_rate = negotiate_rate(msg.get("output_sample_rate"), TTS_SAMPLE_RATE)
+                session.output_encoding = negotiate_encoding(msg.get("output_encoding"))
+                session.audio_codec = negotiate_codec(msg.get("audio_codec"), session.audio_transport)
+                mic_resampler = None
+                mic_decoder = None
+                session.opus_encoder = None
+                if session.audio_codec == CODEC_OPUS:
+                    # libopus decodes to any of its rates, so mic audio lands at
+                    # the STT rate directly; TTS is encoded at the canonical rate
+                    mic_decoder = OpusDecoder(STT_SAMPLE_RATE)
+                    session.output_sample_rate = TTS_SAMPLE_RATE
+                    session.output_encoding = TTS_ENCODING
+                    session.opus_encoder = OpusEncoder(TTS_SAMPLE_RATE)
+                elif session.input_sample_rate != STT_SAMPLE_RATE:
+                    mic_resampler = StreamResampler(session.input_sample_rate, STT_SAMPLE_RATE)
                 
-                # Set repo path for API routes
-                set_repo_path(repo_path)
+                # The /api endpoints find this session's repo by its session id
+                repo_ctx = repo_registry.bind_session(session.session_id, repo_path)
 
                 # --- Run all startup tasks in parallel ---
-                stt_client = CartesiaSTT(on_transcript=on_final_transcript)
-                tts_client = CartesiaTTS()
                 repo_name = repo_path.rstrip("/").split("/")[-1] if repo_path else "unknown"
 
                 async def _scan():
                     try:
-                        session.repo_scan = await scan_repo(repo_path)
+                        session.repo_scan = await repo_ctx.get_scan()
                     except Exception as e:
                         logger.error("Repo scan failed: %s", e)
 
@@ -244,40 +337,50 @@ async def handle_websocket(ws: WebSocket) -> None:
                     except Exception as e:
                         logger.warning("Curriculum load failed: %s", e)
 
-                async def _trail():
-                    try:
-                        page_id, page_url = await trail_writer.create_trail_page(repo_name)
-                        session.trail_page_id = page_id
-                        session.trail_page_url = page_url
-                    except Exception as e:
-                        logger.warning("Trail page creation failed: %s", e)
+                async def _on_trail_page(page_id: str, page_url: str) -> None:
+                    session.trail_page_id = page_id
+                    session.trail_page_url = page_url
+                    if page_url:
+                        await send_json(ws, MSG_TRAIL_INFO, {"trail_url": page_url})
 
                 async def _stt():
+                    nonlocal stt_client
                     try:
-                        await stt_client.connect()
+                        # Warm connection from the process-wide pool when available
+                        stt_client = await cartesia_pool.lease_stt(on_final_transcript, on_transcript_event)
                     except Exception as e:
                         logger.error("STT connect failed: %s", e)
                         await send_json(ws, MSG_ERROR, {"message": f"STT connect failed: {e}"})
 
                 async def _tts():
+                    nonlocal tts_client
                     try:
-                        await tts_client.connect()
+                        tts_client = await cartesia_pool.lease_tts()
                     except Exception as e:
                         logger.error("TTS connect failed: %s", e)
                         await send_json(ws, MSG_ERROR, {"message": f"TTS connect failed: {e}"})
 
-                await asyncio.gather(_scan(), _trail(), _stt(), _tts())
-
-                # Start Notion flush loop
-                notion_flush_task = asyncio.create_task(trail_writer.flush_loop())
+                # The trail page is created off the critical path; entries
+                # logged before it exists are held under a placeholder id
+                session.trail_page_id = trail_writer.open_trail_page(repo_name, _on_trail_page)
+                await asyncio.gather(_scan(), _stt(), _tts())
+                if stt_client:
+                    uplink = AudioUplink(AudioAggregator(stt_client.send_pcm))
+                    uplink.start()
 
                 # Send session info immediately so the UI unlocks
                 await send_json(ws, MSG_SESSION_INFO, {
                     "session_id": session.session_id,
+                    "repo_id": repo_ctx.repo_id,
                     "repo_path": session.repo_path,
                     "trail_url": session.trail_page_url,
                     "repo_summary": session.repo_scan.summary() if session.repo_scan else "",
                     "mode": session.mode,
+                    "audio_transport": session.audio_transport,
+                    "input_sample_rate": session.input_sample_rate,
+                    "output_sample_rate": session.output_sample_rate,
+                    "output_encoding": session.output_encoding,
+                    "audio_codec": session.audio_codec,
                 })
 
                 # Curriculum loads in background — send it when ready
@@ -289,25 +392,17 @@ async def handle_websocket(ws: WebSocket) -> None:
 
             elif msg_type == MSG_AUDIO_IN:
                 audio_b64 = msg.get("audio", "")
-                if stt_client and audio_b64:
-                    # Don't feed audio to STT while TTS is playing — prevents
-                    # the mic from picking up speaker output and cancelling TTS.
-                    if session.is_speaking:
+                if audio_b64:
+                    try:
+                        audio = base64.b64decode(audio_b64)
+                    except (binascii.Error, TypeError) as e:
+                        # One bad chunk must not end the session
+                        logger.debug("Dropping malformed audio_in chunk: %s", e)
+                        await send_json(ws, MSG_ERROR, {"message": "Invalid audio data"})
                         continue
-                    await stt_client.send_audio(audio_b64)
-                    transcript_event = stt_client.get_latest_event()
-                    if transcript_event:
-                        await send_json(ws, MSG_TRANSCRIPT, transcript_event)
-                elif not stt_client and audio_b64:
-                    # User is trying to speak before session start - send helpful message
-                    logger.warning(">>> audio_in received but stt_client is None! Session not started.")
-                    await send_json(ws, MSG_ERROR, {
-                        "message": "Please start a session first by entering a repository path and clicking 'Start Session'"
-                    })
-                elif not audio_b64:
-                    logger.debug(">>> audio_in received but no audio data")
+                    await _handle_audio(audio)
                 else:
-                    logger.warning(">>> audio_in received but stt_client is None!")
+                    logger.debug(">>> audio_in received but no audio data")
 
             elif msg_type == MSG_MODE_SWITCH:
                 new_mode = msg.get("mode", "chat")
@@ -317,8 +412,8 @@ async def handle_websocket(ws: WebSocket) -> None:
                     await _start_next_quest()
 
             elif msg_type == MSG_STOP_SESSION:
-                # Flush remaining Notion writes
-                await trail_writer.flush()
+                # Write this session's remaining trail entries promptly
+                trail_writer.kick()
                 break
 
     except WebSocketDisconnect:
@@ -326,11 +421,10 @@ async def handle_websocket(ws: WebSocket) -> None:
     except Exception as e:
         logger.error("WebSocket error: %s", e, exc_info=True)
     finally:
-        if stt_client:
-            await stt_client.close()
-        if tts_client:
-            await tts_client.close()
-        if notion_flush_task:
-            notion_flush_task.cancel()
-        await trail_writer.flush()
+        speculator.discard()
+        if vad_gate:
+            vad_gate.report(session.session_id)
+        await _release_audio()
+        trail_writer.kick()
+        repo_registry.release_session(session.session_id)
         logger.info("Session ended: %s", session.session_id)